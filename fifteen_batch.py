@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Batch solving for the Fifteen puzzle
+Boards are sent to worker processes as packed tile bytes, a chunk of boards
+per task, and rebuilt into Puzzle objects on the other side.  A failure on
+one board is reported in its result instead of stopping the batch.
+"""
+
+import array
+import collections
+import multiprocessing
+import numbers
+import os
+
+from fifteen_puzzle_final import Puzzle
+
+#Result for one board: its position in the input, the move string (None on
+#failure) and the error message (None on success)
+BoardResult = collections.namedtuple("BoardResult", "index moves error")
+
+METHODS = ("greedy", "hybrid", "optimal")
+
+
+def tile_typecode(height, width):
+    """
+    Smallest array typecode that holds every tile of a height x width board
+    Returns a one-character string
+    """
+    size = height * width
+    if size <= 0x100:
+        return "B"
+    elif size <= 0x10000:
+        return "H"
+    return "I"
+
+
+def flatten(grid, height, width):
+    """
+    Tiles of a board, given as rows or as a flat sequence, in row-major
+    order; a board is flat when its first entry is a tile, not a row
+    Returns a list
+    """
+    if isinstance(grid[0], numbers.Integral):
+        flat = list(grid)
+    else:
+        assert len(grid) == height, "grid does not fit the board"
+        flat = []
+        for row in grid:
+            assert len(row) == width, "grid does not fit the board"
+            flat.extend(row)
+    assert len(flat) == height * width, "grid does not fit the board"
+    return flat
+
+
+def encode(grid, height, width):
+    """
+    Pack a board, given as rows or as a flat sequence, into bytes
+    Returns a bytes object
+    """
+    return array.array(tile_typecode(height, width),
+                       flatten(grid, height, width)).tobytes()
+
+
+def decode(data, height, width):
+    """
+    Unpack bytes made by encode into a Puzzle
+    Returns a Puzzle object
+    """
+    flat = array.array(tile_typecode(height, width))
+    flat.frombytes(data)
+    assert len(flat) == height * width, "record does not fit the board"
+    return Puzzle(height, width,
+                  [flat[row * width:(row + 1) * width]
+                   for row in range(height)])
+
+
+def solve_one(puzzle, method, options):
+    """
+    Solve a single puzzle in place with the named method
+    Returns a move string, or None if the method gave up
+    """
+    if method == "greedy":
+        return puzzle.solve_puzzle(**options)
+    elif method == "hybrid":
+        return puzzle.solve_hybrid(**options)
+    elif method == "optimal":
+        return puzzle.solve_optimal(**options)
+    assert False, "unknown method: " + str(method)
+
+
+def _solve_chunk(task):
+    """
+    Worker entry point: solve a chunk of packed boards
+    Returns a list of BoardResult
+    """
+    start, records, height, width, method, options = task
+    results = []
+    for offset, data in enumerate(records):
+        index = start + offset
+        try:
+            moves = solve_one(decode(data, height, width), method, options)
+        except Exception as exc:
+            error = type(exc).__name__
+            if str(exc):
+                error += ": " + str(exc)
+            results.append(BoardResult(index, None, error))
+            continue
+        if moves is None:
+            results.append(BoardResult(index, None, "search budget exhausted"))
+        else:
+            results.append(BoardResult(index, moves, None))
+    return results
+
+
+def _chunks(grids, height, width, method, options, chunksize):
+    """
+    Group the packed boards into tasks of chunksize boards
+    Yields task tuples for _solve_chunk
+    """
+    records = []
+    start = 0
+    for grid in grids:
+        records.append(encode(grid, height, width))
+        if len(records) == chunksize:
+            yield (start, records, height, width, method, options)
+            start += len(records)
+            records = []
+    if records:
+        yield (start, records, height, width, method, options)
+
+
+def solve_many(grids, height, width, method="greedy", workers=None,
+               ordered=True, chunksize=64, **options):
+    """
+    Solve an iterable of boards over a pool of worker processes.  method
+    is "greedy" for solve_puzzle, "hybrid" for solve_hybrid or "optimal"
+    for solve_optimal, and any extra keyword options go to that method.  Results come back in input
+    order when ordered is true and as soon as each chunk finishes
+    otherwise.  workers defaults to the number of CPUs; with one worker
+    the boards are solved in this process.
+    Yields a BoardResult per board
+    """
+    assert method in METHODS, "unknown method: " + str(method)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    tasks = _chunks(grids, height, width, method, options, chunksize)
+
+    if workers == 1:
+        for task in tasks:
+            for result in _solve_chunk(task):
+                yield result
+        return
+
+    pool = multiprocessing.Pool(workers)
+    try:
+        if ordered:
+            batches = pool.imap(_solve_chunk, tasks)
+        else:
+            batches = pool.imap_unordered(_solve_chunk, tasks)
+        for batch in batches:
+            for result in batch:
+                yield result
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
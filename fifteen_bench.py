@@ -0,0 +1,443 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for the Fifteen puzzle solvers
+A corpus of seeded, solvable random boards is run through each solver mode;
+every answer is checked by replaying it with update_puzzle, and the wall
+time, peak memory, nodes expanded, solution length and moves saved by
+post-optimization are recorded.  Two result files can be compared to flag
+regressions.
+
+Usage:
+    python fifteen_bench.py run results.json [--csv results.csv]
+    python fifteen_bench.py compare baseline.json results.json
+    python fifteen_bench.py scaling
+    python fifteen_bench.py moves [--depth D]
+"""
+
+import csv
+import json
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import fifteen_generate
+import fifteen_search
+from fifteen_puzzle_final import Puzzle, SolveStats
+
+#Board shapes of the default corpus, from 3x3 up to 50x50
+DEFAULT_SHAPES = ((3, 3), (3, 5), (5, 3), (4, 4), (5, 5), (8, 8),
+                  (10, 10), (20, 20), (30, 30), (50, 50))
+
+#Optimal search is only attempted on boards with at most this many cells
+OPTIMAL_MAX_CELLS = 12
+
+#Wall-clock budget of the anytime solver mode
+ANYTIME_BUDGET_MS = 200
+
+FIELDS = ("instance", "height", "width", "solver", "status", "seconds",
+          "peak_bytes", "nodes", "length", "saved")
+
+
+def make_corpus(shapes=DEFAULT_SHAPES, per_shape=5, seed=0):
+    """
+    Reproducible corpus of random solvable boards from
+    fifteen_generate.random_boards, per_shape boards for each (height,
+    width) in shapes.  The same seed always gives the same boards.
+    Returns a list of dicts with instance, height, width and grid keys
+    """
+    corpus = []
+    for height, width in shapes:
+        rng = np.random.default_rng([seed, height, width])
+        boards = fifteen_generate.random_boards(per_shape, height, width, rng)
+        for number, cells in enumerate(boards.tolist()):
+            grid = [cells[row * width:(row + 1) * width]
+                    for row in range(height)]
+            corpus.append({"instance": "%dx%d-%d" % (height, width, number),
+                           "height": height, "width": width, "grid": grid})
+    return corpus
+
+
+def _corpus_puzzle(height, width, seed):
+    """
+    The first board of make_corpus for a single shape
+    Returns a Puzzle object
+    """
+    instance = make_corpus([(height, width)], 1, seed)[0]
+    return Puzzle(height, width, instance["grid"])
+
+
+#########################################################
+# Solver modes
+
+def _run_greedy(puzzle):
+    """
+    Solve with solve_puzzle
+    Returns a move string, the nodes expanded and the moves saved by
+    post-optimization (both None here)
+    """
+    return puzzle.solve_puzzle(), None, None
+
+
+def _run_greedy_optimized(puzzle):
+    """
+    Solve with solve_puzzle(optimize=True)
+    Returns a move string, the nodes expanded (None) and the moves saved
+    by post-optimization
+    """
+    stats = SolveStats()
+    puzzle.instrument(stats)
+    mov_string = puzzle.solve_puzzle(optimize=True)
+    return mov_string, None, stats.moves_saved
+
+
+def _run_optimal(puzzle, max_nodes=2000000):
+    """
+    Solve with solve_optimal, which uses the 3x3 distance table and the
+    pattern databases when they have been built
+    Returns a move string (None on give-up), the nodes expanded and the
+    moves saved by post-optimization (None)
+    """
+    stats = SolveStats()
+    puzzle.instrument(stats)
+    mov_string = puzzle.solve_optimal(max_nodes=max_nodes)
+    return mov_string, stats.nodes_expanded, None
+
+
+def _run_hybrid(puzzle):
+    """
+    Solve with solve_hybrid and its default corner and budget
+    Returns a move string, the nodes expanded by the corner search and the
+    moves saved by post-optimization (None)
+    """
+    stats = SolveStats()
+    puzzle.instrument(stats)
+    mov_string = puzzle.solve_hybrid()
+    return mov_string, stats.nodes_expanded, None
+
+
+def _run_anytime(puzzle, budget_ms=ANYTIME_BUDGET_MS):
+    """
+    Solve with solve_within and a fixed budget
+    Returns a move string, the nodes expanded by the weighted A* passes
+    and the moves saved by post-optimizing the greedy baseline
+    """
+    stats = SolveStats()
+    puzzle.instrument(stats)
+    result = puzzle.solve_within(budget_ms)
+    return result.moves, stats.nodes_expanded, stats.moves_saved
+
+
+#Solver modes by name, with the largest board (in cells) each is run on
+SOLVERS = {
+    "greedy": (_run_greedy, None),
+    "greedy-opt": (_run_greedy_optimized, None),
+    "hybrid": (_run_hybrid, None),
+    "anytime": (_run_anytime, None),
+    "optimal": (_run_optimal, OPTIMAL_MAX_CELLS),
+}
+
+
+def run_instance(instance, solver, measure_memory=True):
+    """
+    Solve one corpus board with the named solver and check the answer by
+    replaying it on a fresh copy of the board.  Peak memory comes from a
+    second, traced run so that tracing does not distort the timing.
+    Returns a result dict with the keys in FIELDS
+    """
+    run, _ = SOLVERS[solver]
+    height, width = instance["height"], instance["width"]
+    result = {"instance": instance["instance"], "height": height,
+              "width": width, "solver": solver, "status": "ok",
+              "seconds": None, "peak_bytes": None, "nodes": None,
+              "length": None, "saved": None}
+
+    puzzle = Puzzle(height, width, instance["grid"])
+    start = time.perf_counter()
+    try:
+        mov_string, nodes, saved = run(puzzle)
+    except Exception as exc:
+        result["status"] = "error: %s" % type(exc).__name__
+        return result
+    result["seconds"] = time.perf_counter() - start
+    result["nodes"] = nodes
+    result["saved"] = saved
+    if mov_string is None:
+        result["status"] = "budget"
+        return result
+    result["length"] = len(mov_string)
+
+    check = Puzzle(height, width, instance["grid"])
+    try:
+        check.update_puzzle(mov_string)
+    except AssertionError:
+        result["status"] = "illegal"
+        return result
+    if not check.lower_row_invariant(0, 0):
+        result["status"] = "unsolved"
+        return result
+
+    if measure_memory:
+        tracemalloc.start()
+        try:
+            run(Puzzle(height, width, instance["grid"]))
+            result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run_corpus(corpus, solvers=tuple(SOLVERS),
+               measure_memory=True, report=None):
+    """
+    Run every solver over every board it applies to.  report, if given, is
+    called with each result as it is produced.
+    Returns a list of result dicts
+    """
+    results = []
+    for instance in corpus:
+        cells = instance["height"] * instance["width"]
+        for solver in solvers:
+            max_cells = SOLVERS[solver][1]
+            if max_cells is not None and cells > max_cells:
+                continue
+            result = run_instance(instance, solver, measure_memory)
+            results.append(result)
+            if report is not None:
+                report(result)
+    return results
+
+
+#########################################################
+# Result files
+
+def write_json(results, path):
+    """
+    Save results as a JSON list
+    """
+    with open(path, "w") as out:
+        json.dump(results, out, indent=1)
+
+
+def read_json(path):
+    """
+    Load results saved by write_json
+    Returns a list of result dicts
+    """
+    with open(path) as source:
+        return json.load(source)
+
+
+def write_csv(results, path):
+    """
+    Save results as CSV with one row per board and solver
+    """
+    with open(path, "w", newline="") as out:
+        writer = csv.DictWriter(out, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def compare(baseline, current, time_tolerance=0.25, memory_tolerance=0.25,
+            min_seconds=0.005):
+    """
+    Flag regressions of current against baseline, matching results by
+    board and solver.  A board regresses if it no longer solves, its
+    solution or node count grows, or its time or peak memory grows by more
+    than the given fraction (times under min_seconds are treated as noise).
+    Returns a list of message strings, empty if nothing regressed
+    """
+    before = dict(((result["instance"], result["solver"]), result)
+                  for result in baseline)
+    messages = []
+    for result in current:
+        key = (result["instance"], result["solver"])
+        old = before.get(key)
+        if old is None:
+            continue
+        name = "%s/%s" % key
+        if old["status"] == "ok" and result["status"] != "ok":
+            messages.append("%s: now %s" % (name, result["status"]))
+            continue
+        if result["status"] != "ok" or old["status"] != "ok":
+            continue
+        if result["length"] > old["length"]:
+            messages.append("%s: solution length %d -> %d" %
+                            (name, old["length"], result["length"]))
+        if old["nodes"] is not None and result["nodes"] is not None and \
+                result["nodes"] > old["nodes"]:
+            messages.append("%s: nodes expanded %d -> %d" %
+                            (name, old["nodes"], result["nodes"]))
+        if result["seconds"] > max(old["seconds"], min_seconds) * \
+                (1 + time_tolerance):
+            messages.append("%s: time %.4f s -> %.4f s" %
+                            (name, old["seconds"], result["seconds"]))
+        if old["peak_bytes"] and result["peak_bytes"] and \
+                result["peak_bytes"] > old["peak_bytes"] * \
+                (1 + memory_tolerance):
+            messages.append("%s: peak memory %d -> %d bytes" %
+                            (name, old["peak_bytes"], result["peak_bytes"]))
+    return messages
+
+
+#########################################################
+# Board size scaling
+
+def bench_sizes(sizes, seed=0, report=print):
+    """
+    Time solve_puzzle on one random size x size board per entry of sizes
+    and check the answer by replaying it on a copy of the board.  report
+    is called with one line of text per board.
+    Returns a list of (size, moves, seconds) tuples
+    """
+    rows = []
+    report("%6s %10s %9s %12s" % ("size", "moves", "seconds", "moves/s"))
+    for size in sizes:
+        puzzle = _corpus_puzzle(size, size, seed)
+        check = puzzle.clone()
+        start = time.time()
+        mov_string = puzzle.solve_puzzle()
+        elapsed = time.time() - start
+        check.update_puzzle(mov_string)
+        assert check.lower_row_invariant(0, 0), "solution does not solve"
+        rows.append((size, len(mov_string), elapsed))
+        report("%6d %10d %9.3f %12.0f" % (size, len(mov_string), elapsed,
+                                          len(mov_string) / max(elapsed, 1e-9)))
+    return rows
+
+
+#########################################################
+# Make/unmake against clone
+
+def _walk_clone(puzzle, blank, depth, forbidden, moves):
+    """
+    Depth-first walk that copies the board for every child
+    Returns the number of nodes visited
+    """
+    nodes = 1
+    if depth == 0:
+        return nodes
+    for direction, tile_idx, inverse in moves[blank]:
+        if direction == forbidden:
+            continue
+        child = puzzle.clone()
+        child.update_puzzle(direction)
+        nodes += _walk_clone(child, tile_idx, depth - 1, inverse, moves)
+    return nodes
+
+
+def _walk_in_place(puzzle, blank, depth, forbidden, moves):
+    """
+    Depth-first walk that makes and takes back every move in place
+    Returns the number of nodes visited
+    """
+    nodes = 1
+    if depth == 0:
+        return nodes
+    for direction, tile_idx, inverse in moves[blank]:
+        if direction == forbidden:
+            continue
+        puzzle.apply_move(direction)
+        nodes += _walk_in_place(puzzle, tile_idx, depth - 1, inverse, moves)
+        puzzle.undo_move()
+    return nodes
+
+
+def bench_make_unmake(height=4, width=4, depth=16, seed=0, report=print):
+    """
+    Walk every move sequence of the given depth from a random board, once
+    copying the board per node with clone and update_puzzle, once with
+    apply_move and undo_move, and once more in place while tracking
+    linear conflicts.  report is called with one line of text per walk.
+    Returns a dict mapping walk names to nodes per second
+    """
+    puzzle = _corpus_puzzle(height, width, seed)
+    moves = fifteen_search.move_table(height, width)
+    row, col = puzzle.current_position(0, 0)
+    blank = row * width + col
+    rates = {}
+    report("%-22s %10s %9s %12s" % ("walk", "nodes", "seconds", "nodes/s"))
+    for name in ("clone", "apply/undo", "apply/undo+heuristic"):
+        if name == "clone":
+            walk = _walk_clone
+        else:
+            walk = _walk_in_place
+        if name.endswith("heuristic"):
+            puzzle.track_heuristic(fifteen_search.LinearConflict(height,
+                                                                 width))
+        start = time.time()
+        nodes = walk(puzzle, blank, depth, None, moves)
+        elapsed = time.time() - start
+        assert puzzle.undo_depth() == 0, "walk left moves behind"
+        rates[name] = nodes / max(elapsed, 1e-9)
+        report("%-22s %10d %9.3f %12.0f" % (name, nodes, elapsed,
+                                            rates[name]))
+    puzzle.track_heuristic(None)
+    return rates
+
+
+def main(argv=None):
+    """
+    Command line entry point, see the module docstring
+    Returns the process exit status
+    """
+    import argparse
+    parser = argparse.ArgumentParser(description="Fifteen puzzle benchmarks")
+    commands = parser.add_subparsers(dest="command")
+    run = commands.add_parser("run", help="run the corpus benchmark")
+    run.add_argument("out", help="JSON file for the results")
+    run.add_argument("--csv", help="also write the results as CSV")
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--per-shape", type=int, default=5)
+    run.add_argument("--solvers", default=",".join(SOLVERS))
+    run.add_argument("--no-memory", action="store_true",
+                     help="skip the traced run that measures peak memory")
+    cmp_parser = commands.add_parser("compare", help="flag regressions")
+    cmp_parser.add_argument("baseline")
+    cmp_parser.add_argument("current")
+    cmp_parser.add_argument("--time-tolerance", type=float, default=0.25)
+    cmp_parser.add_argument("--memory-tolerance", type=float, default=0.25)
+    scaling = commands.add_parser("scaling", help="time against board size")
+    scaling.add_argument("sizes", nargs="*", type=int,
+                         default=[10, 25, 50, 100, 150, 200, 300])
+    moves_parser = commands.add_parser(
+        "moves", help="apply_move/undo_move against clone, in nodes/s")
+    moves_parser.add_argument("--height", type=int, default=4)
+    moves_parser.add_argument("--width", type=int, default=4)
+    moves_parser.add_argument("--depth", type=int, default=16)
+    moves_parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        corpus = make_corpus(per_shape=args.per_shape, seed=args.seed)
+        def report(result):
+            sys.stderr.write("%-10s %-10s %-8s %-8s %s\n" %
+                             (result["instance"], result["solver"],
+                              result["status"], result["length"],
+                              result["saved"] or ""))
+        results = run_corpus(corpus, args.solvers.split(","),
+                             not args.no_memory, report)
+        write_json(results, args.out)
+        if args.csv:
+            write_csv(results, args.csv)
+        return 0
+    elif args.command == "compare":
+        messages = compare(read_json(args.baseline), read_json(args.current),
+                           args.time_tolerance, args.memory_tolerance)
+        for message in messages:
+            print(message)
+        print("%d regression(s)" % len(messages))
+        return 1 if messages else 0
+    elif args.command == "scaling":
+        bench_sizes(args.sizes)
+        return 0
+    elif args.command == "moves":
+        bench_make_unmake(args.height, args.width, args.depth, args.seed)
+        return 0
+    parser.print_help()
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+Compact bitboard states for Fifteen puzzles of at most 16 cells
+A board is one integer holding 4 bits per cell, cell i in bits 4i to 4i+3,
+so a 4x4 board fits in 64 bits.  The blank is the zero nibble; its index is
+cached next to the bits so moves never have to search for it.  Moves are
+applied from a table: sliding tile t from cell c into the blank at cell b
+adds t * (16**b - 16**c) to the bits.
+
+The packed integers are what searches and caches of small boards use as
+dictionary keys: WeightedAStar in fifteen_search, SolutionCache in
+fifteen_cache and the 3x3 table builder in fifteen_eight.  A key takes a
+few dozen bytes where a tuple of 16 tiles takes about two hundred.  In
+CPython the breadth-first search runs at 400k to 550k states per second
+on one core, well short of millions; the gain is memory and cheap
+hashing, not raw speed.
+"""
+
+import collections
+import time
+
+MAX_CELLS = 16
+
+#Low and high nibbles of every byte value
+_NIBBLES = [(byte & 15, byte >> 4) for byte in range(256)]
+
+
+def pack(cells):
+    """
+    Pack a flat row-major board of at most 16 cells, 4 bits per cell
+    Returns an integer
+    """
+    bits = 0
+    for idx, tile in enumerate(cells):
+        bits |= tile << (4 * idx)
+    return bits
+
+
+def unpack(bits, size):
+    """
+    Unpack the bits of a board of size cells
+    Returns a list of integers
+    """
+    cells = []
+    for byte in bits.to_bytes(8, "little"):
+        cells.extend(_NIBBLES[byte])
+    return cells[:size]
+
+
+class BitState(object):
+    """
+    One board as (bits, blank index).  States hash and compare by their
+    bits alone, since the bits determine the blank.
+    """
+
+    __slots__ = ("bits", "blank")
+
+    def __init__(self, bits, blank):
+        """
+        Wrap already encoded bits and their blank index
+        """
+        self.bits = bits
+        self.blank = blank
+
+    def __hash__(self):
+        return hash(self.bits)
+
+    def __eq__(self, other):
+        return isinstance(other, BitState) and self.bits == other.bits
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "BitState(%#x, %d)" % (self.bits, self.blank)
+
+
+class BitBoardSpace(object):
+    """
+    Move tables and conversions for bitboards of one board shape
+    """
+
+    def __init__(self, height, width):
+        """
+        Precompute the move table for a height x width board
+        """
+        assert height * width <= MAX_CELLS, "bitboards hold at most 16 cells"
+        self.height = height
+        self.width = width
+        self.size = height * width
+        #moves[blank] lists (direction, tile cell, tile shift, multiplier)
+        self.moves = []
+        for blank in range(self.size):
+            row, col = divmod(blank, width)
+            entries = []
+            for direction, ok, cell in (("l", col > 0, blank - 1),
+                                        ("r", col < width - 1, blank + 1),
+                                        ("u", row > 0, blank - width),
+                                        ("d", row < height - 1, blank + width)):
+                if ok:
+                    entries.append((direction, cell, 4 * cell,
+                                    (1 << (4 * blank)) - (1 << (4 * cell))))
+            self.moves.append(tuple(entries))
+        self.goal = self.encode(range(self.size))
+
+    def encode(self, cells):
+        """
+        Pack a flat row-major board
+        Returns a BitState
+        """
+        cells = list(cells)
+        assert 0 in cells, "board has no blank"
+        return BitState(pack(cells), cells.index(0))
+
+    def decode(self, state):
+        """
+        Unpack a state into a flat row-major board
+        Returns a list of integers
+        """
+        return unpack(state.bits, self.size)
+
+    def from_puzzle(self, puzzle):
+        """
+        Pack the current board of a Puzzle
+        Returns a BitState
+        """
+        assert (puzzle.get_height(), puzzle.get_width()) == \
+            (self.height, self.width), "puzzle has a different shape"
+        return self.encode(puzzle.cells())
+
+    def to_puzzle(self, state):
+        """
+        Build a Puzzle holding the board of a state
+        Returns a Puzzle object
+        """
+        #Imported here: the Puzzle module reaches this one through
+        #fifteen_search
+        from fifteen_puzzle_final import Puzzle
+        cells = self.decode(state)
+        return Puzzle(self.height, self.width,
+                      [cells[row * self.width:(row + 1) * self.width]
+                       for row in range(self.height)])
+
+    def neighbors(self, state):
+        """
+        Every state one move away
+        Yields (direction, BitState) pairs
+        """
+        bits = state.bits
+        for direction, cell, shift, mult in self.moves[state.blank]:
+            yield direction, BitState(bits + ((bits >> shift) & 15) * mult,
+                                      cell)
+
+    def apply(self, state, move_string):
+        """
+        Play a move string from a state
+        Returns the resulting BitState
+        """
+        bits = state.bits
+        blank = state.blank
+        for direction in move_string:
+            for name, cell, shift, mult in self.moves[blank]:
+                if name == direction:
+                    bits += ((bits >> shift) & 15) * mult
+                    blank = cell
+                    break
+            else:
+                assert False, "move off grid: " + direction
+        return BitState(bits, blank)
+
+    def bfs_distances(self, start=None, limit=None):
+        """
+        Breadth-first search over raw (bits, blank) pairs from start, the
+        goal by default, visiting at most limit states
+        Returns a dict mapping bits to their distance from start
+        """
+        if start is None:
+            start = self.goal
+        moves = self.moves
+        distances = {start.bits: 0}
+        queue = collections.deque([(start.bits, start.blank)])
+        while queue:
+            bits, blank = queue.popleft()
+            depth = distances[bits] + 1
+            for _, cell, shift, mult in moves[blank]:
+                child = bits + ((bits >> shift) & 15) * mult
+                if child not in distances:
+                    distances[child] = depth
+                    if limit is not None and len(distances) >= limit:
+                        return distances
+                    queue.append((child, cell))
+        return distances
+
+
+if __name__ == "__main__":
+    #Throughput check: explore every reachable 3x3 board
+    space = BitBoardSpace(3, 3)
+    start = time.time()
+    reached = space.bfs_distances()
+    elapsed = time.time() - start
+    print("%d states in %.2f s (%.0f states/s), deepest %d" %
+          (len(reached), elapsed, len(reached) / elapsed,
+           max(reached.values())))
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+Solution cache for the Fifteen puzzle
+Boards of at most 16 cells are keyed by their fifteen_bitboard integer
+with the board shape in the low byte; larger boards by their packed tile
+bytes after a shape prefix.  Square boards are first put in a canonical
+orientation: transposing a board keeps the blank-at-(0, 0)
+goal, so a board and its mirror image across the main diagonal share one
+entry, and a cached answer for the mirror is mapped back by swapping l
+with u and r with d.  Entries live in a size-limited in-memory LRU layer
+and, if a path is given, in an SQLite file that outlives the process.
+"""
+
+import collections
+import sqlite3
+import struct
+
+import fifteen_batch
+import fifteen_bitboard
+import fifteen_search
+
+#Shape prefix of the byte keys of boards over 16 cells
+_SHAPE = struct.Struct("<II")
+
+#Counters returned by SolutionCache.info: hits answered from memory, hits
+#answered from disk, misses that ran the solver, entries dropped from
+#memory, and the current number of entries and stored move characters
+CacheInfo = collections.namedtuple(
+    "CacheInfo", "hits disk_hits misses evictions entries chars")
+
+
+def transpose_cells(cells, size):
+    """
+    Mirror a flat size x size board across its main diagonal.  Tiles are
+    renumbered too, so the solved board maps to itself.
+    Returns a list of integers
+    """
+    mirrored = [0] * (size * size)
+    for idx, tile in enumerate(cells):
+        row, col = divmod(idx, size)
+        tile_row, tile_col = divmod(tile, size)
+        mirrored[col * size + row] = tile_col * size + tile_row
+    return mirrored
+
+
+def _pack(cells, height, width):
+    """
+    Key of a flat board, unique across board shapes
+    Returns an integer for boards of at most 16 cells, otherwise bytes
+    """
+    if height * width <= fifteen_bitboard.MAX_CELLS:
+        return (fifteen_bitboard.pack(cells) << 8 |
+                (height - 1) << 4 | (width - 1))
+    return _SHAPE.pack(height, width) + fifteen_batch.encode(cells, height,
+                                                             width)
+
+
+def _blob(key):
+    """
+    Bytes stored in the disk layer for a key
+    Returns a bytes object
+    """
+    if isinstance(key, bytes):
+        return key
+    return key.to_bytes(9, "little")
+
+
+def canonical_key(puzzle):
+    """
+    Cache key of a puzzle's current board.  Square boards use whichever of
+    the board and its transpose packs to the smaller key.
+    Returns a (key, transposed) pair
+    """
+    height = puzzle.get_height()
+    width = puzzle.get_width()
+    cells = puzzle.cells()
+    key = _pack(cells, height, width)
+    if height != width:
+        return key, False
+    mirrored = _pack(transpose_cells(cells, width), height, width)
+    if mirrored < key:
+        return mirrored, True
+    return key, False
+
+
+class SolutionCache(object):
+    """
+    Memoizes solutions by board, for one solving method of fifteen_batch
+    """
+
+    def __init__(self, method="greedy", max_entries=10000, max_chars=None,
+                 path=None, **options):
+        """
+        Cache the answers of method, called with options.  The memory layer
+        keeps at most max_entries boards and, if max_chars is given, at most
+        that many stored move characters.  path names an SQLite file for
+        the disk layer.
+        """
+        assert method in fifteen_batch.METHODS, "unknown method: " + method
+        assert max_entries > 0, "cache needs room for one entry"
+        self._method = method
+        self._options = options
+        #The disk layer keeps greedy and optimized answers apart
+        self._variant = method
+        if options:
+            self._variant += repr(sorted(options.items()))
+        self._max_entries = max_entries
+        self._max_chars = max_chars
+        self._entries = collections.OrderedDict()
+        self._chars = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path)
+            self._db.execute("CREATE TABLE IF NOT EXISTS solutions ("
+                             "variant TEXT, height INTEGER, width INTEGER, "
+                             "board BLOB, moves TEXT, "
+                             "PRIMARY KEY (variant, height, width, board))")
+            self._db.commit()
+
+    def info(self):
+        """
+        Current counters
+        Returns a CacheInfo
+        """
+        return CacheInfo(self.hits, self.disk_hits, self.misses,
+                         self.evictions, len(self._entries), self._chars)
+
+    def clear(self):
+        """
+        Empty the memory layer; the disk layer and counters are kept
+        """
+        self._entries.clear()
+        self._chars = 0
+
+    def close(self):
+        """
+        Close the disk layer, if any
+        """
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remember(self, key, mov_string):
+        """
+        Put an entry at the recent end of the memory layer, evicting the
+        least recently used entries past the limits
+        """
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._chars -= len(old)
+        self._entries[key] = mov_string
+        self._chars += len(mov_string)
+        while len(self._entries) > 1 and (
+                len(self._entries) > self._max_entries or
+                (self._max_chars is not None and
+                 self._chars > self._max_chars)):
+            _, dropped = self._entries.popitem(last=False)
+            self._chars -= len(dropped)
+            self.evictions += 1
+
+    def _fetch(self, key, height, width):
+        """
+        Look up a canonical key, memory first and then disk
+        Returns the canonical move string, or None on a miss
+        """
+        mov_string = self._entries.get(key)
+        if mov_string is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return mov_string
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT moves FROM solutions WHERE variant = ? AND height = ? "
+            "AND width = ? AND board = ?",
+            (self._variant, height, width, _blob(key))).fetchone()
+        if row is None:
+            return None
+        self.disk_hits += 1
+        self._remember(key, row[0])
+        return row[0]
+
+    def _store(self, key, height, width, mov_string):
+        """
+        Save a canonical move string in both layers
+        """
+        self._remember(key, mov_string)
+        if self._db is not None:
+            with self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?)",
+                    (self._variant, height, width, _blob(key), mov_string))
+
+    def solve(self, puzzle):
+        """
+        Solve a puzzle, reusing the answer for an identical or transposed
+        board when there is one
+        Updates the puzzle and returns a move string, or None if the
+        method gave up
+        """
+        height = puzzle.get_height()
+        width = puzzle.get_width()
+        key, transposed = canonical_key(puzzle)
+        canonical = self._fetch(key, height, width)
+        if canonical is None:
+            self.misses += 1
+            mov_string = fifteen_batch.solve_one(puzzle, self._method,
+                                                 self._options)
+            if mov_string is not None:
+                if transposed:
+                    canonical = fifteen_search.transpose_moves(mov_string)
+                else:
+                    canonical = mov_string
+                self._store(key, height, width, canonical)
+            return mov_string
+        if transposed:
+            mov_string = fifteen_search.transpose_moves(canonical)
+        else:
+            mov_string = canonical
+        puzzle.update_puzzle(mov_string)
+        return mov_string
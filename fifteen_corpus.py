@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""
+Packed binary corpora of Fifteen puzzle boards
+A corpus file is a 16-byte header followed by one fixed-width record per
+board.  Boards of at most 16 cells take a nibble per tile, two tiles to a
+byte with the first in the low half; larger boards take the smallest
+array typecode that holds their tiles.  Readers map the file with mmap and
+hand out records as memoryview slices, so nothing is copied until a board
+is decoded.
+
+Solutions are written as a stream of records: a 4-byte little-endian
+length followed by that many move characters, with FAILED as the length
+of a board that could not be solved.
+
+Usage:
+    python fifteen_corpus.py pack boards.json corpus.fcor
+    python fifteen_corpus.py random corpus.fcor HEIGHT WIDTH COUNT
+    python fifteen_corpus.py solve corpus.fcor solutions.fsol [--method M]
+    python fifteen_corpus.py show solutions.fsol
+"""
+
+import array
+import json
+import mmap
+import struct
+import sys
+
+import fifteen_batch
+from fifteen_puzzle_final import Puzzle
+
+MAGIC = b"FCOR"
+VERSION = 1
+
+#magic, version, packing, height, width, padding up to 16 bytes
+HEADER = struct.Struct("<4sBBHH6x")
+
+#Record packings: a nibble per tile, or an array typecode per tile
+NIBBLE = 0
+PACKINGS = {NIBBLE: None, 1: "B", 2: "H", 4: "I"}
+
+#Length prefix of a solution that could not be found
+LENGTH = struct.Struct("<I")
+FAILED = 0xFFFFFFFF
+
+#Low and high nibbles of every byte value
+_NIBBLES = [(byte & 15, byte >> 4) for byte in range(256)]
+
+
+def packing(height, width):
+    """
+    Record packing used for a height x width board
+    Returns a key of PACKINGS
+    """
+    if height * width <= 16:
+        return NIBBLE
+    return array.array(fifteen_batch.tile_typecode(height, width)).itemsize
+
+
+def record_size(height, width):
+    """
+    Bytes taken by one board record
+    Returns an integer
+    """
+    size = height * width
+    kind = packing(height, width)
+    if kind == NIBBLE:
+        return (size + 1) // 2
+    return size * kind
+
+
+def pack(cells, height, width):
+    """
+    Pack a flat board into a record
+    Returns a bytes object
+    """
+    assert len(cells) == height * width, "board does not fit the shape"
+    kind = packing(height, width)
+    if kind != NIBBLE:
+        return array.array(PACKINGS[kind], cells).tobytes()
+    record = bytearray(record_size(height, width))
+    for idx, tile in enumerate(cells):
+        record[idx >> 1] |= tile << (4 * (idx & 1))
+    return bytes(record)
+
+
+def unpack(record, height, width):
+    """
+    Decode a record made by pack
+    Returns a flat list of tiles
+    """
+    size = height * width
+    kind = packing(height, width)
+    if kind == NIBBLE:
+        cells = []
+        for byte in record:
+            cells.extend(_NIBBLES[byte])
+        return cells[:size]
+    if kind == 1:
+        return list(record)
+    return list(memoryview(record).cast(PACKINGS[kind]))
+
+
+class CorpusWriter(object):
+    """
+    Appends board records to a new corpus file
+    """
+
+    def __init__(self, path, height, width):
+        """
+        Create the file at path and write its header
+        """
+        self.height = height
+        self.width = width
+        self.count = 0
+        self._out = open(path, "wb")
+        self._out.write(HEADER.pack(MAGIC, VERSION, packing(height, width),
+                                    height, width))
+
+    def write(self, grid):
+        """
+        Append a board, given as rows or as a flat sequence
+        """
+        cells = fifteen_batch.flatten(grid, self.height, self.width)
+        self._out.write(pack(cells, self.height, self.width))
+        self.count += 1
+
+    def close(self):
+        """
+        Flush and close the file
+        """
+        self._out.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class CorpusReader(object):
+    """
+    Read-only view of a corpus file mapped into memory
+    """
+
+    def __init__(self, path):
+        """
+        Map the file at path and check its header
+        """
+        with open(path, "rb") as source:
+            self._map = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, kind, height, width = HEADER.unpack_from(self._map)
+        assert magic == MAGIC, "not a corpus file: " + path
+        assert version == VERSION, "unknown version " + str(version)
+        assert kind == packing(height, width), "bad packing: " + path
+        self.height = height
+        self.width = width
+        self._size = record_size(height, width)
+        self._data = memoryview(self._map)[HEADER.size:]
+        assert len(self._data) % self._size == 0, "truncated corpus: " + path
+
+    def __len__(self):
+        """
+        Number of boards
+        Returns an integer
+        """
+        return len(self._data) // self._size
+
+    def record(self, index):
+        """
+        Packed record of a board, without copying
+        Returns a memoryview
+        """
+        assert 0 <= index < len(self), "no board " + str(index)
+        start = index * self._size
+        return self._data[start:start + self._size]
+
+    def board(self, index):
+        """
+        Decoded board
+        Returns a flat list of tiles
+        """
+        return unpack(self.record(index), self.height, self.width)
+
+    def __iter__(self):
+        """
+        Decode the boards in order, one at a time
+        Yields flat lists of tiles
+        """
+        for index in range(len(self)):
+            yield self.board(index)
+
+    def close(self):
+        """
+        Release the mapping
+        """
+        self._data.release()
+        self._map.close()
+
+
+def write_solution(out, mov_string):
+    """
+    Append a length-prefixed move string, or a failure record for None,
+    to a binary file
+    """
+    if mov_string is None:
+        out.write(LENGTH.pack(FAILED))
+        return
+    out.write(LENGTH.pack(len(mov_string)))
+    out.write(mov_string.encode("ascii"))
+
+
+def read_solutions(path):
+    """
+    Read a solution file one record at a time
+    Yields move strings, or None for boards that were not solved
+    """
+    with open(path, "rb") as source:
+        while True:
+            prefix = source.read(LENGTH.size)
+            if not prefix:
+                return
+            assert len(prefix) == LENGTH.size, "truncated solution file"
+            length = LENGTH.unpack(prefix)[0]
+            if length == FAILED:
+                yield None
+                continue
+            data = source.read(length)
+            assert len(data) == length, "truncated solution file"
+            yield data.decode("ascii")
+
+
+def solve_corpus(corpus_path, out_path, method="greedy", report=None,
+                 **options):
+    """
+    Stream every board of a corpus through a fifteen_batch solving method
+    and write the answers to out_path in board order.  Only one board is
+    decoded at a time.  report, if given, is called with the index and
+    error message of each board that fails.
+    Returns (boards solved, boards failed)
+    """
+    reader = CorpusReader(corpus_path)
+    solved = failed = 0
+    try:
+        with open(out_path, "wb") as out:
+            for index in range(len(reader)):
+                cells = reader.board(index)
+                puzzle = Puzzle(reader.height, reader.width,
+                                [cells[row * reader.width:
+                                       (row + 1) * reader.width]
+                                 for row in range(reader.height)])
+                try:
+                    mov_string = fifteen_batch.solve_one(puzzle, method,
+                                                         options)
+                except Exception as exc:
+                    if report is not None:
+                        report(index, "%s: %s" % (type(exc).__name__, exc))
+                    mov_string = None
+                write_solution(out, mov_string)
+                if mov_string is None:
+                    failed += 1
+                else:
+                    solved += 1
+    finally:
+        reader.close()
+    return solved, failed
+
+
+def main(argv=None):
+    """
+    Command line entry point, see the module docstring
+    Returns the process exit status
+    """
+    import argparse
+    parser = argparse.ArgumentParser(description="Fifteen puzzle corpora")
+    commands = parser.add_subparsers(dest="command")
+    pack_parser = commands.add_parser(
+        "pack", help="pack a JSON list of boards given as rows")
+    pack_parser.add_argument("source")
+    pack_parser.add_argument("out")
+    random_parser = commands.add_parser("random",
+                                        help="write random solvable boards")
+    random_parser.add_argument("out")
+    random_parser.add_argument("height", type=int)
+    random_parser.add_argument("width", type=int)
+    random_parser.add_argument("count", type=int)
+    random_parser.add_argument("--seed", type=int, default=0)
+    solve_parser = commands.add_parser("solve", help="solve every board")
+    solve_parser.add_argument("corpus")
+    solve_parser.add_argument("out")
+    solve_parser.add_argument("--method", choices=fifteen_batch.METHODS,
+                              default="greedy")
+    show_parser = commands.add_parser("show", help="print a solution file")
+    show_parser.add_argument("solutions")
+    args = parser.parse_args(argv)
+
+    if args.command == "pack":
+        with open(args.source) as source:
+            grids = json.load(source)
+        assert grids, "no boards in " + args.source
+        height, width = len(grids[0]), len(grids[0][0])
+        with CorpusWriter(args.out, height, width) as writer:
+            for grid in grids:
+                writer.write(grid)
+        print("%d boards of %dx%d" % (writer.count, height, width))
+        return 0
+    elif args.command == "random":
+        import fifteen_generate
+        fifteen_generate.generate_corpus(args.out, args.height, args.width,
+                                         args.count, seed=args.seed)
+        return 0
+    elif args.command == "solve":
+        def report(index, error):
+            sys.stderr.write("board %d: %s\n" % (index, error))
+        solved, failed = solve_corpus(args.corpus, args.out, args.method,
+                                      report)
+        print("%d solved, %d failed" % (solved, failed))
+        return 1 if failed else 0
+    elif args.command == "show":
+        for mov_string in read_solutions(args.solutions):
+            print("-" if mov_string is None else mov_string)
+        return 0
+    parser.print_help()
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""
+Complete distance table for the 3x3 (eight) puzzle
+Boards are indexed by the rank of their permutation, 0 to 9! - 1.  A
+breadth-first search from the solved board (blank in the upper left)
+gives every solvable board its distance, stored modulo 15 in four bits;
+the value 15 marks the unsolvable half.  Neighbouring boards are always
+exactly one move nearer or farther, so distances modulo 15 are enough to
+walk down to the goal: an optimal solve only looks at the neighbours of
+the boards on its path.  The table is a 181440-byte file that is mapped
+back with mmap.
+
+Run as a script to build the table and report its size and solve speed.
+"""
+
+import mmap
+import os
+import struct
+import time
+
+import fifteen_bitboard
+import fifteen_search
+
+MAGIC = b"F8DT"
+VERSION = 1
+HEIGHT = 3
+WIDTH = 3
+SIZE = HEIGHT * WIDTH
+
+#Number of permutations of the nine cells
+STATES = 362880
+
+#Distances are stored modulo MODULUS; UNSOLVABLE marks the other values
+MODULUS = 15
+UNSOLVABLE = 15
+
+_LOADED = {}
+
+
+def default_path():
+    """
+    Location the solver looks in for the table
+    Returns a string
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(here, "fifteen_3x3.dist")
+
+
+#########################################################
+# Permutation ranks
+
+def rank(cells):
+    """
+    Lexicographic rank of a permutation of range(len(cells))
+    Returns an integer from 0 to len(cells)! - 1
+    """
+    size = len(cells)
+    index = 0
+    for idx in range(size):
+        tile = cells[idx]
+        smaller = 0
+        for later in cells[idx + 1:]:
+            if later < tile:
+                smaller += 1
+        index = index * (size - idx) + smaller
+    return index
+
+
+def unrank(index, size=SIZE):
+    """
+    Permutation of range(size) with the given lexicographic rank
+    Returns a list of integers
+    """
+    digits = []
+    for radix in range(1, size + 1):
+        index, digit = divmod(index, radix)
+        digits.append(digit)
+    digits.reverse()
+    remaining = list(range(size))
+    return [remaining.pop(digit) for digit in digits]
+
+
+#########################################################
+# Building
+
+def build(path=None):
+    """
+    Run the breadth-first search over every 3x3 board and write the
+    packed table to path, the default path if not given
+    Returns the number of solvable boards
+    """
+    if path is None:
+        path = default_path()
+    space = fifteen_bitboard.BitBoardSpace(HEIGHT, WIDTH)
+    distances = space.bfs_distances()
+    #Two four-bit values per byte, the even rank in the low half
+    table = bytearray([UNSOLVABLE | UNSOLVABLE << 4]) * (STATES // 2)
+    for bits, distance in distances.items():
+        index = rank(fifteen_bitboard.unpack(bits, SIZE))
+        shift = 4 * (index & 1)
+        table[index >> 1] &= ~(15 << shift) & 255
+        table[index >> 1] |= (distance % MODULUS) << shift
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as out:
+        out.write(MAGIC + struct.pack("<BBB", VERSION, HEIGHT, WIDTH))
+        out.write(table)
+    os.rename(tmp_path, path)
+    return len(distances)
+
+
+#########################################################
+# Loading and solving
+
+class DistanceTable(object):
+    """
+    Read-only view of a table file mapped into memory
+    """
+
+    def __init__(self, path):
+        """
+        Map the file at path
+        """
+        with open(path, "rb") as source:
+            self._map = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        data = memoryview(self._map)
+        assert data[:4].tobytes() == MAGIC, "not a distance table: " + path
+        version, height, width = struct.unpack_from("<BBB", data, 4)
+        assert version == VERSION, "unknown version " + str(version)
+        assert (height, width) == (HEIGHT, WIDTH), "not a 3x3 table: " + path
+        self._table = data[7:]
+        assert len(self._table) == STATES // 2, "truncated table: " + path
+        self._moves = fifteen_search.move_table(HEIGHT, WIDTH)
+
+    def __len__(self):
+        """
+        Size of the mapped file in bytes
+        Returns an integer
+        """
+        return len(self._map)
+
+    def value(self, cells):
+        """
+        Stored value of a flat 3x3 board: its distance modulo 15, or
+        UNSOLVABLE
+        Returns an integer
+        """
+        index = rank(cells)
+        return (self._table[index >> 1] >> (4 * (index & 1))) & 15
+
+    def solve(self, cells):
+        """
+        Shortest move string for a flat 3x3 board, found by always moving
+        to the neighbour one step nearer the goal
+        Returns a move string, or None if the board cannot be solved
+        """
+        cells = list(cells)
+        value = self.value(cells)
+        if value == UNSOLVABLE:
+            return None
+        goal = list(range(SIZE))
+        blank = cells.index(0)
+        path = []
+        while cells != goal:
+            nearer = (value - 1) % MODULUS
+            for direction, tile_idx, _ in self._moves[blank]:
+                cells[blank] = cells[tile_idx]
+                cells[tile_idx] = 0
+                if self.value(cells) == nearer:
+                    break
+                cells[tile_idx] = cells[blank]
+                cells[blank] = 0
+            else:
+                assert False, "distance table is inconsistent"
+            path.append(direction)
+            blank = tile_idx
+            value = nearer
+        return "".join(path)
+
+    def distance(self, cells):
+        """
+        Number of moves in a shortest solution of a flat 3x3 board
+        Returns an integer, or None if the board cannot be solved
+        """
+        mov_string = self.solve(cells)
+        if mov_string is None:
+            return None
+        return len(mov_string)
+
+
+def load(path):
+    """
+    Map the table file at path, sharing one mapping per process
+    Returns a DistanceTable
+    """
+    path = os.path.abspath(path)
+    table = _LOADED.get(path)
+    if table is None:
+        table = DistanceTable(path)
+        _LOADED[path] = table
+    return table
+
+
+def find_table():
+    """
+    Load the default table if it was built
+    Returns a DistanceTable, or None
+    """
+    path = default_path()
+    if not os.path.exists(path):
+        return None
+    return load(path)
+
+
+def main():
+    """
+    Build the 3x3 distance table and report build time, file size and
+    solve speed
+    """
+    import argparse
+    import random
+    parser = argparse.ArgumentParser(description=main.__doc__.strip())
+    parser.add_argument("--out", default=default_path())
+    args = parser.parse_args()
+
+    start = time.time()
+    count = build(args.out)
+    print("built %s: %d solvable boards in %.1f s" %
+          (args.out, count, time.time() - start))
+    table = load(args.out)
+    print("file size: %d bytes" % len(table))
+
+    rng = random.Random(0)
+    boards = []
+    while len(boards) < 1000:
+        cells = unrank(rng.randrange(STATES))
+        if table.value(cells) != UNSOLVABLE:
+            boards.append(cells)
+    start = time.time()
+    moves = sum(len(table.solve(cells)) for cells in boards)
+    elapsed = time.time() - start
+    print("solve: %.1f us per board, %.1f moves on average" %
+          (elapsed / len(boards) * 1e6, moves / float(len(boards))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Endgame tables for the Fifteen puzzle
+Once everything outside the upper left corner is solved, the corner region
+is finished from a table.  The tables are built by breadth-first search
+from the solved region when this module is imported; they map every
+reachable arrangement of a 2x2, 2x3 or 3x2 corner to its shortest
+finishing move string.  Arrangements missing from a table cannot be
+solved.
+"""
+
+import collections
+
+import fifteen_search
+
+SHAPES = ((2, 2), (2, 3), (3, 2))
+
+
+def build_table(rows, cols):
+    """
+    Breadth-first search over the arrangements of a rows x cols region.
+    An arrangement lists, for each region cell in row-major order, the
+    region cell its tile belongs in, with the blank as zero.
+    Returns a dict mapping arrangements to shortest solving move strings
+    """
+    goal = tuple(range(rows * cols))
+    moves = fifteen_search.move_table(rows, cols)
+    table = {goal: ""}
+    queue = collections.deque([(goal, 0)])
+    while queue:
+        state, blank = queue.popleft()
+        for _, cell, inverse in moves[blank]:
+            child = list(state)
+            child[blank], child[cell] = child[cell], 0
+            child = tuple(child)
+            if child not in table:
+                #Undo this move first, then follow the parent's solution
+                table[child] = inverse + table[state]
+                queue.append((child, cell))
+    return table
+
+
+TABLES = dict((shape, build_table(*shape)) for shape in SHAPES)
+
+
+def lookup(cells, width, rows, cols):
+    """
+    Finishing move string for the upper left rows x cols region of a flat
+    board of the given width
+    Returns a move string, or None if the region cannot be solved on its
+    own
+    """
+    key = []
+    for row in range(rows):
+        for col in range(cols):
+            tile_row, tile_col = divmod(cells[row * width + col], width)
+            if tile_row >= rows or tile_col >= cols:
+                return None
+            key.append(tile_row * cols + tile_col)
+    return TABLES[(rows, cols)].get(tuple(key))
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+Fast generation of random solvable Fifteen puzzle boards with NumPy
+Boards are made a batch at a time as an (N, height * width) array, the
+layout fifteen_verify works on.  Uniform boards come from shuffling every
+row and swapping two tiles on the rows with the wrong parity; the swap
+flips the parity without moving the blank, so the result is uniform over
+the solvable boards.  Boards of controlled difficulty come from random
+walks of the blank away from the solved board, applied to every row at
+once.  Batches can be written straight into a fifteen_corpus file.
+
+Usage:
+    python fifteen_generate.py out.fcor HEIGHT WIDTH COUNT [--walk K]
+"""
+
+import sys
+
+import numpy as np
+
+import fifteen_corpus
+
+#Boards with at most this many cells count inversions pairwise, which is
+#quicker than the swap sort until the quadratic term takes over
+SMALL_BOARD = 64
+
+#Direction codes of a random walk, in the order of DIRECTIONS
+DIRECTIONS = "lrud"
+_REVERSE = (1, 0, 3, 2)
+
+
+def tile_dtype(height, width):
+    """
+    Smallest unsigned dtype that holds every tile of a height x width board
+    Returns a numpy dtype
+    """
+    return np.min_scalar_type(height * width - 1)
+
+
+def _permutation_parity(boards):
+    """
+    Parity of every row of an (N, size) array of permutations, found by
+    sorting the rows with swaps, one cell at a time, and counting the
+    swaps
+    Returns an integer array of 0s and 1s
+    """
+    count, size = boards.shape
+    rows = np.arange(count)
+    cells = boards.astype(np.int64)
+    where = np.argsort(cells, axis=1)
+    parity = np.zeros(count, dtype=np.int64)
+    for idx in range(size):
+        other = where[:, idx]
+        parity ^= other != idx
+        moved = cells[:, idx].copy()
+        cells[rows, other] = moved
+        where[rows, moved] = other
+        cells[:, idx] = idx
+        where[:, idx] = idx
+    return parity
+
+
+def solvable(boards, height, width):
+    """
+    Solvability of every row of an (N, height * width) array, by the same
+    rule as Puzzle.is_solvable: the inversions among the tiles, plus the
+    blank's row on boards of even width, must be even
+    Returns a boolean array of length N
+    """
+    boards = np.asarray(boards).reshape(-1, height * width)
+    count, size = boards.shape
+    blank = np.argmax(boards == 0, axis=1)
+    if size <= SMALL_BOARD:
+        #Count the tile inversions against each later column directly
+        parity = np.zeros(count, dtype=np.int64)
+        for idx in range(size - 1):
+            later = boards[:, idx + 1:]
+            parity ^= np.count_nonzero((boards[:, idx:idx + 1] > later) &
+                                       (later != 0), axis=1) & 1
+    else:
+        parity = _permutation_parity(boards)
+        #The blank is the smallest value, so it is inverted with every
+        #cell in front of it; drop those to count tile inversions only
+        parity ^= blank & 1
+    if width % 2 == 0:
+        parity ^= (blank // width) & 1
+    return parity == 0
+
+
+def random_boards(count, height, width, rng):
+    """
+    count boards drawn uniformly from the solvable height x width boards.
+    rng is a numpy Generator, e.g. np.random.default_rng(seed).
+    Returns an (count, height * width) array
+    """
+    size = height * width
+    assert size >= 3, "board too small to fix the parity"
+    base = np.arange(size, dtype=tile_dtype(height, width))
+    boards = rng.permuted(np.tile(base, (count, 1)), axis=1)
+    fix = np.nonzero(~solvable(boards, height, width))[0]
+    if len(fix):
+        #Swap the first two cells that do not hold the blank
+        blank = np.argmax(boards[fix] == 0, axis=1)
+        first = np.where(blank == 0, 1, 0)
+        second = np.where(blank <= 1, 2, 1)
+        held = boards[fix, first].copy()
+        boards[fix, first] = boards[fix, second]
+        boards[fix, second] = held
+    return boards
+
+
+def _walk_table(height, width):
+    """
+    Moves a random walk may take, for every blank cell and previous
+    direction (4 for none), never undoing the previous move
+    Returns (choices, counts, deltas) arrays
+    """
+    size = height * width
+    choices = np.zeros((size, 5, 4), dtype=np.int64)
+    counts = np.zeros((size, 5), dtype=np.int64)
+    for blank in range(size):
+        row, col = divmod(blank, width)
+        legal = [code for code, ok in enumerate((col > 0, col < width - 1,
+                                                 row > 0, row < height - 1))
+                 if ok]
+        for previous in range(5):
+            allowed = [code for code in legal
+                       if previous == 4 or code != _REVERSE[previous]]
+            choices[blank, previous, :len(allowed)] = allowed
+            counts[blank, previous] = len(allowed)
+    deltas = np.array([-1, 1, -width, width], dtype=np.int64)
+    return choices, counts, deltas
+
+
+def random_walk_boards(count, height, width, moves, rng):
+    """
+    count boards made by walking the blank moves random steps from the
+    solved board, never straight back; their distance from the solved
+    board is at most moves.  rng is a numpy Generator.
+    Returns an (count, height * width) array
+    """
+    size = height * width
+    choices, counts, deltas = _walk_table(height, width)
+    boards = np.tile(np.arange(size, dtype=tile_dtype(height, width)),
+                     (count, 1))
+    #Index the boards as one flat array, each row starting at its offset
+    flat = boards.reshape(-1)
+    offsets = np.arange(count, dtype=np.int64) * size
+    blank = np.zeros(count, dtype=np.int64)
+    previous = np.full(count, 4, dtype=np.int64)
+    for _ in range(moves):
+        pick = (rng.random(count) * counts[blank, previous]).astype(np.int64)
+        previous = choices[blank, previous, pick]
+        tile = blank + deltas[previous]
+        flat[offsets + blank] = flat[offsets + tile]
+        flat[offsets + tile] = 0
+        blank = tile
+    return boards
+
+
+def write_corpus(out, boards, height, width):
+    """
+    Append a batch of boards as fifteen_corpus records to an open binary
+    file whose header is already written
+    """
+    boards = np.asarray(boards).reshape(-1, height * width)
+    kind = fifteen_corpus.packing(height, width)
+    if kind != fifteen_corpus.NIBBLE:
+        dtype = np.dtype("<u%d" % kind)
+        out.write(boards.astype(dtype).tobytes())
+        return
+    size = height * width
+    padded = np.zeros((boards.shape[0], size + size % 2), dtype=np.uint8)
+    padded[:, :size] = boards
+    out.write((padded[:, 0::2] | (padded[:, 1::2] << 4)).tobytes())
+
+
+def generate_corpus(path, height, width, count, walk=None, seed=0,
+                    batch=100000):
+    """
+    Write count random solvable boards to a fifteen_corpus file, made
+    batch boards at a time; walk, if given, makes random walks of that
+    many moves instead of uniform boards
+    """
+    rng = np.random.default_rng(seed)
+    with open(path, "wb") as out:
+        out.write(fifteen_corpus.HEADER.pack(
+            fifteen_corpus.MAGIC, fifteen_corpus.VERSION,
+            fifteen_corpus.packing(height, width), height, width))
+        done = 0
+        while done < count:
+            size = min(batch, count - done)
+            if walk is None:
+                boards = random_boards(size, height, width, rng)
+            else:
+                boards = random_walk_boards(size, height, width, walk, rng)
+            write_corpus(out, boards, height, width)
+            done += size
+
+
+def main(argv=None):
+    """
+    Command line entry point, see the module docstring
+    """
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Random solvable boards")
+    parser.add_argument("out")
+    parser.add_argument("height", type=int)
+    parser.add_argument("width", type=int)
+    parser.add_argument("count", type=int)
+    parser.add_argument("--walk", type=int, default=None,
+                        help="random walks of this many moves")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch", type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    start = time.time()
+    generate_corpus(args.out, args.height, args.width, args.count,
+                    args.walk, args.seed, args.batch)
+    elapsed = time.time() - start
+    sys.stderr.write("%d boards in %.2f s (%.0f boards/s)\n" %
+                     (args.count, elapsed, args.count / max(elapsed, 1e-9)))
+
+
+if __name__ == "__main__":
+    main()
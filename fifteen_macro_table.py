@@ -0,0 +1,502 @@
+# -*- coding: utf-8 -*-
+"""
+Placement macros for the greedy solver
+Generated by fifteen_macros.py; do not edit.
+Keys are (kind, left reach, right reach, target tile cell, blank cell)
+"""
+
+MACROS = {
+    ('col0', 0, 1, 0, 1): 'lddruuldrdlur',
+    ('col0', 0, 1, 0, 2): 'drulurddlur',
+    ('col0', 0, 1, 0, 3): 'ldrulurddlur',
+    ('col0', 0, 1, 0, 4): 'rulurddlur',
+    ('col0', 0, 1, 1, 0): 'ddruuldrdlur',
+    ('col0', 0, 1, 1, 2): 'druuldrdlur',
+    ('col0', 0, 1, 1, 3): 'ldruuldrdlur',
+    ('col0', 0, 1, 1, 4): 'ruuldrdlur',
+    ('col0', 0, 1, 2, 0): 'ddrulurddlur',
+    ('col0', 0, 1, 2, 1): 'lddrulurddlur',
+    ('col0', 0, 1, 2, 3): 'ulddrulurddlur',
+    ('col0', 0, 1, 2, 4): 'ur',
+    ('col0', 0, 1, 3, 0): 'rdldruuldrdlur',
+    ('col0', 0, 1, 3, 1): 'dldruuldrdlur',
+    ('col0', 0, 1, 3, 2): 'urdldruuldrdlur',
+    ('col0', 0, 1, 3, 4): 'uurdldruuldrdlur',
+    ('col0', 0, 1, 4, 0): 'dr',
+    ('col0', 0, 1, 4, 1): 'd',
+    ('col0', 0, 1, 4, 2): 'r',
+    ('col0', 0, 1, 4, 3): '',
+    ('col0', 0, 2, 0, 1): 'lddruuldrdlurr',
+    ('col0', 0, 2, 0, 2): 'llddruuldrdlurr',
+    ('col0', 0, 2, 0, 3): 'drulurddlurr',
+    ('col0', 0, 2, 0, 4): 'ldrulurddlurr',
+    ('col0', 0, 2, 0, 5): 'lldrulurddlurr',
+    ('col0', 0, 2, 0, 6): 'rulurddlurr',
+    ('col0', 0, 2, 1, 0): 'ddruuldrdlurr',
+    ('col0', 0, 2, 1, 2): 'dlurddluldrru',
+    ('col0', 0, 2, 1, 3): 'druuldrdlurr',
+    ('col0', 0, 2, 1, 4): 'urddluldrru',
+    ('col0', 0, 2, 1, 5): 'lurddluldrru',
+    ('col0', 0, 2, 1, 6): 'ruuldrdlurr',
+    ('col0', 0, 2, 2, 0): 'drruldrdluldrru',
+    ('col0', 0, 2, 2, 1): 'druldrdluldrru',
+    ('col0', 0, 2, 2, 3): 'rruldrdluldrru',
+    ('col0', 0, 2, 2, 4): 'ruldrdluldrru',
+    ('col0', 0, 2, 2, 5): 'uldrdluldrru',
+    ('col0', 0, 2, 2, 6): 'ruurdluldrdlurr',
+    ('col0', 0, 2, 3, 0): 'rdrdllurdru',
+    ('col0', 0, 2, 3, 1): 'drdllurdru',
+    ('col0', 0, 2, 3, 2): 'ddllurdru',
+    ('col0', 0, 2, 3, 4): 'rdllurdru',
+    ('col0', 0, 2, 3, 5): 'dllurdru',
+    ('col0', 0, 2, 3, 6): 'urr',
+    ('col0', 0, 2, 4, 0): 'rrddluldrru',
+    ('col0', 0, 2, 4, 1): 'rddluldrru',
+    ('col0', 0, 2, 4, 2): 'ddluldrru',
+    ('col0', 0, 2, 4, 3): 'rrdllurdru',
+    ('col0', 0, 2, 4, 5): 'dluldrru',
+    ('col0', 0, 2, 4, 6): 'urrdllurdru',
+    ('col0', 0, 2, 5, 0): 'drrdluldrru',
+    ('col0', 0, 2, 5, 1): 'drdluldrru',
+    ('col0', 0, 2, 5, 2): 'ldrdluldrru',
+    ('col0', 0, 2, 5, 3): 'rrdluldrru',
+    ('col0', 0, 2, 5, 4): 'rdluldrru',
+    ('col0', 0, 2, 5, 6): 'urrdluldrru',
+    ('col0', 0, 2, 6, 0): 'drr',
+    ('col0', 0, 2, 6, 1): 'dr',
+    ('col0', 0, 2, 6, 2): 'd',
+    ('col0', 0, 2, 6, 3): 'rr',
+    ('col0', 0, 2, 6, 4): 'r',
+    ('col0', 0, 2, 6, 5): '',
+    ('interior', 1, 0, 0, 1): 'dlurddlurdl',
+    ('interior', 1, 0, 0, 2): 'urddlurdl',
+    ('interior', 1, 0, 0, 3): 'lurddlurdl',
+    ('interior', 1, 0, 0, 4): 'uurddlurdl',
+    ('interior', 1, 0, 0, 5): 'ulurddlurdl',
+    ('interior', 1, 0, 1, 0): 'drulddruld',
+    ('interior', 1, 0, 1, 2): 'rulddruld',
+    ('interior', 1, 0, 1, 3): 'ulddruld',
+    ('interior', 1, 0, 1, 4): 'urulddruld',
+    ('interior', 1, 0, 1, 5): 'uulddruld',
+    ('interior', 1, 0, 2, 0): 'rddlurdl',
+    ('interior', 1, 0, 2, 1): 'ddlurdl',
+    ('interior', 1, 0, 2, 3): 'dlurdl',
+    ('interior', 1, 0, 2, 4): 'urdl',
+    ('interior', 1, 0, 2, 5): 'lurdl',
+    ('interior', 1, 0, 3, 0): 'ddruld',
+    ('interior', 1, 0, 3, 1): 'lddruld',
+    ('interior', 1, 0, 3, 2): 'druld',
+    ('interior', 1, 0, 3, 4): 'ruld',
+    ('interior', 1, 0, 3, 5): 'uld',
+    ('interior', 1, 0, 4, 0): 'drdl',
+    ('interior', 1, 0, 4, 1): 'ddl',
+    ('interior', 1, 0, 4, 2): 'rdl',
+    ('interior', 1, 0, 4, 3): 'dl',
+    ('interior', 1, 0, 4, 5): 'l',
+    ('interior', 1, 0, 5, 0): 'dd',
+    ('interior', 1, 0, 5, 1): 'dld',
+    ('interior', 1, 0, 5, 2): 'd',
+    ('interior', 1, 0, 5, 3): 'ld',
+    ('interior', 1, 0, 5, 4): '',
+    ('interior', 1, 1, 0, 1): 'dlurddlurdl',
+    ('interior', 1, 1, 0, 2): 'dllurddlurdl',
+    ('interior', 1, 1, 0, 3): 'urddlurdl',
+    ('interior', 1, 1, 0, 4): 'lurddlurdl',
+    ('interior', 1, 1, 0, 5): 'llurddlurdl',
+    ('interior', 1, 1, 0, 6): 'uurddlurdl',
+    ('interior', 1, 1, 0, 7): 'ulurddlurdl',
+    ('interior', 1, 1, 1, 0): 'drulddruld',
+    ('interior', 1, 1, 1, 2): 'dlulddruld',
+    ('interior', 1, 1, 1, 3): 'rulddruld',
+    ('interior', 1, 1, 1, 4): 'ulddruld',
+    ('interior', 1, 1, 1, 5): 'lulddruld',
+    ('interior', 1, 1, 1, 6): 'urulddruld',
+    ('interior', 1, 1, 1, 7): 'uulddruld',
+    ('interior', 1, 1, 2, 0): 'rrdlulddruld',
+    ('interior', 1, 1, 2, 1): 'rdlulddruld',
+    ('interior', 1, 1, 2, 3): 'urrdlulddruld',
+    ('interior', 1, 1, 2, 4): 'urdlulddruld',
+    ('interior', 1, 1, 2, 5): 'uldrullddruld',
+    ('interior', 1, 1, 2, 6): 'rruuldrdluld',
+    ('interior', 1, 1, 2, 7): 'ruuldrdluld',
+    ('interior', 1, 1, 3, 0): 'rddlurdl',
+    ('interior', 1, 1, 3, 1): 'ddlurdl',
+    ('interior', 1, 1, 3, 2): 'dldlurdl',
+    ('interior', 1, 1, 3, 4): 'dlurdl',
+    ('interior', 1, 1, 3, 5): 'ldlurdl',
+    ('interior', 1, 1, 3, 6): 'urdl',
+    ('interior', 1, 1, 3, 7): 'lurdl',
+    ('interior', 1, 1, 4, 0): 'ddruld',
+    ('interior', 1, 1, 4, 1): 'lddruld',
+    ('interior', 1, 1, 4, 2): 'llddruld',
+    ('interior', 1, 1, 4, 3): 'druld',
+    ('interior', 1, 1, 4, 5): 'ullddruld',
+    ('interior', 1, 1, 4, 6): 'ruld',
+    ('interior', 1, 1, 4, 7): 'uld',
+    ('interior', 1, 1, 5, 0): 'drrullddruld',
+    ('interior', 1, 1, 5, 1): 'drullddruld',
+    ('interior', 1, 1, 5, 2): 'ldrullddruld',
+    ('interior', 1, 1, 5, 3): 'rrullddruld',
+    ('interior', 1, 1, 5, 4): 'rullddruld',
+    ('interior', 1, 1, 5, 6): 'urrullddruld',
+    ('interior', 1, 1, 5, 7): 'urullddruld',
+    ('interior', 1, 1, 6, 0): 'drdl',
+    ('interior', 1, 1, 6, 1): 'ddl',
+    ('interior', 1, 1, 6, 2): 'dldl',
+    ('interior', 1, 1, 6, 3): 'rdl',
+    ('interior', 1, 1, 6, 4): 'dl',
+    ('interior', 1, 1, 6, 5): 'ldl',
+    ('interior', 1, 1, 6, 7): 'l',
+    ('interior', 1, 1, 7, 0): 'dd',
+    ('interior', 1, 1, 7, 1): 'dld',
+    ('interior', 1, 1, 7, 2): 'dlld',
+    ('interior', 1, 1, 7, 3): 'd',
+    ('interior', 1, 1, 7, 4): 'ld',
+    ('interior', 1, 1, 7, 5): 'lld',
+    ('interior', 1, 1, 7, 6): '',
+    ('interior', 2, 0, 0, 1): 'dlurdldrurdl',
+    ('interior', 2, 0, 0, 2): 'dllurdldrurdl',
+    ('interior', 2, 0, 0, 3): 'urdldrurdl',
+    ('interior', 2, 0, 0, 4): 'lurdldrurdl',
+    ('interior', 2, 0, 0, 5): 'llurdldrurdl',
+    ('interior', 2, 0, 0, 6): 'uurdldrurdl',
+    ('interior', 2, 0, 0, 7): 'ulurdldrurdl',
+    ('interior', 2, 0, 0, 8): 'ullurdldrurdl',
+    ('interior', 2, 0, 1, 0): 'drulddrurdl',
+    ('interior', 2, 0, 1, 2): 'dlulddrurdl',
+    ('interior', 2, 0, 1, 3): 'rulddrurdl',
+    ('interior', 2, 0, 1, 4): 'ulddrurdl',
+    ('interior', 2, 0, 1, 5): 'lulddrurdl',
+    ('interior', 2, 0, 1, 6): 'urulddrurdl',
+    ('interior', 2, 0, 1, 7): 'uulddrurdl',
+    ('interior', 2, 0, 1, 8): 'ululddrurdl',
+    ('interior', 2, 0, 2, 0): 'drrulddruld',
+    ('interior', 2, 0, 2, 1): 'drulddruld',
+    ('interior', 2, 0, 2, 3): 'rrulddruld',
+    ('interior', 2, 0, 2, 4): 'rulddruld',
+    ('interior', 2, 0, 2, 5): 'ulddruld',
+    ('interior', 2, 0, 2, 6): 'urrulddruld',
+    ('interior', 2, 0, 2, 7): 'urulddruld',
+    ('interior', 2, 0, 2, 8): 'uulddruld',
+    ('interior', 2, 0, 3, 0): 'rdldrurdl',
+    ('interior', 2, 0, 3, 1): 'dldrurdl',
+    ('interior', 2, 0, 3, 2): 'dlldrurdl',
+    ('interior', 2, 0, 3, 4): 'ldrurdl',
+    ('interior', 2, 0, 3, 5): 'lldrurdl',
+    ('interior', 2, 0, 3, 6): 'urdlurrdl',
+    ('interior', 2, 0, 3, 7): 'uldrurdl',
+    ('interior', 2, 0, 3, 8): 'ulldrurdl',
+    ('interior', 2, 0, 4, 0): 'ddrurdl',
+    ('interior', 2, 0, 4, 1): 'lddrurdl',
+    ('interior', 2, 0, 4, 2): 'ddlurdl',
+    ('interior', 2, 0, 4, 3): 'drurdl',
+    ('interior', 2, 0, 4, 5): 'dlurdl',
+    ('interior', 2, 0, 4, 6): 'rurdl',
+    ('interior', 2, 0, 4, 7): 'urdl',
+    ('interior', 2, 0, 4, 8): 'lurdl',
+    ('interior', 2, 0, 5, 0): 'ddrruld',
+    ('interior', 2, 0, 5, 1): 'ddruld',
+    ('interior', 2, 0, 5, 2): 'lddruld',
+    ('interior', 2, 0, 5, 3): 'drruld',
+    ('interior', 2, 0, 5, 4): 'druld',
+    ('interior', 2, 0, 5, 6): 'rruld',
+    ('interior', 2, 0, 5, 7): 'ruld',
+    ('interior', 2, 0, 5, 8): 'uld',
+    ('interior', 2, 0, 6, 0): 'drdlurrdl',
+    ('interior', 2, 0, 6, 1): 'ddlurrdl',
+    ('interior', 2, 0, 6, 2): 'ddllurrdl',
+    ('interior', 2, 0, 6, 3): 'rdlurrdl',
+    ('interior', 2, 0, 6, 4): 'dlurrdl',
+    ('interior', 2, 0, 6, 5): 'dllurrdl',
+    ('interior', 2, 0, 6, 7): 'lurrdl',
+    ('interior', 2, 0, 6, 8): 'llurrdl',
+    ('interior', 2, 0, 7, 0): 'drrdl',
+    ('interior', 2, 0, 7, 1): 'drdl',
+    ('interior', 2, 0, 7, 2): 'ddl',
+    ('interior', 2, 0, 7, 3): 'rrdl',
+    ('interior', 2, 0, 7, 4): 'rdl',
+    ('interior', 2, 0, 7, 5): 'dl',
+    ('interior', 2, 0, 7, 6): 'urrdl',
+    ('interior', 2, 0, 7, 8): 'l',
+    ('interior', 2, 0, 8, 0): 'ddr',
+    ('interior', 2, 0, 8, 1): 'dd',
+    ('interior', 2, 0, 8, 2): 'dld',
+    ('interior', 2, 0, 8, 3): 'dr',
+    ('interior', 2, 0, 8, 4): 'd',
+    ('interior', 2, 0, 8, 5): 'ld',
+    ('interior', 2, 0, 8, 6): 'r',
+    ('interior', 2, 0, 8, 7): '',
+    ('interior', 2, 1, 0, 1): 'dlurdldrurdl',
+    ('interior', 2, 1, 0, 2): 'dllurdldrurdl',
+    ('interior', 2, 1, 0, 3): 'dlllurdldrurdl',
+    ('interior', 2, 1, 0, 4): 'urdldrurdl',
+    ('interior', 2, 1, 0, 5): 'lurdldrurdl',
+    ('interior', 2, 1, 0, 6): 'llurdldrurdl',
+    ('interior', 2, 1, 0, 7): 'lllurdldrurdl',
+    ('interior', 2, 1, 0, 8): 'uurdldrurdl',
+    ('interior', 2, 1, 0, 9): 'ulurdldrurdl',
+    ('interior', 2, 1, 0, 10): 'ullurdldrurdl',
+    ('interior', 2, 1, 1, 0): 'drulddrurdl',
+    ('interior', 2, 1, 1, 2): 'dlulddrurdl',
+    ('interior', 2, 1, 1, 3): 'dllulddrurdl',
+    ('interior', 2, 1, 1, 4): 'rulddrurdl',
+    ('interior', 2, 1, 1, 5): 'ulddrurdl',
+    ('interior', 2, 1, 1, 6): 'lulddrurdl',
+    ('interior', 2, 1, 1, 7): 'llulddrurdl',
+    ('interior', 2, 1, 1, 8): 'urulddrurdl',
+    ('interior', 2, 1, 1, 9): 'uulddrurdl',
+    ('interior', 2, 1, 1, 10): 'ululddrurdl',
+    ('interior', 2, 1, 2, 0): 'drrulddruld',
+    ('interior', 2, 1, 2, 1): 'drulddruld',
+    ('interior', 2, 1, 2, 3): 'dlulddruld',
+    ('interior', 2, 1, 2, 4): 'rrulddruld',
+    ('interior', 2, 1, 2, 5): 'rulddruld',
+    ('interior', 2, 1, 2, 6): 'ulddruld',
+    ('interior', 2, 1, 2, 7): 'lulddruld',
+    ('interior', 2, 1, 2, 8): 'urrulddruld',
+    ('interior', 2, 1, 2, 9): 'urulddruld',
+    ('interior', 2, 1, 2, 10): 'uulddruld',
+    ('interior', 2, 1, 3, 0): 'rrrdlulddruld',
+    ('interior', 2, 1, 3, 1): 'rrdlulddruld',
+    ('interior', 2, 1, 3, 2): 'rdlulddruld',
+    ('interior', 2, 1, 3, 4): 'urrrdlulddruld',
+    ('interior', 2, 1, 3, 5): 'urrdlulddruld',
+    ('interior', 2, 1, 3, 6): 'urdlulddruld',
+    ('interior', 2, 1, 3, 7): 'uldrullddruld',
+    ('interior', 2, 1, 3, 8): 'rrruuldrdluld',
+    ('interior', 2, 1, 3, 9): 'rruuldrdluld',
+    ('interior', 2, 1, 3, 10): 'ruuldrdluld',
+    ('interior', 2, 1, 4, 0): 'rdldrurdl',
+    ('interior', 2, 1, 4, 1): 'dldrurdl',
+    ('interior', 2, 1, 4, 2): 'dlldrurdl',
+    ('interior', 2, 1, 4, 3): 'dllldrurdl',
+    ('interior', 2, 1, 4, 5): 'ldrurdl',
+    ('interior', 2, 1, 4, 6): 'lldrurdl',
+    ('interior', 2, 1, 4, 7): 'llldrurdl',
+    ('interior', 2, 1, 4, 8): 'urdlurrdl',
+    ('interior', 2, 1, 4, 9): 'uldrurdl',
+    ('interior', 2, 1, 4, 10): 'ulldrurdl',
+    ('interior', 2, 1, 5, 0): 'ddrurdl',
+    ('interior', 2, 1, 5, 1): 'lddrurdl',
+    ('interior', 2, 1, 5, 2): 'ddlurdl',
+    ('interior', 2, 1, 5, 3): 'dldlurdl',
+    ('interior', 2, 1, 5, 4): 'drurdl',
+    ('interior', 2, 1, 5, 6): 'dlurdl',
+    ('interior', 2, 1, 5, 7): 'ldlurdl',
+    ('interior', 2, 1, 5, 8): 'rurdl',
+    ('interior', 2, 1, 5, 9): 'urdl',
+    ('interior', 2, 1, 5, 10): 'lurdl',
+    ('interior', 2, 1, 6, 0): 'ddrruld',
+    ('interior', 2, 1, 6, 1): 'ddruld',
+    ('interior', 2, 1, 6, 2): 'lddruld',
+    ('interior', 2, 1, 6, 3): 'llddruld',
+    ('interior', 2, 1, 6, 4): 'drruld',
+    ('interior', 2, 1, 6, 5): 'druld',
+    ('interior', 2, 1, 6, 7): 'ullddruld',
+    ('interior', 2, 1, 6, 8): 'rruld',
+    ('interior', 2, 1, 6, 9): 'ruld',
+    ('interior', 2, 1, 6, 10): 'uld',
+    ('interior', 2, 1, 7, 0): 'drrrullddruld',
+    ('interior', 2, 1, 7, 1): 'drrullddruld',
+    ('interior', 2, 1, 7, 2): 'drullddruld',
+    ('interior', 2, 1, 7, 3): 'ldrullddruld',
+    ('interior', 2, 1, 7, 4): 'rrrullddruld',
+    ('interior', 2, 1, 7, 5): 'rrullddruld',
+    ('interior', 2, 1, 7, 6): 'rullddruld',
+    ('interior', 2, 1, 7, 8): 'urrrullddruld',
+    ('interior', 2, 1, 7, 9): 'urrullddruld',
+    ('interior', 2, 1, 7, 10): 'urullddruld',
+    ('interior', 2, 1, 8, 0): 'drdlurrdl',
+    ('interior', 2, 1, 8, 1): 'ddlurrdl',
+    ('interior', 2, 1, 8, 2): 'ddllurrdl',
+    ('interior', 2, 1, 8, 3): 'dldllurrdl',
+    ('interior', 2, 1, 8, 4): 'rdlurrdl',
+    ('interior', 2, 1, 8, 5): 'dlurrdl',
+    ('interior', 2, 1, 8, 6): 'dllurrdl',
+    ('interior', 2, 1, 8, 7): 'ldllurrdl',
+    ('interior', 2, 1, 8, 9): 'lurrdl',
+    ('interior', 2, 1, 8, 10): 'llurrdl',
+    ('interior', 2, 1, 9, 0): 'drrdl',
+    ('interior', 2, 1, 9, 1): 'drdl',
+    ('interior', 2, 1, 9, 2): 'ddl',
+    ('interior', 2, 1, 9, 3): 'dldl',
+    ('interior', 2, 1, 9, 4): 'rrdl',
+    ('interior', 2, 1, 9, 5): 'rdl',
+    ('interior', 2, 1, 9, 6): 'dl',
+    ('interior', 2, 1, 9, 7): 'ldl',
+    ('interior', 2, 1, 9, 8): 'urrdl',
+    ('interior', 2, 1, 9, 10): 'l',
+    ('interior', 2, 1, 10, 0): 'ddr',
+    ('interior', 2, 1, 10, 1): 'dd',
+    ('interior', 2, 1, 10, 2): 'dld',
+    ('interior', 2, 1, 10, 3): 'dlld',
+    ('interior', 2, 1, 10, 4): 'dr',
+    ('interior', 2, 1, 10, 5): 'd',
+    ('interior', 2, 1, 10, 6): 'ld',
+    ('interior', 2, 1, 10, 7): 'lld',
+    ('interior', 2, 1, 10, 8): 'r',
+    ('interior', 2, 1, 10, 9): '',
+    ('row0', 1, 0, 0, 1): 'ld',
+    ('row0', 1, 0, 1, 0): 'd',
+    ('row0', 1, 0, 1, 2): '',
+    ('row0', 2, 0, 0, 1): 'rdluldrruld',
+    ('row0', 2, 0, 0, 2): 'dluldrruld',
+    ('row0', 2, 0, 0, 3): 'rurdluldrruld',
+    ('row0', 2, 0, 0, 4): 'urdluldrruld',
+    ('row0', 2, 0, 1, 0): 'rrdluldrruld',
+    ('row0', 2, 0, 1, 2): 'ld',
+    ('row0', 2, 0, 1, 3): 'urrdluldrruld',
+    ('row0', 2, 0, 1, 4): 'lurrdluldrruld',
+    ('row0', 2, 0, 2, 0): 'dr',
+    ('row0', 2, 0, 2, 1): 'd',
+    ('row0', 2, 0, 2, 3): 'r',
+    ('row0', 2, 0, 2, 4): '',
+    ('row0', 2, 0, 3, 0): 'rrdllurdruld',
+    ('row0', 2, 0, 3, 1): 'rdllurdruld',
+    ('row0', 2, 0, 3, 2): 'dllurdruld',
+    ('row0', 2, 0, 3, 4): 'urdllurdruld',
+    ('row0', 2, 0, 4, 0): 'drurdllurdruld',
+    ('row0', 2, 0, 4, 1): 'dlurrdluldrruld',
+    ('row0', 2, 0, 4, 2): 'ldlurrdluldrruld',
+    ('row0', 2, 0, 4, 3): 'rurdllurdruld',
+    ('row0', 3, 0, 0, 1): 'ldrrurdluldrruld',
+    ('row0', 3, 0, 0, 2): 'rdlulldrruldrruld',
+    ('row0', 3, 0, 0, 3): 'dlulldrruldrruld',
+    ('row0', 3, 0, 0, 4): 'ruldrrurdluldrruld',
+    ('row0', 3, 0, 0, 5): 'uldrrurdluldrruld',
+    ('row0', 3, 0, 0, 6): 'urdlulldrruldrruld',
+    ('row0', 3, 0, 1, 0): 'drrurdluldrruld',
+    ('row0', 3, 0, 1, 2): 'rdluldrruld',
+    ('row0', 3, 0, 1, 3): 'dluldrruld',
+    ('row0', 3, 0, 1, 4): 'rrurdluldrruld',
+    ('row0', 3, 0, 1, 5): 'rurdluldrruld',
+    ('row0', 3, 0, 1, 6): 'urdluldrruld',
+    ('row0', 3, 0, 2, 0): 'rrrdluldrruld',
+    ('row0', 3, 0, 2, 1): 'rrdluldrruld',
+    ('row0', 3, 0, 2, 3): 'ld',
+    ('row0', 3, 0, 2, 4): 'urrrdluldrruld',
+    ('row0', 3, 0, 2, 5): 'urrdluldrruld',
+    ('row0', 3, 0, 2, 6): 'lurrdluldrruld',
+    ('row0', 3, 0, 3, 0): 'drr',
+    ('row0', 3, 0, 3, 1): 'dr',
+    ('row0', 3, 0, 3, 2): 'd',
+    ('row0', 3, 0, 3, 4): 'rr',
+    ('row0', 3, 0, 3, 5): 'r',
+    ('row0', 3, 0, 3, 6): '',
+    ('row0', 3, 0, 4, 0): 'rdlurrrdllurdruld',
+    ('row0', 3, 0, 4, 1): 'dlurrrdllurdruld',
+    ('row0', 3, 0, 4, 2): 'rdlllurdruldrruld',
+    ('row0', 3, 0, 4, 3): 'dlllurdruldrruld',
+    ('row0', 3, 0, 4, 5): 'lurrrdllurdruld',
+    ('row0', 3, 0, 4, 6): 'llurrrdllurdruld',
+    ('row0', 3, 0, 5, 0): 'rrrdllurdruld',
+    ('row0', 3, 0, 5, 1): 'rrdllurdruld',
+    ('row0', 3, 0, 5, 2): 'rdllurdruld',
+    ('row0', 3, 0, 5, 3): 'dllurdruld',
+    ('row0', 3, 0, 5, 4): 'urrrdllurdruld',
+    ('row0', 3, 0, 5, 6): 'urdllurdruld',
+    ('row0', 3, 0, 6, 0): 'drrurdllurdruld',
+    ('row0', 3, 0, 6, 1): 'drurdllurdruld',
+    ('row0', 3, 0, 6, 2): 'dlurrdluldrruld',
+    ('row0', 3, 0, 6, 3): 'ldlurrdluldrruld',
+    ('row0', 3, 0, 6, 4): 'rrurdllurdruld',
+    ('row0', 3, 0, 6, 5): 'rurdllurdruld',
+    ('row1', 1, 0, 0, 1): 'ldru',
+    ('row1', 1, 0, 0, 2): 'urdlur',
+    ('row1', 1, 0, 0, 3): 'uldru',
+    ('row1', 1, 0, 1, 0): 'dru',
+    ('row1', 1, 0, 1, 2): 'ru',
+    ('row1', 1, 0, 1, 3): 'u',
+    ('row1', 1, 0, 2, 0): 'rdlur',
+    ('row1', 1, 0, 2, 1): 'dlur',
+    ('row1', 1, 0, 2, 3): 'lur',
+    ('row1', 1, 0, 3, 0): 'r',
+    ('row1', 1, 0, 3, 1): '',
+    ('row1', 1, 0, 3, 2): 'ur',
+    ('row1', 2, 0, 0, 1): 'ldrurdlur',
+    ('row1', 2, 0, 0, 2): 'lldrurdlur',
+    ('row1', 2, 0, 0, 3): 'urdlurrdlur',
+    ('row1', 2, 0, 0, 4): 'uldrurdlur',
+    ('row1', 2, 0, 0, 5): 'ulldrurdlur',
+    ('row1', 2, 0, 1, 0): 'drurdlur',
+    ('row1', 2, 0, 1, 2): 'ldru',
+    ('row1', 2, 0, 1, 3): 'rurdlur',
+    ('row1', 2, 0, 1, 4): 'urdlur',
+    ('row1', 2, 0, 1, 5): 'uldru',
+    ('row1', 2, 0, 2, 0): 'drru',
+    ('row1', 2, 0, 2, 1): 'dru',
+    ('row1', 2, 0, 2, 3): 'rru',
+    ('row1', 2, 0, 2, 4): 'ru',
+    ('row1', 2, 0, 2, 5): 'u',
+    ('row1', 2, 0, 3, 0): 'rdlurrdlur',
+    ('row1', 2, 0, 3, 1): 'dlurrdlur',
+    ('row1', 2, 0, 3, 2): 'dllurrdlur',
+    ('row1', 2, 0, 3, 4): 'lurrdlur',
+    ('row1', 2, 0, 3, 5): 'llurrdlur',
+    ('row1', 2, 0, 4, 0): 'rrdlur',
+    ('row1', 2, 0, 4, 1): 'rdlur',
+    ('row1', 2, 0, 4, 2): 'dlur',
+    ('row1', 2, 0, 4, 3): 'urrdlur',
+    ('row1', 2, 0, 4, 5): 'lur',
+    ('row1', 2, 0, 5, 0): 'rr',
+    ('row1', 2, 0, 5, 1): 'r',
+    ('row1', 2, 0, 5, 2): '',
+    ('row1', 2, 0, 5, 3): 'urr',
+    ('row1', 2, 0, 5, 4): 'ur',
+    ('row1', 3, 0, 0, 1): 'ldrurdlurrdlur',
+    ('row1', 3, 0, 0, 2): 'lldrurdlurrdlur',
+    ('row1', 3, 0, 0, 3): 'llldrurdlurrdlur',
+    ('row1', 3, 0, 0, 4): 'urdlurrdlurrdlur',
+    ('row1', 3, 0, 0, 5): 'uldrurdlurrdlur',
+    ('row1', 3, 0, 0, 6): 'ulldrurdlurrdlur',
+    ('row1', 3, 0, 0, 7): 'ullldrurdlurrdlur',
+    ('row1', 3, 0, 1, 0): 'drurdlurrdlur',
+    ('row1', 3, 0, 1, 2): 'ldrurdlur',
+    ('row1', 3, 0, 1, 3): 'lldrurdlur',
+    ('row1', 3, 0, 1, 4): 'rurdlurrdlur',
+    ('row1', 3, 0, 1, 5): 'urdlurrdlur',
+    ('row1', 3, 0, 1, 6): 'uldrurdlur',
+    ('row1', 3, 0, 1, 7): 'ulldrurdlur',
+    ('row1', 3, 0, 2, 0): 'drrurdlur',
+    ('row1', 3, 0, 2, 1): 'drurdlur',
+    ('row1', 3, 0, 2, 3): 'ldru',
+    ('row1', 3, 0, 2, 4): 'rrurdlur',
+    ('row1', 3, 0, 2, 5): 'rurdlur',
+    ('row1', 3, 0, 2, 6): 'urdlur',
+    ('row1', 3, 0, 2, 7): 'uldru',
+    ('row1', 3, 0, 3, 0): 'drrru',
+    ('row1', 3, 0, 3, 1): 'drru',
+    ('row1', 3, 0, 3, 2): 'dru',
+    ('row1', 3, 0, 3, 4): 'rrru',
+    ('row1', 3, 0, 3, 5): 'rru',
+    ('row1', 3, 0, 3, 6): 'ru',
+    ('row1', 3, 0, 3, 7): 'u',
+    ('row1', 3, 0, 4, 0): 'rdlurrdlurrdlur',
+    ('row1', 3, 0, 4, 1): 'dlurrdlurrdlur',
+    ('row1', 3, 0, 4, 2): 'dllurrdlurrdlur',
+    ('row1', 3, 0, 4, 3): 'dlllurrdlurrdlur',
+    ('row1', 3, 0, 4, 5): 'lurrdlurrdlur',
+    ('row1', 3, 0, 4, 6): 'llurrdlurrdlur',
+    ('row1', 3, 0, 4, 7): 'lllurrdlurrdlur',
+    ('row1', 3, 0, 5, 0): 'rrdlurrdlur',
+    ('row1', 3, 0, 5, 1): 'rdlurrdlur',
+    ('row1', 3, 0, 5, 2): 'dlurrdlur',
+    ('row1', 3, 0, 5, 3): 'dllurrdlur',
+    ('row1', 3, 0, 5, 4): 'urrdlurrdlur',
+    ('row1', 3, 0, 5, 6): 'lurrdlur',
+    ('row1', 3, 0, 5, 7): 'llurrdlur',
+    ('row1', 3, 0, 6, 0): 'rrrdlur',
+    ('row1', 3, 0, 6, 1): 'rrdlur',
+    ('row1', 3, 0, 6, 2): 'rdlur',
+    ('row1', 3, 0, 6, 3): 'dlur',
+    ('row1', 3, 0, 6, 4): 'urrrdlur',
+    ('row1', 3, 0, 6, 5): 'urrdlur',
+    ('row1', 3, 0, 6, 7): 'lur',
+    ('row1', 3, 0, 7, 0): 'rrr',
+    ('row1', 3, 0, 7, 1): 'rr',
+    ('row1', 3, 0, 7, 2): 'r',
+    ('row1', 3, 0, 7, 3): '',
+    ('row1', 3, 0, 7, 4): 'urrr',
+    ('row1', 3, 0, 7, 5): 'urr',
+    ('row1', 3, 0, 7, 6): 'ur',
+}
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+Shortest placement macros for the greedy Fifteen puzzle solver
+Each greedy solve method places one target tile while keeping the solved
+tiles where they are.  Around the target cell a small window is taken: 3
+rows by up to 4 columns for the phase one methods, 2 rows by up to 4
+columns for phase two.  Inside it only the target tile, the blank and the
+solved tiles matter, so a breadth-first search over their positions finds
+the shortest move string, kept inside the window, that ends in the state
+the method has to leave behind.  The strings for every starting position
+of the target tile and the blank are written to fifteen_macro_table.py,
+which ships with the solver; at run time a method plays the macro as soon
+as the target tile and the blank are both inside its window.
+
+Run as a script to rebuild fifteen_macro_table.py.
+"""
+
+import collections
+import os
+
+import fifteen_search
+
+try:
+    from fifteen_macro_table import MACROS
+except ImportError:
+    MACROS = {}
+
+KINDS = ("interior", "col0", "row1", "row0")
+
+#Columns a window reaches left and right of the target cell, before
+#clipping at the board edges
+REACH = {"interior": (2, 1), "col0": (0, 2), "row1": (3, 0), "row0": (3, 0)}
+
+
+def window(kind, target_row, target_col, height, width):
+    """
+    Window of a solve method placing the tile of (target_row, target_col)
+    Returns (top, left, left reach, right reach, rows)
+    """
+    reach_left, reach_right = REACH[kind]
+    reach_left = min(reach_left, target_col)
+    if kind == "col0":
+        reach_right = min(reach_right, width - 1)
+    else:
+        reach_right = min(reach_right, width - 1 - target_col)
+    if kind in ("interior", "col0"):
+        return target_row - 2, target_col - reach_left, reach_left, \
+            reach_right, 3
+    return 0, target_col - reach_left, reach_left, reach_right, 2
+
+
+def problem(kind, reach_left, reach_right):
+    """
+    Local placement problem of a window, in window-relative cells
+    numbered row-major
+    Returns (rows, cols, target cell, final blank cell, solved cells)
+    """
+    cols = reach_left + 1 + reach_right
+    if kind == "interior":
+        rows = 3
+        target = 2 * cols + reach_left
+        blank = target - 1
+        solved = list(range(target + 1, 3 * cols))
+    elif kind == "col0":
+        rows = 3
+        target = 2 * cols
+        #Phase one carries on from the right end of the row above
+        blank = 2 * cols - 1
+        solved = list(range(target + 1, 3 * cols))
+    elif kind == "row1":
+        rows = 2
+        target = cols + reach_left
+        blank = reach_left
+        solved = []
+    else:
+        rows = 2
+        target = reach_left
+        blank = cols + reach_left - 1
+        solved = [cols + reach_left]
+    return rows, cols, target, blank, solved
+
+
+#########################################################
+# Building
+
+def build_problem(kind, reach_left, reach_right):
+    """
+    Breadth-first search back from the finished state of a window over
+    the positions of the blank, the target tile and the solved tiles
+    Returns a dict mapping (target tile cell, blank cell) starting pairs,
+    with the solved tiles at home, to shortest move strings
+    """
+    rows, cols, target, blank, solved = problem(kind, reach_left,
+                                                reach_right)
+    moves = fifteen_search.move_table(rows, cols)
+
+    #A state is (blank, target tile, solved tiles...) by cell; next_move
+    #maps a state to the first move of a shortest way to the goal and
+    #the state it leads to
+    goal = tuple([blank, target] + solved)
+    next_move = {goal: None}
+    queue = collections.deque([goal])
+    while queue:
+        state = queue.popleft()
+        here = state[0]
+        for _, cell, inverse in moves[here]:
+            child = list(state)
+            child[0] = cell
+            for idx in range(1, len(state)):
+                if state[idx] == cell:
+                    child[idx] = here
+            child = tuple(child)
+            if child not in next_move:
+                next_move[child] = (inverse, state)
+                queue.append(child)
+
+    macros = {}
+    home = tuple(solved)
+    for state in next_move:
+        if state[2:] != home:
+            continue
+        path = []
+        link = next_move[state]
+        while link is not None:
+            path.append(link[0])
+            link = next_move[link[1]]
+        macros[(state[1], state[0])] = "".join(path)
+    return macros
+
+
+def build_all():
+    """
+    Solve every window problem the solve methods can meet
+    Returns a dict mapping (kind, left reach, right reach, target tile
+    cell, blank cell) to move strings
+    """
+    table = {}
+    for kind in KINDS:
+        reach_left, reach_right = REACH[kind]
+        #Only col0 targets sit on the left edge, and it needs a column to
+        #its right
+        lefts = range(1, reach_left + 1)
+        rights = range(reach_right + 1)
+        if kind == "col0":
+            lefts, rights = [0], range(1, reach_right + 1)
+        for left in lefts:
+            for right in rights:
+                for (tile, blank), moves in \
+                        build_problem(kind, left, right).items():
+                    table[(kind, left, right, tile, blank)] = moves
+    return table
+
+
+def write_table(path=None):
+    """
+    Write the macros of build_all as a Python module, by default
+    fifteen_macro_table.py next to this one
+    Returns the number of macros written
+    """
+    if path is None:
+        here = os.path.dirname(os.path.abspath(__file__))
+        path = os.path.join(here, "fifteen_macro_table.py")
+    table = build_all()
+    with open(path, "w") as out:
+        out.write("# -*- coding: utf-8 -*-\n")
+        out.write('"""\nPlacement macros for the greedy solver\n'
+                  "Generated by fifteen_macros.py; do not edit.\n"
+                  "Keys are (kind, left reach, right reach, target tile cell, "
+                  "blank cell)\n"
+                  '"""\n\n')
+        out.write("MACROS = {\n")
+        for key in sorted(table):
+            out.write("    %r: %r,\n" % (key, table[key]))
+        out.write("}\n")
+    return len(table)
+
+
+#########################################################
+# Lookup
+
+def lookup(kind, pos, height, width, target_row, target_col):
+    """
+    Macro finishing the placement of the tile of (target_row, target_col)
+    on a board whose tile positions are listed in pos, if the target tile
+    and the blank are both inside the method's window.  The solved tiles inside
+    the window must be at home, as they are between the steps of the
+    solve methods.
+    Returns a move string, or None
+    """
+    tile_idx = pos[target_row * width + target_col]
+    #Cheap test first: on large boards the tile is usually far away
+    if kind == "interior" or kind == "col0":
+        if tile_idx < (target_row - 2) * width:
+            return None
+    elif tile_idx % width < target_col - REACH[kind][0]:
+        return None
+    top, left, reach_left, reach_right, rows = window(
+        kind, target_row, target_col, height, width)
+    cols = reach_left + 1 + reach_right
+    tile_row = tile_idx // width - top
+    tile_col = tile_idx % width - left
+    if not (0 <= tile_row < rows and 0 <= tile_col < cols):
+        return None
+    blank_idx = pos[0]
+    blank_row = blank_idx // width - top
+    blank_col = blank_idx % width - left
+    if not (0 <= blank_row < rows and 0 <= blank_col < cols):
+        return None
+    return MACROS.get((kind, reach_left, reach_right,
+                       tile_row * cols + tile_col,
+                       blank_row * cols + blank_col))
+
+
+if __name__ == "__main__":
+    print("%d macros written" % write_table())
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+Parallel optimal search for the Fifteen puzzle
+The search tree is expanded breadth-first from the starting board until
+there are enough distinct boards at one depth; each of those boards is a
+task.  Every IDA* iteration hands the tasks to a process pool one at a
+time, so a worker picks up the next subtree as soon as it finishes one.
+All answers found in one iteration are equally short, so the first worker
+to reach the goal sets a shared event and the others stop within a
+thousand nodes; the parent sets the same event when the budget runs out.
+
+Run as a script to measure the speedup against the number of workers on a
+fixed set of boards.
+"""
+
+import multiprocessing
+import os
+import time
+
+import fifteen_search
+
+#State of a worker process, set up by _init_worker
+_WORKER = {}
+
+
+def _init_worker(height, width, stop, heuristic="default"):
+    """
+    Worker start-up: build the named heuristic once per process and keep
+    the shared stop event
+    """
+    _WORKER["shape"] = (height, width)
+    _WORKER["heuristic"] = fifteen_search.make_heuristic(heuristic, height,
+                                                         width)
+    _WORKER["stop"] = stop
+
+
+def _search_subtree(task):
+    """
+    Worker entry point: one IDA* pass below the bound over the subtree of
+    a frontier board
+    Returns a (move string or None, next bound, nodes expanded, aborted)
+    tuple
+    """
+    prefix, cells, forbidden, bound, deadline = task
+    height, width = _WORKER["shape"]
+    stop = _WORKER["stop"]
+    if stop.is_set():
+        return None, float("inf"), 0, True
+    search = fifteen_search.IDAStar(cells, height, width,
+                                    _WORKER["heuristic"], stop=stop)
+    try:
+        moves, next_bound = search.run_pass(bound, len(prefix), forbidden,
+                                            deadline)
+    except fifteen_search.SearchAborted:
+        return None, float("inf"), search.nodes_expanded, True
+    if moves is not None:
+        stop.set()
+        moves = prefix + moves
+    return moves, next_bound, search.nodes_expanded, False
+
+
+def expand_frontier(cells, height, width, min_tasks):
+    """
+    Expand the search tree breadth-first until one depth holds at least
+    min_tasks distinct boards, never undoing the previous move
+    Returns a (move string, frontier) pair: the move string is set if the
+    goal lies above the frontier, which is then None; otherwise the
+    frontier is a list of (moves, board, forbidden move) tuples
+    """
+    moves = fifteen_search.move_table(height, width)
+    goal = tuple(range(height * width))
+    level = [("", tuple(cells), None)]
+    while True:
+        for prefix, board, _ in level:
+            if board == goal:
+                return prefix, None
+        if len(level) >= min_tasks:
+            return None, level
+        seen = set()
+        next_level = []
+        for prefix, board, forbidden in level:
+            blank = board.index(0)
+            for direction, tile_idx, inverse in moves[blank]:
+                if direction == forbidden:
+                    continue
+                child = list(board)
+                child[blank] = child[tile_idx]
+                child[tile_idx] = 0
+                child = tuple(child)
+                if child not in seen:
+                    seen.add(child)
+                    next_level.append((prefix + direction, child, inverse))
+        level = next_level
+
+
+class ParallelIDAStar(object):
+    """
+    IDA* from one board to the solved board, with the subtrees below a
+    fixed-depth frontier searched on a pool of worker processes
+    """
+
+    def __init__(self, cells, height, width, workers=None, min_tasks=None,
+                 max_nodes=None, timeout=None, heuristic="default"):
+        """
+        Set up a search from the flat board cells.  workers defaults to
+        the number of CPUs and min_tasks to 16 tasks per worker.  max_nodes
+        is checked as subtree results come in, timeout (in seconds) inside
+        every worker.  heuristic names one of fifteen_search.HEURISTICS.
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if min_tasks is None:
+            min_tasks = 16 * workers
+        self._start = list(cells)
+        self._height = height
+        self._width = width
+        self._workers = workers
+        self._min_tasks = min_tasks
+        self._max_nodes = max_nodes
+        self._timeout = timeout
+        self._heuristic = heuristic
+        self.nodes_expanded = 0
+        self.bound = 0
+        self.tasks = 0
+
+    def solve(self):
+        """
+        Run the search to completion or until the budget runs out.  After
+        a give-up, bound holds the best lower bound proved on the length.
+        Returns a shortest move string, or None if the budget ran out
+        """
+        height, width = self._height, self._width
+        deadline = None
+        if self._timeout is not None:
+            deadline = time.time() + self._timeout
+        answer, frontier = expand_frontier(self._start, height, width,
+                                           self._min_tasks)
+        if answer is not None:
+            return answer
+        self.tasks = len(frontier)
+
+        #Subtrees with the most slack under the bound are the biggest;
+        #handing them out first keeps the workers evenly loaded
+        heuristic = fifteen_search.make_heuristic(self._heuristic, height,
+                                                  width)
+        ranked = sorted((len(prefix) + heuristic.reset(list(board)), prefix,
+                         board, forbidden)
+                        for prefix, board, forbidden in frontier)
+        self.bound = ranked[0][0]
+
+        stop = multiprocessing.Event()
+        if self._workers == 1:
+            _init_worker(height, width, stop, self._heuristic)
+            pool = None
+        else:
+            pool = multiprocessing.Pool(self._workers, _init_worker,
+                                        (height, width, stop,
+                                         self._heuristic))
+        try:
+            while True:
+                tasks = [(prefix, board, forbidden, self.bound, deadline)
+                         for _, prefix, board, forbidden in ranked]
+                if pool is None:
+                    results = map(_search_subtree, tasks)
+                else:
+                    results = pool.imap_unordered(_search_subtree, tasks)
+                next_bound = float("inf")
+                given_up = False
+                for moves, result, nodes, aborted in results:
+                    self.nodes_expanded += nodes
+                    if moves is not None:
+                        stop.set()
+                        return moves
+                    if aborted:
+                        #Stopped by a worker that found the goal, whose
+                        #answer may still be on its way, or by the timeout
+                        given_up = True
+                        stop.set()
+                    elif self._max_nodes is not None and \
+                            self.nodes_expanded > self._max_nodes:
+                        stop.set()
+                        return None
+                    next_bound = min(next_bound, result)
+                if given_up:
+                    return None
+                self.bound = next_bound
+        finally:
+            if pool is not None:
+                pool.terminate()
+
+
+def main(argv=None):
+    """
+    Time ParallelIDAStar on a fixed set of boards for each worker count
+    and print the speedup against one worker
+    """
+    import argparse
+    import fifteen_bench
+
+    parser = argparse.ArgumentParser(description="Parallel IDA* speedup")
+    parser.add_argument("--shape", default="4x4", help="board shape, HxW")
+    parser.add_argument("--boards", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", default=None,
+                        help="comma separated worker counts")
+    args = parser.parse_args(argv)
+
+    height, width = [int(part) for part in args.shape.split("x")]
+    corpus = fifteen_bench.make_corpus([(height, width)], args.boards,
+                                       args.seed)
+    boards = [[tile for row in instance["grid"] for tile in row]
+              for instance in corpus]
+    if args.workers is None:
+        cpus = os.cpu_count() or 1
+        counts = sorted(set([1, 2, 4, 8, 16, 32, cpus]))
+        counts = [count for count in counts if count <= cpus]
+    else:
+        counts = [int(count) for count in args.workers.split(",")]
+
+    print("%8s %10s %9s %8s" % ("workers", "nodes", "seconds", "speedup"))
+    base = None
+    lengths = None
+    for count in counts:
+        start = time.time()
+        nodes = 0
+        found = []
+        for cells in boards:
+            search = ParallelIDAStar(cells, height, width, workers=count)
+            found.append(len(search.solve()))
+            nodes += search.nodes_expanded
+        elapsed = time.time() - start
+        if base is None:
+            base, lengths = elapsed, found
+        assert found == lengths, "worker counts disagree on the optimum"
+        print("%8d %10d %9.2f %8.2f" % (count, nodes, elapsed,
+                                        base / elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""
+Additive pattern databases for the Fifteen puzzle
+The tiles are split into disjoint patterns.  For each pattern a backward
+breadth-first search from the solved board (blank in the upper left)
+records, for every placement of the pattern tiles, the fewest moves of
+pattern tiles needed to solve them; moves of other tiles are free, so the
+values of disjoint patterns can be added.  The tables are written to one
+file of raw bytes and mapped back with mmap, so several solver processes
+share a single copy in memory.
+
+Run as a script to build the default 4x4 tables and report their build
+time, file size and lookup cost.
+"""
+
+import mmap
+import os
+import random
+import struct
+import time
+
+MAGIC = b"FPDB"
+VERSION = 1
+
+#Disjoint partitions of the 4x4 tiles for the goal with the blank at (0, 0).
+#Tables are indexed by 16 ** (pattern size), so six-tile patterns would
+#need 16M-entry tables and a pure-Python search far too slow to build.
+PARTITIONS_4X4 = {
+    "5-5-5": ((1, 2, 3, 6, 7), (4, 5, 8, 9, 12), (10, 11, 13, 14, 15)),
+}
+
+#Value of a placement the search never reached
+UNSEEN = 255
+
+_LOADED = {}
+
+
+def default_path(height, width):
+    """
+    Location the solver looks in for the tables of a height x width board
+    Returns a string
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(here, "fifteen_%dx%d.pdb" % (height, width))
+
+
+#########################################################
+# Building
+
+def _board_masks(height, width):
+    """
+    Bit masks used to flood the blank over a height x width board
+    Returns (full, not first column, not last column) masks
+    """
+    size = height * width
+    full = (1 << size) - 1
+    first_col = sum(1 << (row * width) for row in range(height))
+    last_col = first_col << (width - 1)
+    return full, full & ~first_col, full & ~last_col
+
+
+def _flood(cell, free, width, masks):
+    """
+    Cells the blank can reach from cell through the free cells
+    Returns a bit mask
+    """
+    full, not_first, not_last = masks
+    region = 1 << cell
+    while True:
+        grow = (region | ((region & not_first) >> 1) |
+                ((region & not_last) << 1) | (region >> width) |
+                ((region << width) & full)) & free
+        if grow == region:
+            return region
+        region = grow
+
+
+def build_pattern(tiles, height, width):
+    """
+    Backward breadth-first search for one pattern.  A placement of the
+    pattern tiles is indexed by reading their cells as the digits of a
+    base height * width number, so a move changes the index by a fixed
+    step.  The search state adds the area the blank can wander over
+    without disturbing the pattern, named by its lowest cell.
+    Returns a bytearray of move counts indexed by placement
+    """
+    #Imported here: fifteen_search imports this module
+    import fifteen_search
+
+    size = height * width
+    count = len(tiles)
+    weights = [size ** (count - 1 - j) for j in range(count)]
+    masks = _board_masks(height, width)
+    full = masks[0]
+    neighbors = [[cell for _, cell, _ in moves]
+                 for moves in fifteen_search.move_table(height, width)]
+
+    table = bytearray([UNSEEN]) * (size ** count)
+    seen = bytearray((size ** count * size + 7) // 8)
+
+    start_index = sum(tile * weight for tile, weight in zip(tiles, weights))
+    occupied = sum(1 << tile for tile in tiles)
+    region = _flood(0, full & ~occupied, width, masks)
+    key = start_index * size + (region & -region).bit_length() - 1
+    seen[key >> 3] |= 1 << (key & 7)
+    frontier = [key]
+    depth = 0
+    while frontier:
+        next_frontier = []
+        for key in frontier:
+            index, blank = divmod(key, size)
+            if table[index] == UNSEEN:
+                table[index] = depth
+            positions = []
+            rest = index
+            for _ in range(count):
+                rest, cell = divmod(rest, size)
+                positions.append(cell)
+            positions.reverse()
+            occupied = 0
+            for cell in positions:
+                occupied |= 1 << cell
+            region = _flood(blank, full & ~occupied, width, masks)
+            for j, cell in enumerate(positions):
+                for dest in neighbors[cell]:
+                    if not region >> dest & 1:
+                        continue
+                    new_occupied = occupied ^ (1 << cell) ^ (1 << dest)
+                    new_region = _flood(cell, full & ~new_occupied, width,
+                                        masks)
+                    new_key = ((index + (dest - cell) * weights[j]) * size +
+                               (new_region & -new_region).bit_length() - 1)
+                    if not seen[new_key >> 3] & (1 << (new_key & 7)):
+                        seen[new_key >> 3] |= 1 << (new_key & 7)
+                        next_frontier.append(new_key)
+        frontier = next_frontier
+        depth += 1
+    return table
+
+
+def build(path, patterns, height, width, report=None):
+    """
+    Build the tables for the given disjoint patterns and write them to
+    path.  report, if given, is called with a line of text after each
+    table.
+    Returns a list of build times in seconds, one per pattern
+    """
+    seen = set()
+    for tiles in patterns:
+        assert 0 not in tiles, "the blank cannot be part of a pattern"
+        assert not seen.intersection(tiles), "patterns must be disjoint"
+        seen.update(tiles)
+
+    times = []
+    tables = []
+    for tiles in patterns:
+        start = time.time()
+        tables.append(build_pattern(tiles, height, width))
+        times.append(time.time() - start)
+        if report is not None:
+            report("pattern %s: %d entries in %.1f s" %
+                   (tiles, len(tables[-1]), times[-1]))
+
+    header = MAGIC + struct.pack("<BBBB", VERSION, height, width,
+                                 len(patterns))
+    for tiles in patterns:
+        header += struct.pack("<B", len(tiles)) + bytes(bytearray(tiles))
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as out:
+        out.write(header)
+        for table in tables:
+            out.write(table)
+    os.rename(tmp_path, path)
+    return times
+
+
+#########################################################
+# Loading and lookup
+
+class PatternDatabase(object):
+    """
+    Read-only view of a table file mapped into memory
+    """
+
+    def __init__(self, path):
+        """
+        Map the file at path and locate its tables
+        """
+        with open(path, "rb") as source:
+            self._map = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        data = memoryview(self._map)
+        assert data[:4].tobytes() == MAGIC, "not a pattern database: " + path
+        version, height, width, count = struct.unpack_from("<BBBB", data, 4)
+        assert version == VERSION, "unknown version " + str(version)
+        self.height = height
+        self.width = width
+        self.patterns = []
+        offset = 8
+        for _ in range(count):
+            size = data[offset]
+            self.patterns.append(tuple(data[offset + 1:offset + 1 + size]))
+            offset += 1 + size
+        self.tables = []
+        for tiles in self.patterns:
+            length = (height * width) ** len(tiles)
+            self.tables.append(data[offset:offset + length])
+            offset += length
+        assert offset == len(data), "truncated pattern database: " + path
+
+    def __len__(self):
+        """
+        Size of the mapped file in bytes
+        Returns an integer
+        """
+        return len(self._map)
+
+
+def load(path):
+    """
+    Map the table file at path, sharing one mapping per process
+    Returns a PatternDatabase
+    """
+    path = os.path.abspath(path)
+    database = _LOADED.get(path)
+    if database is None:
+        database = PatternDatabase(path)
+        _LOADED[path] = database
+    return database
+
+
+def find_database(height, width):
+    """
+    Load the default tables for a height x width board if they were built
+    Returns a PatternDatabase, or None
+    """
+    path = default_path(height, width)
+    if not os.path.exists(path):
+        return None
+    return load(path)
+
+
+class PatternHeuristic(object):
+    """
+    Sum of the pattern database values of all patterns, kept up to date
+    one move at a time; follows the heuristic protocol of fifteen_search
+    """
+
+    def __init__(self, database):
+        """
+        Track boards against the tables of database
+        """
+        size = database.height * database.width
+        self._tables = database.tables
+        self._owner = [-1] * size
+        self._weight = [0] * size
+        for number, tiles in enumerate(database.patterns):
+            for j, tile in enumerate(tiles):
+                self._owner[tile] = number
+                self._weight[tile] = size ** (len(tiles) - 1 - j)
+        self._index = [0] * len(self._tables)
+        self._value = [0] * len(self._tables)
+
+    def reset(self, cells):
+        """
+        Start tracking the given board
+        Returns the estimate for it
+        """
+        index = [0] * len(self._tables)
+        for cell, tile in enumerate(cells):
+            number = self._owner[tile]
+            if number >= 0:
+                index[number] += cell * self._weight[tile]
+        self._index = index
+        self._value = [table[position]
+                       for table, position in zip(self._tables, index)]
+        return sum(self._value)
+
+    def move(self, cells, tile, from_idx, to_idx):
+        """
+        Account for tile having slid from from_idx to to_idx
+        Returns the change in the estimate
+        """
+        number = self._owner[tile]
+        if number < 0:
+            return 0
+        position = self._index[number] + (to_idx - from_idx) * self._weight[tile]
+        self._index[number] = position
+        value = self._tables[number][position]
+        delta = value - self._value[number]
+        self._value[number] = value
+        return delta
+
+    def undo(self, cells, tile, from_idx, to_idx):
+        """
+        Account for the last move of tile having been taken back
+        """
+        number = self._owner[tile]
+        if number >= 0:
+            position = (self._index[number] -
+                        (to_idx - from_idx) * self._weight[tile])
+            self._index[number] = position
+            self._value[number] = self._tables[number][position]
+
+
+def lookup_cost(database, samples=100000, seed=0):
+    """
+    Average time of one incremental heuristic update over random moves
+    Returns seconds per lookup
+    """
+    import fifteen_search
+
+    height, width = database.height, database.width
+    moves = fifteen_search.move_table(height, width)
+    rng = random.Random(seed)
+    cells = list(range(height * width))
+    heuristic = PatternHeuristic(database)
+    heuristic.reset(cells)
+    blank = 0
+    steps = []
+    for _ in range(samples):
+        tile_idx = rng.choice(moves[blank])[1]
+        steps.append((cells[tile_idx], tile_idx, blank))
+        cells[blank], cells[tile_idx] = cells[tile_idx], 0
+        blank = tile_idx
+    heuristic.reset(list(range(height * width)))
+    cells = list(range(height * width))
+    start = time.time()
+    for tile, from_idx, to_idx in steps:
+        heuristic.move(cells, tile, from_idx, to_idx)
+    return (time.time() - start) / samples
+
+
+def main():
+    """
+    Build the 4x4 tables and report build time, file size and lookup cost
+    """
+    import argparse
+    parser = argparse.ArgumentParser(description=main.__doc__.strip())
+    parser.add_argument("--partition", choices=sorted(PARTITIONS_4X4),
+                        default="5-5-5")
+    parser.add_argument("--out", default=default_path(4, 4))
+    args = parser.parse_args()
+
+    start = time.time()
+    build(args.out, PARTITIONS_4X4[args.partition], 4, 4, report=print)
+    print("built %s in %.1f s" % (args.out, time.time() - start))
+    database = load(args.out)
+    print("file size: %d bytes" % len(database))
+    print("lookup cost: %.3f us" % (lookup_cost(database) * 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Post-optimization of Fifteen puzzle move strings
+The greedy solver glues fixed macros together, so its answers often undo
+themselves: inverse pairs such as "lr" or "du", and longer walks after
+which every tile is back where it was.  Replaying a move string while
+keeping an incremental hash of the whole board finds every point where the
+board repeats an earlier state; the moves in between do nothing and are
+cut.  The shortened string is replayed once more and only returned if it
+reaches exactly the same board.
+"""
+
+DELTA_ROWS = {"l": 0, "r": 0, "u": -1, "d": 1}
+DELTA_COLS = {"l": -1, "r": 1, "u": 0, "d": 0}
+
+
+def shorten(puzzle, mov_string):
+    """
+    Remove every stretch of mov_string that brings the board back to a
+    state it was already in.  puzzle is the starting board and is not
+    changed.
+    Returns a move string reaching the same board, never longer than
+    mov_string
+    """
+    height = puzzle.get_height()
+    width = puzzle.get_width()
+    cells = puzzle.cells()
+    zero_idx = cells.index(0)
+    zero_row, zero_col = divmod(zero_idx, width)
+
+    #Board hash relative to the start, the xor of hash((tile, cell)) over
+    #the cells that differ from it; kept prefixes are looked up by hash
+    state = 0
+    kept = []
+    hashes = [state]
+    seen = {state: 0}
+    for direction in mov_string:
+        zero_row += DELTA_ROWS[direction]
+        zero_col += DELTA_COLS[direction]
+        assert 0 <= zero_row < height and 0 <= zero_col < width, \
+            "move off grid: " + direction
+        tile_idx = zero_row * width + zero_col
+        tile = cells[tile_idx]
+        cells[zero_idx] = tile
+        cells[tile_idx] = 0
+        state ^= (hash((tile, tile_idx)) ^ hash((tile, zero_idx)) ^
+                  hash((0, zero_idx)) ^ hash((0, tile_idx)))
+        zero_idx = tile_idx
+
+        earlier = seen.get(state)
+        if earlier is None:
+            kept.append(direction)
+            hashes.append(state)
+            seen[state] = len(kept)
+        else:
+            #Back to an earlier board, drop the loop
+            while len(kept) > earlier:
+                kept.pop()
+                del seen[hashes.pop()]
+
+    if len(kept) == len(mov_string):
+        return mov_string
+    shorter = "".join(kept)
+    check = puzzle.clone()
+    check.update_puzzle(shorter)
+    if check.cells() != cells:
+        #A hash collision cut moves that mattered; keep the original
+        return mov_string
+    return shorter
@@ -16,12 +16,97 @@ Combination of Instructor written and Student Written code.  See
 #poc_fifteen_gui depends on custom Python module developed for Coursera course:
 #Principle of Computing (1&2)
 #import poc_fifteen_gui
+import collections
+import math
+import time
 
-class Puzzle:
+import fifteen_eight
+import fifteen_endgame
+import fifteen_macros
+import fifteen_parallel
+import fifteen_pdb
+import fifteen_postopt
+import fifteen_search
+
+#Nodes a hybrid search of a corner larger than 3x3 expands before giving up
+HYBRID_NODES = 200000
+
+#Answer of Puzzle.solve_within: the best move string found, whether it is
+#proved shortest, and the best lower bound proved on the shortest length
+AnytimeResult = collections.namedtuple("AnytimeResult",
+                                       "moves optimal lower_bound")
+
+class UnsolvableError(Exception):
+    """
+    Raised when a solver is given a board that cannot reach the solved
+    configuration
+    """
+    pass
+
+class SolveStats(object):
+    """
+    Opt-in instrumentation for a Puzzle, see Puzzle.instrument.  Records
+    wall time and moves per solving phase, the number of calls to the
+    hot puzzle methods, the nodes expanded by searches and the moves
+    removed by post-optimization.  With
+    show_boards set, the board is printed after every tile solved in rows
+    one and zero.
+    """
+
+    PHASES = ("lower rows", "rows 0 and 1", "endgame")
+    COUNTED = ("current_position", "update_puzzle", "lower_row_invariant",
+               "row0_invariant", "row1_invariant")
+
+    def __init__(self, show_boards=False):
+        """
+        Start with every counter at zero
+        """
+        self.show_boards = show_boards
+        self.phase_seconds = dict((phase, 0.0) for phase in self.PHASES)
+        self.phase_moves = dict((phase, 0) for phase in self.PHASES)
+        self.calls = dict((name, 0) for name in self.COUNTED)
+        self.nodes_expanded = 0
+        self.moves_saved = 0
+
+    def add_phase(self, phase, seconds, moves):
+        """
+        Account for one step of a solving phase
+        """
+        self.phase_seconds[phase] += seconds
+        self.phase_moves[phase] += moves
+
+    def __str__(self):
+        """
+        Generate a readable report of the counters
+        Returns a string
+        """
+        ans = ""
+        for phase in self.PHASES:
+            ans += "%-14s %9.4f s %9d moves\n" % (phase,
+                                                   self.phase_seconds[phase],
+                                                   self.phase_moves[phase])
+        for name in self.COUNTED:
+            ans += "%-20s %9d calls\n" % (name, self.calls[name])
+        ans += "%-20s %9d nodes\n" % ("searched", self.nodes_expanded)
+        ans += "%-20s %9d moves\n" % ("saved", self.moves_saved)
+        return ans
+
+class Puzzle(object):
     """
     Class representation for the Fifteen puzzle
+    The board is stored as one flat list of tile values in row-major order
+    together with an inverse list mapping each tile to the cell holding it,
+    so locating a tile never requires scanning the board.  The puzzle also
+    tracks where the solved tail of the board begins, so the invariant
+    checks never scan it either.  While solving, moves are appended to a
+    single move buffer and joined once at the end.  Searches make and
+    take back single moves in place with apply_move and undo_move, which
+    keep an undo log instead of copying the board.
     """
 
+    __slots__ = ("_height", "_width", "_cells", "_pos", "_solved_start",
+                 "_moves", "_stats", "_undo", "_heuristic", "_estimate")
+
     def __init__(self, puzzle_height, puzzle_width, initial_grid=None):
         """
         Initialize puzzle with default height and width
@@ -29,18 +114,22 @@ class Puzzle:
         """
         self._height = puzzle_height
         self._width = puzzle_width
-        self._grid = [[col + puzzle_width * row
-                       for col in range(self._width)]
-                      for row in range(self._height)]
-    
-        self._ref_solution = [[col + puzzle_width * row
-               for col in range(self._width)]
-               for row in range(self._height)]
+        self._cells = list(range(puzzle_height * puzzle_width))
+        self._pos = list(range(puzzle_height * puzzle_width))
+        #Every cell from this flat index onwards holds its solved value
+        self._solved_start = 0
+        self._moves = None
+        self._stats = None
+        #Three entries per applied move: blank cell, solved tail start and
+        #estimate before the move
+        self._undo = []
+        self._heuristic = None
+        self._estimate = None
 
         if initial_grid != None:
             for row in range(puzzle_height):
                 for col in range(puzzle_width):
-                    self._grid[row][col] = initial_grid[row][col]
+                    self.set_number(row, col, initial_grid[row][col])
 
     def __str__(self):
         """
@@ -49,7 +138,7 @@ class Puzzle:
         """
         ans = ""
         for row in range(self._height):
-            ans += str(self._grid[row])
+            ans += str(self._cells[row * self._width:(row + 1) * self._width])
             ans += "\n"
         return ans
 
@@ -75,22 +164,57 @@ class Puzzle:
         Getter for the number at tile position pos
         Returns an integer
         """
-        return self._grid[row][col]
+        return self._cells[row * self._width + col]
+
+    def cells(self):
+        """
+        Getter for the whole board as one list in row-major order
+        Returns a new list of integers
+        """
+        return self._cells[:]
 
     def set_number(self, row, col, value):
         """
         Setter for the number at tile position pos
         """
-        self._grid[row][col] = value
+        idx = row * self._width + col
+        self._cells[idx] = value
+        self._pos[value] = idx
+        if value != idx and idx >= self._solved_start:
+            self._solved_start = idx + 1
+        self._shrink_solved_start()
 
     def clone(self):
         """
         Make a copy of the puzzle to update during solving
         Returns a Puzzle object
         """
-        new_puzzle = Puzzle(self._height, self._width, self._grid)
+        new_puzzle = Puzzle.__new__(Puzzle)
+        new_puzzle._height = self._height
+        new_puzzle._width = self._width
+        new_puzzle._cells = self._cells[:]
+        new_puzzle._pos = self._pos[:]
+        new_puzzle._solved_start = self._solved_start
+        new_puzzle._stats = None
+        new_puzzle._moves = None
+        new_puzzle._undo = []
+        new_puzzle._heuristic = None
+        new_puzzle._estimate = None
         return new_puzzle
 
+    def instrument(self, stats):
+        """
+        Record solving statistics into stats, a SolveStats, or stop
+        recording if stats is None.  The counting versions of the hot
+        methods live on a subclass the puzzle switches to, so a puzzle
+        that is not instrumented pays nothing for them.
+        """
+        self._stats = stats
+        if stats is None:
+            self.__class__ = Puzzle
+        else:
+            self.__class__ = _InstrumentedPuzzle
+
     ########################################################
     # Core puzzle methods
 
@@ -101,41 +225,258 @@ class Puzzle:
         Returns a tuple of two integers        
         """
         solved_value = (solved_col + self._width * solved_row)
-
-        for row in range(self._height):
-            for col in range(self._width):
-                if self._grid[row][col] == solved_value:
-                    return (row, col)
-        assert False, "Value " + str(solved_value) + " not found"
+        assert 0 <= solved_value < len(self._pos), \
+            "Value " + str(solved_value) + " not found"
+        return divmod(self._pos[solved_value], self._width)
 
     def update_puzzle(self, move_string):
         """
         Updates the puzzle state based on the provided move string
         """
-        zero_row, zero_col = self.current_position(0, 0)
-        for direction in move_string:
-            if direction == "l":
-                assert zero_col > 0, "move off grid: " + direction
-                self._grid[zero_row][zero_col] = self._grid[zero_row][zero_col - 1]
-                self._grid[zero_row][zero_col - 1] = 0
-                zero_col -= 1
-            elif direction == "r":
-                assert zero_col < self._width - 1, "move off grid: " + direction
-                self._grid[zero_row][zero_col] = self._grid[zero_row][zero_col + 1]
-                self._grid[zero_row][zero_col + 1] = 0
-                zero_col += 1
-            elif direction == "u":
-                assert zero_row > 0, "move off grid: " + direction
-                self._grid[zero_row][zero_col] = self._grid[zero_row - 1][zero_col]
-                self._grid[zero_row - 1][zero_col] = 0
-                zero_row -= 1
-            elif direction == "d":
-                assert zero_row < self._height - 1, "move off grid: " + direction
-                self._grid[zero_row][zero_col] = self._grid[zero_row + 1][zero_col]
-                self._grid[zero_row + 1][zero_col] = 0
-                zero_row += 1
-            else:
-                assert False, "invalid direction: " + direction
+        cells = self._cells
+        pos = self._pos
+        width = self._width
+        last_row = len(cells) - width
+        solved_start = self._solved_start
+        zero_idx = pos[0]
+        zero_col = zero_idx % width
+        try:
+            for direction in move_string:
+                if direction == "l":
+                    assert zero_col > 0, "move off grid: " + direction
+                    tile_idx = zero_idx - 1
+                    zero_col -= 1
+                elif direction == "r":
+                    assert zero_col < width - 1, "move off grid: " + direction
+                    tile_idx = zero_idx + 1
+                    zero_col += 1
+                elif direction == "u":
+                    assert zero_idx >= width, "move off grid: " + direction
+                    tile_idx = zero_idx - width
+                elif direction == "d":
+                    assert zero_idx < last_row, "move off grid: " + direction
+                    tile_idx = zero_idx + width
+                else:
+                    assert False, "invalid direction: " + direction
+                tile = cells[tile_idx]
+                cells[zero_idx] = tile
+                pos[tile] = zero_idx
+                cells[tile_idx] = 0
+                #Only the two cells involved can change the solved tail
+                if tile_idx >= solved_start:
+                    solved_start = tile_idx + 1
+                if tile != zero_idx and zero_idx >= solved_start:
+                    solved_start = zero_idx + 1
+                while solved_start and cells[solved_start - 1] == solved_start - 1:
+                    solved_start -= 1
+                zero_idx = tile_idx
+        finally:
+            pos[0] = zero_idx
+            self._solved_start = solved_start
+
+    ########################################################
+    # Make/unmake moves
+
+    def track_heuristic(self, heuristic):
+        """
+        Keep an estimate from heuristic, which follows the fifteen_search
+        heuristic protocol, up to date through apply_move and undo_move,
+        or stop if heuristic is None.  The undo log is cleared.
+        Returns the estimate for the current board, or None
+        """
+        self._heuristic = heuristic
+        del self._undo[:]
+        if heuristic is None:
+            self._estimate = None
+        else:
+            self._estimate = heuristic.reset(self._cells)
+        return self._estimate
+
+    def get_estimate(self):
+        """
+        Getter for the estimate of the tracked heuristic
+        Returns an integer, or None if no heuristic is tracked
+        """
+        return self._estimate
+
+    def undo_depth(self):
+        """
+        Number of applied moves undo_move can still take back
+        Returns an integer
+        """
+        return len(self._undo) // 3
+
+    def apply_move(self, direction):
+        """
+        Make one move in place, updating the tracked estimate, and log
+        what undo_move needs to take it back.  Moves made with
+        update_puzzle are not logged and leave the estimate stale, so
+        they should not be mixed with logged moves.
+        Returns the estimate after the move, or None
+        """
+        cells = self._cells
+        pos = self._pos
+        width = self._width
+        zero_idx = pos[0]
+        if direction == "l":
+            assert zero_idx % width > 0, "move off grid: " + direction
+            tile_idx = zero_idx - 1
+        elif direction == "r":
+            assert zero_idx % width < width - 1, "move off grid: " + direction
+            tile_idx = zero_idx + 1
+        elif direction == "u":
+            assert zero_idx >= width, "move off grid: " + direction
+            tile_idx = zero_idx - width
+        elif direction == "d":
+            assert zero_idx < len(cells) - width, \
+                "move off grid: " + direction
+            tile_idx = zero_idx + width
+        else:
+            assert False, "invalid direction: " + direction
+        solved_start = self._solved_start
+        estimate = self._estimate
+        undo = self._undo
+        undo.append(zero_idx)
+        undo.append(solved_start)
+        undo.append(estimate)
+
+        tile = cells[tile_idx]
+        cells[zero_idx] = tile
+        pos[tile] = zero_idx
+        cells[tile_idx] = 0
+        pos[0] = tile_idx
+        if tile_idx >= solved_start:
+            solved_start = tile_idx + 1
+        if tile != zero_idx and zero_idx >= solved_start:
+            solved_start = zero_idx + 1
+        while solved_start and cells[solved_start - 1] == solved_start - 1:
+            solved_start -= 1
+        self._solved_start = solved_start
+        if estimate is not None:
+            estimate += self._heuristic.move(cells, tile, tile_idx, zero_idx)
+            self._estimate = estimate
+        return estimate
+
+    def undo_move(self):
+        """
+        Take back the last move made with apply_move, restoring the board,
+        the blank, the solved tail and the tracked estimate
+        Returns the estimate after taking the move back, or None
+        """
+        undo = self._undo
+        assert undo, "no move to undo"
+        estimate = undo.pop()
+        self._solved_start = undo.pop()
+        zero_idx = undo.pop()
+        cells = self._cells
+        pos = self._pos
+        tile_idx = pos[0]
+        tile = cells[zero_idx]
+        cells[tile_idx] = tile
+        pos[tile] = tile_idx
+        cells[zero_idx] = 0
+        pos[0] = zero_idx
+        self._estimate = estimate
+        if estimate is not None:
+            self._heuristic.undo(cells, tile, tile_idx, zero_idx)
+        return estimate
+
+    def is_solvable(self):
+        """
+        Check whether the solved configuration can be reached at all.  A
+        vertical move shifts a tile past width - 1 others, so the parity of
+        the tile inversions, plus the row of the zero tile when the width
+        is even, never changes and must be even as it is when solved.
+        Inversions are counted with a Fenwick tree in O(n log n).
+        Returns a boolean
+        """
+        size = len(self._cells)
+        tree = [0] * (size + 1)
+        inversions = 0
+        seen = 0
+        for tile in self._cells:
+            if tile == 0:
+                continue
+            #Earlier tiles that are smaller than this one
+            idx = tile
+            smaller = 0
+            while idx > 0:
+                smaller += tree[idx]
+                idx -= idx & -idx
+            inversions += seen - smaller
+            idx = tile
+            while idx <= size:
+                tree[idx] += 1
+                idx += idx & -idx
+            seen += 1
+        if self._width % 2 == 0:
+            inversions += self._pos[0] // self._width
+        return inversions % 2 == 0
+
+    def _begin_moves(self):
+        """
+        Open the move buffer for a solve method.  Solve methods called from
+        inside another one play into the buffer their caller opened.
+        Returns a mark to hand to _end_moves
+        """
+        if self._moves is None:
+            self._moves = []
+            return None
+        return len(self._moves)
+
+    def _end_moves(self, mark):
+        """
+        Close the move buffer at the given mark, releasing the buffer if
+        the method that opened it is finishing
+        Returns the moves played since the mark as a string
+        """
+        if mark is None:
+            mov_string = "".join(self._moves)
+            self._moves = None
+            return mov_string
+        return "".join(self._moves[mark:])
+
+    def _play(self, move_string):
+        """
+        Updates the puzzle with move_string and appends it to the move
+        buffer
+        """
+        self.update_puzzle(move_string)
+        self._moves.append(move_string)
+
+    def _shrink_solved_start(self):
+        """
+        Move the start of the solved tail back over any cells in front of
+        it that have become solved
+        """
+        cells = self._cells
+        solved_start = self._solved_start
+        while solved_start and cells[solved_start - 1] == solved_start - 1:
+            solved_start -= 1
+        self._solved_start = solved_start
+
+    def _solved_from(self, start_idx):
+        """
+        Check whether every cell from flat index start_idx to the end of
+        the board holds its solved value
+        Returns a boolean
+        """
+        return self._solved_start <= start_idx
+
+    def _play_macro(self, kind, target_row, target_col):
+        """
+        Finish placing the tile of (target_row, target_col) with the
+        shortest macro for the solve method's window, if the tile and the
+        0 tile are both inside it.  Plays the moves into the move buffer.
+        Returns True if a macro was played
+        """
+        mov_string = fifteen_macros.lookup(kind, self._pos, self._height,
+                                           self._width, target_row,
+                                           target_col)
+        if mov_string is None:
+            return False
+        self._play(mov_string)
+        return True
 
     ##################################################################
     # Phase one methods
@@ -146,142 +487,122 @@ class Puzzle:
         at the given position in the bottom rows of the puzzle (target_row > 1)
         Returns a boolean
         """
-       #Checks that zero tile is at expected position
-        if self._grid[target_row][target_col] != 0:
-            return False
-        #Checks that rows below are solved
-        elif self._grid[target_row + 1:] != self._ref_solution[target_row +1:]:
-            return False
-        #Checks that columns to the right are solved
-        elif self._grid[target_row][target_col+1:] != self._ref_solution[target_row][target_col+1:]:
+        zero_idx = target_row * self._width + target_col
+        #Checks that zero tile is at expected position
+        if self._cells[zero_idx] != 0:
             return False
+        #Checks that columns to the right and rows below are solved
         else:
-            return True
+            return self._solved_from(zero_idx + 1)
     
     def _interior_early_fin_test(self, target_row, target_col):
         """
         Detects if the target tile is located at (target_row, target_col).  If
         it is, then check to see if the zero tile needs to be moved "left-down"
-        in order to prepare for the next tile to solve.  Returns a movement 
-        string and a logical value in an array [mov_string, Log].  The logical
-        value tells the method that calls this method whether or not it can exit.
+        in order to prepare for the next tile to solve.  Returns a logical
+        value that tells the method that calls this method whether or not it
+        can exit.  Any moves made are played into the move buffer.
         """
-        curr_row, curr_col = self.current_position(target_row, target_col)
         target_tup = (target_row, target_col)
-        curr_tup = (curr_row, curr_col)
-        mov_string = ""
+        curr_tup = self.current_position(target_row, target_col)
         
         if curr_tup == target_tup:
             zero_row, zero_col = self.current_position(0,0)
-            if self.lower_row_invariant(zero_row, zero_col):
-                return [mov_string, True]
-            else:
-                mov_string = mov_string + "ld"
-                self.update_puzzle("ld")
-                #print self.clone()
+            if not self.lower_row_invariant(zero_row, zero_col):
+                self._play("ld")
                 zero_row, zero_col = self.current_position(0,0)
                 assert(self.lower_row_invariant(zero_row, zero_col))
-                return [mov_string, True]
+            return True
             
-        return [mov_string, False]
+        return False
     
     def _place_0_for_pos_row(self, target_row, target_col):
         """
         Puts the zero tile in the optimum position to be used by
-        the _position_row method.  Returns a mov_string.  Updates 
-        the puzzle
+        the _position_row method.  Plays the moves into the move
+        buffer.
         """
         _, curr_col = self.current_position(target_row, target_col)
         zero_row, zero_col = self.current_position(0,0)
         
-        mov_string = ""
         if zero_row == 0:
             if zero_col > curr_col:
-                mov_string = mov_string + "dlu"
-                self.update_puzzle("dlu")
-                return mov_string
+                self._play("dlu")
             elif zero_col < curr_col:
-                mov_string = mov_string + "dru"
-                self.update_puzzle("dru")
-                return mov_string
+                self._play("dru")
         else:
             if zero_col > curr_col:
-                mov_string = mov_string + "ul"
-                self.update_puzzle("ul")
-                return mov_string
+                self._play("ul")
             elif zero_col < curr_col:
-                mov_string = mov_string + "ur"
-                self.update_puzzle("ur")
-                return mov_string
-            
-        return mov_string
+                self._play("ur")
 
     def solve_interior_tile(self, target_row, target_col):
         """
         Place correct tile at target position
         Updates puzzle and returns a move string
         """
-        mov_string = ""
+        mark = self._begin_moves()
         target_tup = (target_row, target_col)
         
+        #Shortest finish once the tile is close by
+        if self._play_macro("interior", target_row, target_col):
+            return self._end_moves(mark)
+        
         #Phase 1: Get 0 to target tile's current position
-        mov_string = mov_string + self._go_to_tile(target_tup)
+        self._go_to_tile(target_tup)
         
         #Test for early completion
-        ld_mov, log = self._interior_early_fin_test(target_row, target_col)
-        if log == True:
-            return mov_string + ld_mov
+        if self._interior_early_fin_test(target_row, target_col) or \
+                self._play_macro("interior", target_row, target_col):
+            return self._end_moves(mark)
 
         #Phase 2: Cycle target tile to correct column and prep for next phase
-        mov_string = mov_string + self._position_col(target_tup, target_tup)
+        self._position_col(target_tup, target_tup)
         
         #Test for Early Completion
-        ld_mov, log = self._interior_early_fin_test(target_row, target_col)
-        if log == True:
-            return mov_string + ld_mov
+        if self._interior_early_fin_test(target_row, target_col) or \
+                self._play_macro("interior", target_row, target_col):
+            return self._end_moves(mark)
         
         #Puts zero tile into optimal position for next step 
-        mov_string = mov_string + self._place_0_for_pos_row(target_row, target_col)
+        self._place_0_for_pos_row(target_row, target_col)
                 
         #Test for early completion
-        ld_mov, log = self._interior_early_fin_test(target_row, target_col)
-        if log == True:
-            return mov_string + ld_mov
+        if self._interior_early_fin_test(target_row, target_col) or \
+                self._play_macro("interior", target_row, target_col):
+            return self._end_moves(mark)
                 
         #Phase 3: Cycle target tile to correct row
-        mov_string = mov_string + self._position_row(target_tup, target_tup)
-        mov_string = mov_string + "ld"
-        self.update_puzzle("ld")
+        self._position_row(target_tup, target_tup)
+        self._play("ld")
         
         #Test the puzzle is in a solved state
         zero_row, zero_col = self.current_position(0,0)
         assert(self.lower_row_invariant(zero_row, zero_col))
 
-        return mov_string
+        return self._end_moves(mark)
     
     def _position_row(self, target_tup, dest_tup):
         """
         Takes a cloned puzzle board that has the target tile in the correct
-        column with the zero tile directly above it.  Recursive. for use
-        with solve_interior_tile.
+        column with the zero tile directly above it, and cycles the tile
+        down one row at a time until it reaches the destination row.  For
+        use with solve_interior_tile.
         """
         target_row, target_col = target_tup
         dest_row, dest_col = dest_tup
         curr_row, curr_col = self.current_position(target_row, target_col)
         assert(curr_col == dest_col)
         
-        if curr_row == dest_row:
-            return ""
-        elif curr_row < dest_row:
-            mov_down = "lddru"
-            self.update_puzzle(mov_down)
-            return mov_down + self._position_row(target_tup, dest_tup)
+        while curr_row < dest_row:
+            self._play("lddru")
+            curr_row, curr_col = self.current_position(target_row, target_col)
+            assert(curr_col == dest_col)
             
     def _go_to_tile(self, target_tup):
         """
         Takes zero tile and moves it the current location of target tile
         """
-        mov_string = ""
         target_row = target_tup[0]
         target_col = target_tup[1]
         curr_row, curr_col = self.current_position(target_row, target_col)
@@ -291,70 +612,55 @@ class Puzzle:
         col_dist = curr_col - zero_col
         
         #Traverses grid to destination
-        for dummy_i in range(0,abs(row_dist)):
-            if row_dist > 0:
-                mov_string = mov_string + "u"
-            elif row_dist < 0:
-                mov_string = mov_string + "d"
+        if row_dist > 0:
+            mov_string = "u" * row_dist
+        else:
+            mov_string = "d" * -row_dist
                 
-        for dummy_j in range(0,abs(col_dist)):
-            if col_dist > 0:
-                mov_string = mov_string + "r"
-            elif col_dist < 0:
-                mov_string = mov_string + "l"
+        if col_dist > 0:
+            mov_string = mov_string + "r" * col_dist
+        else:
+            mov_string = mov_string + "l" * -col_dist
         
-        self.update_puzzle(mov_string)
-        return mov_string
+        self._play(mov_string)
             
     def _position_col(self, target_tup, dest_tup):
         """
         Takes a cloned puzzle board that has the target tile in a
-        row with the zero tile directly to the side of it.  Recursive. For use
-        with solve_interior_tile.  Returns a move string and updates the puzzle.
+        row with the zero tile directly to the side of it, and cycles the
+        tile one column at a time until it reaches the destination column.
+        For use with solve_interior_tile.  Plays the moves into the move
+        buffer.
         """
         target_row, target_col = target_tup
         dest_col = dest_tup[1]
         curr_row, curr_col = self.current_position(target_row, target_col)
         
-        if curr_col == dest_col:
-
-            return ""
-        elif curr_col > dest_col:
-            if curr_row == 0:
-                #Use down cyclic action
-                mov_left = "dllur"
-                self.update_puzzle(mov_left)
-                return mov_left + self._position_col(target_tup, dest_tup)
-            else:
-                #Use up cyclic action
-                mov_left = "ulldr"
-                self.update_puzzle(mov_left)
-                return mov_left + self._position_col(target_tup, dest_tup)
-        elif curr_col < dest_col:
-            if curr_row == 0:
-                #Use down cyclic action
-                mov_right = "drrul"
-                self.update_puzzle(mov_right)
-                return mov_right + self._position_col(target_tup, dest_tup)
+        while curr_col != dest_col:
+            if curr_col > dest_col:
+                if curr_row == 0:
+                    #Use down cyclic action
+                    self._play("dllur")
+                else:
+                    #Use up cyclic action
+                    self._play("ulldr")
             else:
-                #Use up cyclic action
-                mov_right = "urrdl"
-                self.update_puzzle(mov_right)
-                return mov_right + self._position_col(target_tup, dest_tup)
+                if curr_row == 0:
+                    #Use down cyclic action
+                    self._play("drrul")
+                else:
+                    #Use up cyclic action
+                    self._play("urrdl")
+            curr_row, curr_col = self.current_position(target_row, target_col)
             
     def _carriage_return(self, target_row):
         """
         Performs a carriage return, moving the zero tile to the right
-        until lower_row_invariant returns True.  Returns a movement string
-        and updates the puzzle.
+        until lower_row_invariant returns True.  Plays the moves into the
+        move buffer.
         """
-        mov_string = ""
-        
         while self.lower_row_invariant(target_row-1,self._width - 1) is not True:
-            mov_string = mov_string + "r"
-            self.update_puzzle("r")
-            
-        return mov_string
+            self._play("r")
         
 
     def solve_col0_tile(self, target_row):
@@ -363,58 +669,62 @@ class Puzzle:
         Updates puzzle and returns a move string
         """
         assert(self.lower_row_invariant(target_row, 0))
-        # replace with your code
-        mov_string = ""
+        mark = self._begin_moves()
         magic_string = "ruldrdlurdluurddlur"
         
+        #Shortest finish once the tile is close by
+        if self._play_macro("col0", target_row, 0):
+            self._carriage_return(target_row)
+            return self._end_moves(mark)
+        
         #Moves 0 tile to default position
-        mov_string = mov_string + "u"
-        self.update_puzzle("u")
+        self._play("u")
         
         #Checks to see if tile is solved
         if self.current_position(target_row,0) == (target_row, 0):
-            mov_string = mov_string + self._carriage_return(target_row)
-            return mov_string
+            self._carriage_return(target_row)
+            return self._end_moves(mark)
         
-        mov_string = mov_string + "r"
-        self.update_puzzle("r")
+        self._play("r")
 
         dest_tup = (target_row - 1, 1)
         target_tup = (target_row, 0)
-        mov_string = mov_string + self._go_to_tile(target_tup)
+        self._go_to_tile(target_tup)
+        if self._play_macro("col0", target_row, 0):
+            self._carriage_return(target_row)
+            return self._end_moves(mark)
         
         #Test for solved state
         curr_tup = self.current_position(target_row,0)
         zero_tup = self.current_position(0,0)
         if curr_tup == (target_row - 1, 1) and zero_tup == (target_row - 1, 0):
-            mov_string = mov_string + magic_string
-            self.update_puzzle(magic_string)
-            mov_string = mov_string + self._carriage_return(target_row)
-            return mov_string
+            self._play(magic_string)
+            self._carriage_return(target_row)
+            return self._end_moves(mark)
         
         #Navigates tile to necessary column
-        mov_string = mov_string + self._position_col(target_tup, dest_tup)
+        self._position_col(target_tup, dest_tup)
         
         #Puts zero tile into optimal position for position_row 
-        mov_string = mov_string + self._place_0_for_pos_row(target_row, 0)
+        self._place_0_for_pos_row(target_row, 0)
+        if self._play_macro("col0", target_row, 0):
+            self._carriage_return(target_row)
+            return self._end_moves(mark)
         
         #Applies position_row, to cycle target tile into the correct row        
-        mov_string = mov_string + self._position_row(target_tup, dest_tup)  
+        self._position_row(target_tup, dest_tup)  
         
         assert(self.current_position(target_row, 0) == dest_tup)
-        mov_string = mov_string + "ld"
-        self.update_puzzle("ld")
+        self._play("ld")
         
         #Check for solvable puzzle state
         curr_tup = self.current_position(target_row,0)
         zero_tup = self.current_position(0,0)
         if curr_tup == (target_row - 1, 1) and zero_tup == (target_row - 1, 0):
-            mov_string = mov_string + magic_string
-            self.update_puzzle(magic_string)
-            mov_string = mov_string + self._carriage_return(target_row)
-            return mov_string
+            self._play(magic_string)
+            self._carriage_return(target_row)
         
-        return mov_string
+        return self._end_moves(mark)
 
     #############################################################
     # Phase two methods
@@ -425,17 +735,15 @@ class Puzzle:
         at the given column (col > 1)
         Returns a boolean
         """
+        below_idx = self._width + target_col
         #Is zero at correct position?
-        if self._grid[0][target_col] != 0:
-            return False
-        #Are columns to the right solved?
-        elif self._grid[0:1][target_col+1:]!= self._ref_solution[0:1][target_col+1:]:
+        if self._cells[target_col] != 0:
             return False
         #Are rows below solved
-        elif self._grid[2:]!= self._ref_solution[2:]:
+        elif not self._solved_from(2 * self._width):
             return False
         #Is slot below solved?
-        elif self._grid[1][target_col]!=self._ref_solution[1][target_col]:
+        elif self._cells[below_idx] != below_idx:
             return False
         else:
             return True
@@ -451,71 +759,69 @@ class Puzzle:
         # Test this
         
         #Does lower_row_invariant hold?
-        if self.lower_row_invariant(1, target_col) == False:
-            return False
-        #Are columns to the right solved?
-        elif self._grid[0:1][target_col + 1:] != self._ref_solution[0:1][target_col + 1:]:
-            return False
-        else:
-            return True
+        return self.lower_row_invariant(1, target_col)
 
     def solve_row0_tile(self, target_col):
         """
         Solve the tile in row zero at the specified column
         Updates puzzle and returns a move string
         """
-        mov_string = ""
+        mark = self._begin_moves()
         magic_string = "urdlurrdluldrruld"
         dest_tup = (1, target_col - 1)
         target_tup = (0, target_col)
+        
+        #Shortest finish once the tile is close by
+        if self._play_macro("row0", 0, target_col):
+            return self._end_moves(mark)
+        
         #Moves 0 tile to default position
-        mov_string = mov_string + "ld"
-        self.update_puzzle("ld")
+        self._play("ld")
         
         #Checks to see if tile is solved
         if self.current_position(0,target_col) == (0, target_col):
             
-            return mov_string
+            return self._end_moves(mark)
 
-        mov_string = mov_string + self._go_to_tile(target_tup)
+        self._go_to_tile(target_tup)
+        if self._play_macro("row0", 0, target_col):
+            return self._end_moves(mark)
         
         #Test for solved state
         curr_tup = self.current_position(0,target_col)
         zero_tup = self.current_position(0,0)
         if curr_tup == dest_tup and zero_tup == (1, target_col - 2):
-            mov_string = mov_string + magic_string
-            self.update_puzzle(magic_string)
-            return mov_string
+            self._play(magic_string)
+            return self._end_moves(mark)
         
         #Navigates tile to necessary column
-        mov_string = mov_string + self._position_col(target_tup, dest_tup)
+        self._position_col(target_tup, dest_tup)
         
         #Puts zero tile into optimal position for position_row 
-        mov_string = mov_string + self._place_0_for_pos_row(0, target_col)
+        self._place_0_for_pos_row(0, target_col)
+        if self._play_macro("row0", 0, target_col):
+            return self._end_moves(mark)
 
         #Applies position_row, to cycle target tile into the correct row        
-        mov_string = mov_string + self._position_row(target_tup, dest_tup)  
+        self._position_row(target_tup, dest_tup)  
         
         assert(self.current_position(0, target_col) == dest_tup)
-        mov_string = mov_string + "ld"
-        self.update_puzzle("ld")
+        self._play("ld")
         
         #Check for solvable puzzle state
         curr_tup = self.current_position(0,target_col)
         zero_tup = self.current_position(0,0)
         if curr_tup == dest_tup and zero_tup == (1, target_col - 2):
-            mov_string = mov_string + magic_string
-            self.update_puzzle(magic_string)
-            return mov_string
+            self._play(magic_string)
         
-        return mov_string
+        return self._end_moves(mark)
     
     def _row1_early_fin_test(self, target_row, target_col):
         """
         Detects if solve_row1_tile has solved for the current tile correctly.
         If so, it updates the puzzle accordingly to set up for the next tile.
-        Returns a movement string and a logical value in an array:
-        [mov_string, Log].
+        Returns a logical value telling the caller whether it can exit.
+        Any moves made are played into the move buffer.
         """
         curr_row, curr_col = self.current_position(target_row, target_col)
         target_tup = (target_row, target_col)
@@ -524,177 +830,478 @@ class Puzzle:
         if curr_tup == target_tup:
             zero_row, zero_col = self.current_position(0,0)
             if zero_row == target_row-1 and zero_col == target_col:
-                return ["", True]
+                return True
             elif zero_row == target_row and zero_col == target_col - 1:
-                self.update_puzzle("ur")
-                return ["ur", True]
+                self._play("ur")
+                return True
             elif zero_row == target_row - 1 and zero_col == target_col - 1:
-                self.update_puzzle("r")
-                return ["r", True]
+                self._play("r")
+                return True
             
-        return ["", False]
+        return False
 
     def solve_row1_tile(self, target_col):
         """
         Solve the tile in row one at the specified column
         Updates puzzle and returns a move string
         """        
-        mov_string = ""
+        mark = self._begin_moves()
         target_row = 1
         target_tup = (target_row, target_col)
         
+        #Shortest finish once the tile is close by
+        if self._play_macro("row1", target_row, target_col):
+            return self._end_moves(mark)
+        
         #Phase 1: Get 0 to target tile's current position
-        mov_string = mov_string + self._go_to_tile(target_tup)
+        self._go_to_tile(target_tup)
         
         #Test for early completion
-        place_mov, log = self._row1_early_fin_test(target_row, target_col)
-        if log == True:
-            return mov_string+place_mov
+        if self._row1_early_fin_test(target_row, target_col) or \
+                self._play_macro("row1", target_row, target_col):
+            return self._end_moves(mark)
 
         #Phase 2: Cycle target tile to correct column and prep for next phase
-        mov_string = mov_string + self._position_col(target_tup, target_tup)
+        self._position_col(target_tup, target_tup)
         
         #Test for Early Completion
-        place_mov, log = self._row1_early_fin_test(target_row, target_col)
-        if log == True:
-            return mov_string+place_mov
+        if self._row1_early_fin_test(target_row, target_col) or \
+                self._play_macro("row1", target_row, target_col):
+            return self._end_moves(mark)
         
         #Puts zero tile into optimal position for next step 
-        mov_string = mov_string + self._place_0_for_pos_row(target_row, target_col)
+        self._place_0_for_pos_row(target_row, target_col)
                 
         #Test for early completion
-        place_mov, log = self._row1_early_fin_test(target_row, target_col)
-        if log == True:
-            return mov_string+place_mov
+        if self._row1_early_fin_test(target_row, target_col) or \
+                self._play_macro("row1", target_row, target_col):
+            return self._end_moves(mark)
                 
         #Phase 3: Cycle target tile to correct row
-        mov_string = mov_string + self._position_row(target_tup, target_tup)
+        self._position_row(target_tup, target_tup)
         
-        place_mov, log = self._row1_early_fin_test(target_row, target_col)
-        if log == True:
-            return mov_string+place_mov
+        self._row1_early_fin_test(target_row, target_col)
         
-        return mov_string
+        return self._end_moves(mark)
 
     ###########################################################
     # Phase 3 methods
 
+    def _solve_corner(self, rows, cols):
+        """
+        Finish the upper left rows x cols corner with the shortest move
+        string from its endgame table
+        Raises UnsolvableError if the corner cannot be solved on its own
+        Updates the puzzle and returns a move string
+        """
+        mov_string = fifteen_endgame.lookup(self._cells, self._width, rows, cols)
+        if mov_string is None:
+            raise UnsolvableError("%dx%d corner cannot be solved" % (rows, cols))
+        mark = self._begin_moves()
+        self._play(mov_string)
+        return self._end_moves(mark)
+
     def solve_2x2(self):
         """
         Solve the upper left 2x2 part of the puzzle
+        Raises UnsolvableError if it cannot be solved
         Updates the puzzle and returns a move string
         """
-        mov_string = ""
-        early_stop_iter = 0
-        if self.current_position(0,0) == (0,0):
-            while self.lower_row_invariant(0,0)==False:
-                self.update_puzzle("drul")
-                mov_string = mov_string + "drul"
-                early_stop_iter = early_stop_iter + 1
-                if early_stop_iter > 24:
-                    return ""
-        elif self.current_position(0,0) == (1, 0):
-            self.update_puzzle("u")
-            mov_string = mov_string + "u"
-            
-            while self.lower_row_invariant(0,0)==False:
-                self.update_puzzle("drul")
-                mov_string = mov_string + "drul"
-                early_stop_iter = early_stop_iter + 1
-                if early_stop_iter > 24:
-                    return ""
-        
-        elif self.current_position(0,0) == (0, 1):
-            self.update_puzzle("l")
-            mov_string = mov_string + "l"
-            
-            while self.lower_row_invariant(0,0)==False:
-                self.update_puzzle("drul")
-                mov_string = mov_string + "drul"
-                early_stop_iter = early_stop_iter + 1
-                if early_stop_iter > 24:
-                    return ""
-                
-        elif self.current_position(0,0) == (1,1):
-            self.update_puzzle("ul")
-            mov_string = mov_string + "ul"
-            
-            while self.lower_row_invariant(0,0)==False:
-                self.update_puzzle("drul")
-                mov_string = mov_string + "drul"
-                early_stop_iter = early_stop_iter + 1
-                if early_stop_iter > 24:
-                    return ""
+        return self._solve_corner(2, 2)
 
-            return mov_string  
+    def solve_2x3(self):
+        """
+        Solve the upper left two rows by three columns of the puzzle
+        Raises UnsolvableError if they cannot be solved
+        Updates the puzzle and returns a move string
+        """
+        return self._solve_corner(2, 3)
+
+    def solve_3x2(self):
+        """
+        Solve the upper left three rows by two columns of the puzzle
+        Raises UnsolvableError if they cannot be solved
+        Updates the puzzle and returns a move string
+        """
+        return self._solve_corner(3, 2)
         
     def _go_to_end(self):
         """
         Takes the 0 tile to the end of the rainbow.
         """
         curr_row, curr_col = self.current_position(0,0)
-        curr_tup = (curr_row, curr_col)
-        
-        if curr_tup == (self._height - 1, self._width-1):
-            return ""
-        elif curr_row < self._height-1:
-            self.update_puzzle("d")
-            return "d" + self._go_to_end()
-        elif curr_col < self._width-1:
-            self.update_puzzle("r")
-            return "r" + self._go_to_end()
+        self._play("d" * (self._height - 1 - curr_row) +
+                   "r" * (self._width - 1 - curr_col))
 
-    def solve_puzzle(self):
+    def _walk_to_end(self):
         """
-        Generate a solution string for a puzzle
+        Takes the 0 tile to the lower right corner, as a solve method
         Updates the puzzle and returns a move string
         """
-        mov_string = ""
-        mov_string = mov_string + self._go_to_end()
+        mark = self._begin_moves()
+        self._go_to_end()
+        return self._end_moves(mark)
 
-        assert(self.current_position(0,0) == (self._height-1,self._width-1))
+    def _count_nodes(self, search):
+        """
+        Add the nodes a finished search expanded to the statistics, when
+        the puzzle is instrumented
+        """
+        if self._stats is not None:
+            self._stats.nodes_expanded += search.nodes_expanded
+
+    def _phase_step(self, phase, method, *args):
+        """
+        Runs one step of a solving phase, timing it when the puzzle is
+        instrumented
+        Returns the move string of the step
+        """
+        stats = self._stats
+        if stats is None:
+            return method(*args)
+        start = time.time()
+        mov_string = method(*args)
+        stats.add_phase(phase, time.time() - start, len(mov_string))
+        return mov_string
 
-        #Solves the lower row>1 tiles
-        for row_iter in reversed(range(2, self._height)):
+    def _iter_lower_rows(self, last_row):
+        """
+        Solve the rows from the bottom one up to last_row, a tile at a time,
+        starting with the 0 tile in the lower right corner
+        Updates the puzzle as it goes and yields non-empty move strings
+        """
+        for row_iter in reversed(range(last_row, self._height)):
             for col_iter in reversed(range(0, self._width)):
                 zero_row, zero_col = self.current_position(0,0)
                 if self.lower_row_invariant(row_iter, col_iter):
                     if col_iter > 0:
-                        mov_string = mov_string + self.solve_interior_tile(row_iter,col_iter)
+                        mov_string = self._phase_step("lower rows",
+                            self.solve_interior_tile, row_iter, col_iter)
                     elif col_iter == 0:
-                        mov_string = mov_string + self.solve_col0_tile(row_iter)
+                        mov_string = self._phase_step("lower rows",
+                            self.solve_col0_tile, row_iter)
+                    if mov_string:
+                        yield mov_string
                 elif self.lower_row_invariant(zero_row, zero_col):
                     #Necessary Nothing
                     #Checks for if the solver has gotten lucky
                     #And the puzzle has had multiple tiles "solve themselves"
-                    mov_string = mov_string + ""
+                    pass
                 else:
                     assert(self.lower_row_invariant(row_iter, col_iter))
+
+    def iter_solution(self):
+        """
+        Generate the solution for a puzzle one piece at a time, so callers
+        can start on the first moves while the rest are still being found:
+        the walk to the lower right corner, one piece per tile of the lower
+        rows, one per tile of rows one and zero, and then the upper left
+        corner, finished from an endgame table.
+        Raises UnsolvableError if the puzzle cannot be solved
+        Updates the puzzle as it goes and yields non-empty move strings
+        """
+        if not self.is_solvable():
+            raise UnsolvableError("puzzle cannot be solved")
+
+        #Every piece is played into a fresh move buffer
+        self._moves = None
+        mov_string = self._phase_step("lower rows", self._walk_to_end)
+        if mov_string:
+            yield mov_string
+
+        assert(self.current_position(0,0) == (self._height-1,self._width-1))
+
+        #Solves the lower row>1 tiles.  Boards two columns wide leave row
+        #two for the 3x2 endgame.
+        last_row = 2
+        if self._width == 2:
+            last_row = 3
+        for mov_string in self._iter_lower_rows(last_row):
+            yield mov_string
                 
         #Checks for Early solution of puzzle
-        zero_row, zero_col = self.current_position(0,0)
-        if zero_row in range(0, 2) and zero_col in range(0,2):    
-            mov_string = mov_string + self.solve_2x2()
-            return mov_string
+        if self._width == 2:
+            if self._height > 2:
+                mov_string = self._phase_step("endgame", self.solve_3x2)
+            else:
+                mov_string = self._phase_step("endgame", self.solve_2x2)
+            if mov_string:
+                yield mov_string
+            return
         
-        #Solves columns in row 1 and row 0
-        for col_iter in reversed(range(2, self._width)):
+        #Solves columns in row 1 and row 0, leaving the 2x3 corner
+        for col_iter in reversed(range(3, self._width)):
             for row_iter in reversed(range(0, 2)):
 
                 if row_iter == 1:
                     assert(self.row1_invariant(col_iter))
-                    mov_string = mov_string + self.solve_row1_tile(col_iter)
+                    mov_string = self._phase_step("rows 0 and 1",
+                        self.solve_row1_tile, col_iter)
                 elif row_iter == 0:
                     assert(self.row0_invariant(col_iter))
-                    mov_string = mov_string + self.solve_row0_tile(col_iter)
-                print self.clone()
-        #Solves the final 2x2 grid of values.  If the 2x2 isn't solvable,
-        #just returns the state of the puzzle after attempt to solve.
-        mov_string = mov_string + self.solve_2x2()
+                    mov_string = self._phase_step("rows 0 and 1",
+                        self.solve_row0_tile, col_iter)
+                if mov_string:
+                    yield mov_string
+                if self._stats is not None and self._stats.show_boards:
+                    print(self.clone())
+        #Solves the final 2x3 corner of values from its endgame table
+        mov_string = self._phase_step("endgame", self.solve_2x3)
+        if mov_string:
+            yield mov_string
 
-        
+    def solve_puzzle(self, optimize=False):
+        """
+        Generate a solution string for a puzzle by joining the pieces of
+        iter_solution.  With optimize set, stretches of the solution that
+        bring the board back to an earlier state are cut out afterwards.
+        Raises UnsolvableError if the puzzle cannot be solved
+        Updates the puzzle and returns a move string
+        """
+        if not optimize:
+            return "".join(self.iter_solution())
+
+        start = self.clone()
+        mov_string = "".join(self.iter_solution())
+        shorter = fifteen_postopt.shorten(start, mov_string)
+        if self._stats is not None:
+            self._stats.moves_saved += len(mov_string) - len(shorter)
+        return shorter
+
+    ###########################################################
+    # Hybrid solving
+
+    def _solve_band_columns(self, rows, cols):
+        """
+        Solve the columns from the right edge down to cols of the top rows
+        of the puzzle, everything below them being solved.  The band is
+        transposed into a puzzle of its own, so the phase one methods solve
+        its columns as rows; the band's moves are mapped back by swapping
+        l with u and r with d.
+        Updates the puzzle and returns a move string
+        """
+        width = self._width
+        grid = [[0] * rows for _ in range(width)]
+        for row in range(rows):
+            for col in range(width):
+                tile_row, tile_col = divmod(self._cells[row * width + col],
+                                            width)
+                grid[col][row] = tile_col * rows + tile_row
+        band = Puzzle(width, rows, grid)
+        mov_string = "".join(band._iter_lower_rows(cols))
+        mov_string = fifteen_search.transpose_moves(mov_string)
+        self.update_puzzle(mov_string)
+        return mov_string
+
+    def _corner_puzzle(self, rows, cols):
+        """
+        The upper left rows x cols corner as a puzzle of its own, for a
+        board where only tiles of the corner are left in it.  The tiles are
+        renumbered for the smaller board, so its moves play unchanged on
+        this one.
+        Returns a Puzzle object
+        """
+        grid = []
+        for row in range(rows):
+            grid.append([])
+            for col in range(cols):
+                tile_row, tile_col = divmod(self._cells[row * self._width + col],
+                                            self._width)
+                grid[row].append(tile_row * cols + tile_col)
+        return Puzzle(rows, cols, grid)
+
+    def solve_hybrid(self, rows=None, cols=None, max_nodes=None,
+                     timeout=None):
+        """
+        Generate a short solution for a large board: the greedy phases
+        reduce the board until only its upper left rows x cols corner is
+        unsolved, and solve_optimal finishes the corner.  The corner is
+        4x4 when the 4x4 pattern databases have been built and 3x3,
+        finished from the 3x3 distance table, otherwise; searches of
+        corners larger than 3x3 give up after max_nodes nodes (by default
+        HYBRID_NODES) or timeout seconds, and the greedy phases then
+        finish the corner from where the board stands.  The answer is
+        post-optimized, and the post-optimized greedy answer is returned
+        instead when that is shorter.
+        Raises UnsolvableError if the puzzle cannot be solved
+        Updates the puzzle and returns a move string
+        """
+        if not self.is_solvable():
+            raise UnsolvableError("puzzle cannot be solved")
+        size = fifteen_eight.HEIGHT
+        if fifteen_pdb.find_database(4, 4) is not None:
+            size = 4
+        if rows is None:
+            rows = size
+        if cols is None:
+            cols = size
+        assert rows >= 2 and cols >= 2, "corner must be at least 2x2"
+        rows = min(rows, self._height)
+        cols = min(cols, self._width)
+        if max_nodes is None and rows * cols > fifteen_eight.SIZE:
+            max_nodes = HYBRID_NODES
+
+        start = self.clone()
+        self._moves = None
+        pieces = []
+        #A corner covering the whole board is searched as it stands
+        if rows < self._height or cols < self._width:
+            pieces.append(self._walk_to_end())
+            pieces.extend(self._iter_lower_rows(rows))
+        if cols < self._width:
+            pieces.append(self._solve_band_columns(rows, cols))
+
+        corner = self._corner_puzzle(rows, cols)
+        corner.instrument(self._stats)
+        mov_string = corner.solve_optimal(max_nodes=max_nodes,
+                                          timeout=timeout)
+        if mov_string is None:
+            mov_string = "".join(corner.iter_solution())
+        self.update_puzzle(mov_string)
+        pieces.append(mov_string)
+
+        mov_string = fifteen_postopt.shorten(start, "".join(pieces))
+        greedy = start.solve_puzzle(optimize=True)
+        if len(greedy) < len(mov_string):
+            return greedy
+        return mov_string
+
+    ###########################################################
+    # Optimal solving
+
+    def solve_optimal(self, max_nodes=None, timeout=None, workers=1,
+                      heuristic="default"):
+        """
+        Generate a shortest solution string with iterative-deepening A*,
+        guided by the pattern databases when their tables have been built
+        and by Manhattan distance plus linear conflicts otherwise; heuristic
+        may name another of fifteen_search.HEURISTICS, such as "walking".
+        Gives up once max_nodes nodes have been expanded or timeout seconds
+        have passed.  With more than one worker the search is spread over
+        that many processes (None for one per CPU).  With the default
+        heuristic and one worker, 3x3 boards are solved from the complete
+        distance table instead when it has been built; the table expands
+        no nodes, so max_nodes and timeout cannot cut it short.
+        Raises UnsolvableError if the puzzle cannot be solved
+        Updates the puzzle and returns a move string, or None on give-up
+        """
+        if not self.is_solvable():
+            raise UnsolvableError("puzzle cannot be solved")
+
+        if heuristic == "default" and workers == 1 and \
+                (self._height, self._width) == (fifteen_eight.HEIGHT,
+                                                fifteen_eight.WIDTH):
+            table = fifteen_eight.find_table()
+            if table is not None:
+                mov_string = table.solve(self._cells)
+                self.update_puzzle(mov_string)
+                return mov_string
+        if workers == 1:
+            search = fifteen_search.IDAStar(
+                self._cells, self._height, self._width,
+                fifteen_search.make_heuristic(heuristic, self._height,
+                                              self._width),
+                max_nodes=max_nodes, timeout=timeout)
+        else:
+            search = fifteen_parallel.ParallelIDAStar(
+                self._cells, self._height, self._width, workers=workers,
+                max_nodes=max_nodes, timeout=timeout, heuristic=heuristic)
+        mov_string = search.solve()
+        self._count_nodes(search)
+        if mov_string is not None:
+            self.update_puzzle(mov_string)
         return mov_string
 
+    def solve_within(self, budget_ms, weights=(5, 3, 2, 1.5, 1.25, 1)):
+        """
+        Generate the best solution that can be found in budget_ms
+        milliseconds.  The post-optimized greedy answer is the baseline;
+        weighted A* then runs with each of the falling weights in turn,
+        only looking for answers shorter than the best so far.  An answer
+        found with weight w is at most w times too long, which gives a
+        lower bound, and a search that runs out of boards proves the best
+        answer shortest.  The greedy answer is always finished, so on
+        boards too large for it to fit in the budget the budget is overrun
+        by that much; the search tables are only built when time is left.
+        Raises UnsolvableError if the puzzle cannot be solved
+        Updates the puzzle and returns an AnytimeResult
+        """
+        deadline = time.time() + budget_ms / 1000.0
+        cells = list(self._cells)
+        best = self.solve_puzzle(optimize=True)
+
+        #Manhattan distance needs no tables, so a budget spent on the
+        #greedy answer still gets a bound without overrunning
+        lower = fifteen_search.manhattan_distance(cells, self._height,
+                                                  self._width)
+        if lower >= len(best) or time.time() >= deadline:
+            return AnytimeResult(best, lower >= len(best),
+                                 min(lower, len(best)))
+
+        heuristic = fifteen_search.default_heuristic(self._height, self._width)
+        lower = max(lower, heuristic.reset(list(cells)))
+        for weight in weights:
+            if lower >= len(best) or time.time() >= deadline:
+                break
+            search = fifteen_search.WeightedAStar(
+                cells, self._height, self._width, weight, heuristic,
+                cutoff=len(best), deadline=deadline)
+            mov_string = search.solve()
+            self._count_nodes(search)
+            if mov_string is not None:
+                best = mov_string
+                lower = max(lower, int(math.ceil(len(best) / float(weight))))
+            elif search.exhausted:
+                lower = len(best)
+            #Every solution has the same parity of length
+            if (len(best) - lower) % 2:
+                lower += 1
+        #Any answer leaves the puzzle solved, as the greedy one already did
+        return AnytimeResult(best, lower >= len(best), min(lower, len(best)))
+
+class _InstrumentedPuzzle(Puzzle):
+    """
+    Puzzle that counts calls to its hot methods into its SolveStats.
+    Puzzle.instrument switches puzzles to and from this class.
+    """
+
+    __slots__ = ()
+
+    def current_position(self, solved_row, solved_col):
+        """
+        Counted version of Puzzle.current_position
+        """
+        self._stats.calls["current_position"] += 1
+        return Puzzle.current_position(self, solved_row, solved_col)
+
+    def update_puzzle(self, move_string):
+        """
+        Counted version of Puzzle.update_puzzle
+        """
+        self._stats.calls["update_puzzle"] += 1
+        Puzzle.update_puzzle(self, move_string)
+
+    def lower_row_invariant(self, target_row, target_col):
+        """
+        Counted version of Puzzle.lower_row_invariant
+        """
+        self._stats.calls["lower_row_invariant"] += 1
+        return Puzzle.lower_row_invariant(self, target_row, target_col)
+
+    def row0_invariant(self, target_col):
+        """
+        Counted version of Puzzle.row0_invariant
+        """
+        self._stats.calls["row0_invariant"] += 1
+        return Puzzle.row0_invariant(self, target_col)
+
+    def row1_invariant(self, target_col):
+        """
+        Counted version of Puzzle.row1_invariant
+        """
+        self._stats.calls["row1_invariant"] += 1
+        return Puzzle.row1_invariant(self, target_col)
+
 # Start interactive simulation
 #Depends on custom Python modules developed for the Coursera course.
 #poc_fifteen_gui.FifteenGUI(Puzzle(4, 4))
@@ -0,0 +1,542 @@
+# -*- coding: utf-8 -*-
+"""
+Optimal search for the Fifteen puzzle
+Boards are flat row-major lists of tile values with the blank as zero; the
+solved board holds tile i in cell i, so the blank finishes in the upper left.
+Moves use the same "l", "r", "u", "d" alphabet as Puzzle.update_puzzle and
+name the direction the blank travels.
+"""
+
+import heapq
+import operator
+import time
+
+import fifteen_bitboard
+import fifteen_pdb
+import fifteen_walking
+
+INVERSE = {"l": "r", "r": "l", "u": "d", "d": "u"}
+
+#Moves of a board seen through its transpose
+TRANSPOSE = {"l": "u", "u": "l", "r": "d", "d": "r"}
+_TRANSPOSE_TABLE = dict((ord(old), new)
+                        for old, new in TRANSPOSE.items())
+
+#Sentinel returned by the depth-first pass once the goal is reached
+FOUND = -1
+
+
+class SearchAborted(Exception):
+    """
+    Raised inside a search when its node or time budget runs out
+    """
+    pass
+
+
+def move_table(height, width):
+    """
+    Build the neighbour table for a height x width board
+    Returns a list indexed by blank cell of (direction, tile cell, inverse
+    direction) tuples
+    """
+    table = []
+    for idx in range(height * width):
+        row, col = divmod(idx, width)
+        moves = []
+        if col > 0:
+            moves.append(("l", idx - 1, "r"))
+        if col < width - 1:
+            moves.append(("r", idx + 1, "l"))
+        if row > 0:
+            moves.append(("u", idx - width, "d"))
+        if row < height - 1:
+            moves.append(("d", idx + width, "u"))
+        table.append(tuple(moves))
+    return table
+
+
+def transpose_moves(mov_string):
+    """
+    Turn a move string for a board into one for its transpose, and back
+    Returns a move string
+    """
+    return mov_string.translate(_TRANSPOSE_TABLE)
+
+
+#########################################################
+# Heuristics
+#
+# A heuristic is reset once with the starting board and then told about
+# every move the search makes.  move() is called after the board has been
+# updated and returns the change in the estimate; undo() is called after the
+# board has been restored so that any cached per-line values can be rebuilt.
+
+def manhattan_distance(cells, height, width):
+    """
+    Sum over all tiles of the Manhattan distance to the solved cell,
+    without the tables a Manhattan heuristic builds
+    Returns an integer
+    """
+    total = 0
+    for idx, tile in enumerate(cells):
+        if tile:
+            total += abs(tile // width - idx // width) + \
+                abs(tile % width - idx % width)
+    return total
+
+
+class Manhattan(object):
+    """
+    Sum over all tiles of the Manhattan distance to the solved cell
+    """
+
+    def __init__(self, height, width):
+        """
+        Precompute the distance from every cell to every solved cell
+        """
+        self._height = height
+        self._width = width
+        size = height * width
+        #Row part of the distance by goal row and column part by goal
+        #column, each listed over all cells; a tile's row is their sum
+        row_parts = [[abs(goal - row) for row in range(height)
+                      for _ in range(width)]
+                     for goal in range(height)]
+        col_parts = [[abs(goal - col) for col in range(width)] * height
+                     for goal in range(width)]
+        self._dist = [list(map(operator.add, row_parts[tile // width],
+                               col_parts[tile % width]))
+                      for tile in range(size)]
+        self._dist[0] = [0] * size
+
+    def reset(self, cells):
+        """
+        Start tracking the given board
+        Returns the estimate for it
+        """
+        dist = self._dist
+        return sum(dist[tile][idx] for idx, tile in enumerate(cells))
+
+    def move(self, cells, tile, from_idx, to_idx):
+        """
+        Account for tile having slid from from_idx to to_idx
+        Returns the change in the estimate
+        """
+        dist = self._dist[tile]
+        return dist[to_idx] - dist[from_idx]
+
+    def undo(self, cells, tile, from_idx, to_idx):
+        """
+        Account for the last move of tile having been taken back
+        """
+        pass
+
+
+class LinearConflict(Manhattan):
+    """
+    Manhattan distance plus two moves for every tile that has to leave its
+    solved row or column to let another tile in that line pass it
+    """
+
+    def __init__(self, height, width):
+        """
+        Precompute the distance tables and the empty per-line caches
+        """
+        Manhattan.__init__(self, height, width)
+        self._row_conflicts = [0] * height
+        self._col_conflicts = [0] * width
+        self._memo = {}
+
+    def _line_conflicts(self, goals):
+        """
+        Extra moves forced by a line whose tiles all belong in it, listed
+        by the goal offsets in their current order.  Every tile outside a
+        longest increasing run has to step out of the line and back.
+        Returns an integer
+        """
+        if len(goals) < 2:
+            return 0
+        goals = tuple(goals)
+        extra = self._memo.get(goals)
+        if extra is None:
+            longest = []
+            for goal in goals:
+                best = 1
+                for prev_goal, prev_len in zip(goals, longest):
+                    if prev_goal < goal and prev_len >= best:
+                        best = prev_len + 1
+                longest.append(best)
+            extra = 2 * (len(goals) - max(longest))
+            self._memo[goals] = extra
+        return extra
+
+    def _row_value(self, cells, row):
+        """
+        Linear conflicts in the given row
+        Returns an integer
+        """
+        width = self._width
+        goals = []
+        for tile in cells[row * width:(row + 1) * width]:
+            if tile and tile // width == row:
+                goals.append(tile % width)
+        return self._line_conflicts(goals)
+
+    def _col_value(self, cells, col):
+        """
+        Linear conflicts in the given column
+        Returns an integer
+        """
+        width = self._width
+        goals = []
+        for tile in cells[col::width]:
+            if tile and tile % width == col:
+                goals.append(tile // width)
+        return self._line_conflicts(goals)
+
+    def reset(self, cells):
+        """
+        Start tracking the given board
+        Returns the estimate for it
+        """
+        self._row_conflicts = [self._row_value(cells, row)
+                               for row in range(self._height)]
+        self._col_conflicts = [self._col_value(cells, col)
+                               for col in range(self._width)]
+        return (Manhattan.reset(self, cells) + sum(self._row_conflicts) +
+                sum(self._col_conflicts))
+
+    def move(self, cells, tile, from_idx, to_idx):
+        """
+        Account for tile having slid from from_idx to to_idx.  Only the two
+        lines the tile crossed between can change their conflicts.
+        Returns the change in the estimate
+        """
+        dist = self._dist[tile]
+        delta = dist[to_idx] - dist[from_idx]
+        width = self._width
+        if from_idx % width == to_idx % width:
+            conflicts = self._row_conflicts
+            for row in (from_idx // width, to_idx // width):
+                value = self._row_value(cells, row)
+                delta += value - conflicts[row]
+                conflicts[row] = value
+        else:
+            conflicts = self._col_conflicts
+            for col in (from_idx % width, to_idx % width):
+                value = self._col_value(cells, col)
+                delta += value - conflicts[col]
+                conflicts[col] = value
+        return delta
+
+    def undo(self, cells, tile, from_idx, to_idx):
+        """
+        Account for the last move of tile having been taken back
+        """
+        width = self._width
+        if from_idx % width == to_idx % width:
+            for row in (from_idx // width, to_idx // width):
+                self._row_conflicts[row] = self._row_value(cells, row)
+        else:
+            for col in (from_idx % width, to_idx % width):
+                self._col_conflicts[col] = self._col_value(cells, col)
+
+
+def default_heuristic(height, width):
+    """
+    Strongest heuristic available for a height x width board: the pattern
+    databases if their tables have been built, otherwise Manhattan
+    distance plus linear conflicts
+    Returns a heuristic object
+    """
+    database = fifteen_pdb.find_database(height, width)
+    if database is not None:
+        return fifteen_pdb.PatternHeuristic(database)
+    return LinearConflict(height, width)
+
+
+#Heuristics that can be asked for by name
+HEURISTICS = ("default", "manhattan", "linear", "walking")
+
+
+def make_heuristic(name, height, width):
+    """
+    Heuristic for a height x width board by its name in HEURISTICS:
+    default_heuristic, Manhattan distance, Manhattan distance plus linear
+    conflicts, or walking distance
+    Returns a heuristic object
+    """
+    assert name in HEURISTICS, "unknown heuristic: " + str(name)
+    if name == "manhattan":
+        return Manhattan(height, width)
+    elif name == "linear":
+        return LinearConflict(height, width)
+    elif name == "walking":
+        return fifteen_walking.WalkingDistance(height, width)
+    return default_heuristic(height, width)
+
+
+#########################################################
+# Iterative-deepening A*
+
+class IDAStar(object):
+    """
+    Iterative-deepening A* search from one board to the solved board
+    """
+
+    def __init__(self, cells, height, width, heuristic=None,
+                 max_nodes=None, timeout=None, stop=None):
+        """
+        Set up a search from the flat board cells.  The heuristic defaults
+        to default_heuristic(height, width); max_nodes and timeout (in
+        seconds) bound the total work over all iterations.  stop, if
+        given, is an event such as multiprocessing.Event that aborts the
+        search once set.
+        """
+        self._start = list(cells)
+        self._height = height
+        self._width = width
+        self._goal = list(range(height * width))
+        self._moves = move_table(height, width)
+        if heuristic is None:
+            heuristic = default_heuristic(height, width)
+        self._heuristic = heuristic
+        self._max_nodes = max_nodes
+        self._timeout = timeout
+        self._stop = stop
+        self._deadline = None
+        self._path = []
+        self.nodes_expanded = 0
+        self.bound = 0
+
+    def solve(self):
+        """
+        Run the search to completion or until the budget runs out.  After
+        a give-up, bound holds the best lower bound proved on the length.
+        Returns a shortest move string, or None if the budget ran out
+        """
+        cells = list(self._start)
+        blank = cells.index(0)
+        estimate = self._heuristic.reset(cells)
+        if self._timeout is not None:
+            self._deadline = time.time() + self._timeout
+        self.bound = estimate
+        self._path = []
+        while True:
+            try:
+                result = self._dfs(cells, blank, 0, estimate, None)
+            except SearchAborted:
+                return None
+            if result == FOUND:
+                return "".join(self._path)
+            self.bound = result
+
+    def run_pass(self, bound, cost=0, forbidden=None, deadline=None):
+        """
+        One depth-first pass from the starting board below bound, counting
+        the start as cost moves deep and never playing the move forbidden
+        first.  Lets a caller run the subtrees of one iteration apart.
+        Raises SearchAborted if the budget runs out
+        Returns a (move string or None, next bound) pair; the move string
+        is set if the goal was reached
+        """
+        cells = list(self._start)
+        estimate = self._heuristic.reset(cells)
+        self._deadline = deadline
+        self.bound = bound
+        self._path = []
+        result = self._dfs(cells, cells.index(0), cost, estimate, forbidden)
+        if result == FOUND:
+            return "".join(self._path), bound
+        return None, result
+
+    def _dfs(self, cells, blank, cost, estimate, forbidden):
+        """
+        Depth-first pass below the current bound.  forbidden is the move
+        that would undo the one that led here.
+        Returns FOUND, or the smallest f-value that exceeded the bound
+        """
+        total = cost + estimate
+        if total > self.bound:
+            return total
+        if estimate == 0 and cells == self._goal:
+            return FOUND
+
+        self.nodes_expanded += 1
+        if self._max_nodes is not None and \
+                self.nodes_expanded > self._max_nodes:
+            raise SearchAborted()
+        if self.nodes_expanded & 1023 == 0:
+            if self._deadline is not None and time.time() > self._deadline:
+                raise SearchAborted()
+            if self._stop is not None and self._stop.is_set():
+                raise SearchAborted()
+
+        heuristic = self._heuristic
+        path = self._path
+        next_bound = float("inf")
+        for direction, tile_idx, inverse in self._moves[blank]:
+            if direction == forbidden:
+                continue
+            tile = cells[tile_idx]
+            cells[blank] = tile
+            cells[tile_idx] = 0
+            delta = heuristic.move(cells, tile, tile_idx, blank)
+            path.append(direction)
+            result = self._dfs(cells, tile_idx, cost + 1, estimate + delta,
+                               inverse)
+            if result == FOUND:
+                return FOUND
+            path.pop()
+            cells[tile_idx] = tile
+            cells[blank] = 0
+            heuristic.undo(cells, tile, tile_idx, blank)
+            if result < next_bound:
+                next_bound = result
+        return next_bound
+
+
+#########################################################
+# Weighted A*
+
+class WeightedAStar(object):
+    """
+    Best-first search ordered by cost + weight * estimate.  With an
+    admissible heuristic the answer is at most weight times longer than a
+    shortest one, and weight 1 gives plain A*.  Boards reached again more
+    cheaply are reopened, which keeps that guarantee for inconsistent
+    heuristics.  Boards of at most 16 cells are kept as fifteen_bitboard
+    integers, larger ones as tuples.
+    """
+
+    def __init__(self, cells, height, width, weight=1.0, heuristic=None,
+                 cutoff=None, deadline=None, max_nodes=None):
+        """
+        Set up a search from the flat board cells.  Boards whose cost plus
+        estimate reaches cutoff are never expanded, so only answers shorter
+        than cutoff are found.  deadline is a time.time() value.
+        """
+        self._size = height * width
+        self._packed = self._size <= fifteen_bitboard.MAX_CELLS
+        self._start = self._key(cells)
+        self._start_blank = list(cells).index(0)
+        self._height = height
+        self._width = width
+        self._goal = self._key(range(self._size))
+        self._moves = move_table(height, width)
+        if heuristic is None:
+            heuristic = default_heuristic(height, width)
+        self._heuristic = heuristic
+        self._weight = weight
+        self._cutoff = cutoff
+        self._deadline = deadline
+        self._max_nodes = max_nodes
+        self.nodes_expanded = 0
+        #Set once the search has run out of boards under the cutoff
+        self.exhausted = False
+
+    def estimate(self):
+        """
+        Heuristic value of the starting board
+        Returns an integer
+        """
+        return self._heuristic.reset(self._cells(self._start))
+
+    def _key(self, cells):
+        """
+        Dictionary key of a flat board
+        Returns a packed integer or a tuple
+        """
+        if self._packed:
+            return fifteen_bitboard.pack(cells)
+        return tuple(cells)
+
+    def _cells(self, key):
+        """
+        Flat board of a dictionary key
+        Returns a list of integers
+        """
+        if self._packed:
+            return fifteen_bitboard.unpack(key, self._size)
+        return list(key)
+
+    def solve(self):
+        """
+        Run the search until it finds an answer under the cutoff, runs out
+        of boards or runs out of budget
+        Returns a move string, or None if no answer was found
+        """
+        heuristic = self._heuristic
+        weight = self._weight
+        cutoff = self._cutoff
+        if cutoff is None:
+            cutoff = float("inf")
+        packed = self._packed
+        start = self._start
+        start_estimate = heuristic.reset(self._cells(start))
+        #Best known cost and (parent, move) for every board reached
+        costs = {start: 0}
+        parents = {start: None}
+        heap = [(weight * start_estimate, start_estimate, 0, 0, start,
+                 self._start_blank)]
+        counter = 1
+        while heap:
+            _, _, _, cost, state, blank = heapq.heappop(heap)
+            if costs[state] < cost:
+                continue
+            if state == self._goal:
+                return self._path(parents, state)
+
+            self.nodes_expanded += 1
+            if self._max_nodes is not None and \
+                    self.nodes_expanded > self._max_nodes:
+                return None
+            if self._deadline is not None and \
+                    self.nodes_expanded & 255 == 0 and \
+                    time.time() > self._deadline:
+                return None
+
+            cells = self._cells(state)
+            estimate = heuristic.reset(cells)
+            child_cost = cost + 1
+            for direction, tile_idx, _ in self._moves[blank]:
+                tile = cells[tile_idx]
+                cells[blank] = tile
+                cells[tile_idx] = 0
+                child_estimate = estimate + heuristic.move(cells, tile,
+                                                           tile_idx, blank)
+                if packed:
+                    child = state + (tile << (4 * blank)) - \
+                        (tile << (4 * tile_idx))
+                else:
+                    child = tuple(cells)
+                cells[tile_idx] = tile
+                cells[blank] = 0
+                heuristic.undo(cells, tile, tile_idx, blank)
+                if child_cost + child_estimate >= cutoff:
+                    continue
+                known = costs.get(child)
+                if known is not None and known <= child_cost:
+                    continue
+                costs[child] = child_cost
+                parents[child] = (state, direction)
+                heapq.heappush(heap, (child_cost + weight * child_estimate,
+                                      child_estimate, counter, child_cost,
+                                      child, tile_idx))
+                counter += 1
+        self.exhausted = True
+        return None
+
+    def _path(self, parents, state):
+        """
+        Follow parent links back from state to the start
+        Returns a move string
+        """
+        path = []
+        link = parents[state]
+        while link is not None:
+            state, direction = link
+            path.append(direction)
+            link = parents[state]
+        path.reverse()
+        return "".join(path)
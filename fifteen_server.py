@@ -0,0 +1,395 @@
+# -*- coding: utf-8 -*-
+"""
+Asyncio solving service for the Fifteen puzzle
+Clients connect over localhost TCP or a Unix socket and send one JSON
+object per line:
+
+    {"id": 1, "grid": [[1, 0], [2, 3]], "method": "greedy",
+     "deadline_ms": 500, "options": {}}
+    {"id": 2, "op": "metrics"}
+
+and get one JSON object per line back, in completion order, carrying the
+same id and a status of "ok" (with "moves"), "error", "deadline" or
+"overloaded".
+
+Boards are solved on a process pool; the event loop only parses, queues
+and replies.  The queue of waiting boards is bounded and a full queue
+turns requests away at once.  Each connection has a limit on requests in
+flight, past which the server stops reading from it.  A request still
+queued when its deadline passes is dropped without being solved.  Once a
+board is handed to a worker, optimal searches and the corner search of
+hybrid solves get the time left as their timeout; greedy solves cannot
+be interrupted, so for them the deadline covers queueing only and a
+late solve still runs to the end on its worker, though the client is
+answered "deadline" on time.  Identical requests that arrive while a
+board is queued or being solved share its answer.
+"""
+
+import asyncio
+import collections
+import concurrent.futures
+import json
+import os
+import sys
+
+import fifteen_batch
+
+STATUSES = ("ok", "error", "deadline", "overloaded")
+
+#Longest line either side accepts; move strings of big boards run to
+#megabytes
+LINE_LIMIT = 1 << 26
+
+
+def _solve_record(data, height, width, method, options):
+    """
+    Worker entry point: solve one packed board
+    Returns a (move string or None, error message or None) pair
+    """
+    try:
+        moves = fifteen_batch.solve_one(fifteen_batch.decode(data, height,
+                                                             width),
+                                        method, options)
+    except Exception as exc:
+        return None, "%s: %s" % (type(exc).__name__, exc)
+    if moves is None:
+        return None, "search budget exhausted"
+    return moves, None
+
+
+def _grid_error(grid):
+    """
+    Check that a request's grid is a board of at least 2x2 holding every
+    tile once
+    Returns an error message, or None for a good grid
+    """
+    if not isinstance(grid, list) or not grid or \
+            not all(isinstance(row, list) for row in grid):
+        return "grid must be a list of rows"
+    height, width = len(grid), len(grid[0])
+    if height < 2 or width < 2:
+        return "grid must be at least 2x2"
+    if any(len(row) != width for row in grid):
+        return "rows must all have %d tiles" % width
+    tiles = [tile for row in grid for tile in row]
+    if not all(isinstance(tile, int) for tile in tiles) or \
+            sorted(tiles) != list(range(height * width)):
+        return "grid must hold the tiles 0 to %d once each" % \
+            (height * width - 1)
+    return None
+
+
+class _Job(object):
+    """
+    One board waiting for or being solved, shared by every request for it
+    """
+
+    __slots__ = ("key", "data", "height", "width", "method", "options",
+                 "deadline", "waiters", "future")
+
+    def __init__(self, key, data, height, width, method, options, deadline,
+                 future):
+        self.key = key
+        self.data = data
+        self.height = height
+        self.width = width
+        self.method = method
+        self.options = options
+        self.deadline = deadline
+        self.waiters = 1
+        self.future = future
+
+
+class SolveServer(object):
+    """
+    JSON-lines solving server running on the current event loop
+    """
+
+    def __init__(self, workers=None, max_queue=256, max_inflight=32,
+                 default_deadline_ms=10000, history=1000):
+        """
+        Set up a server with a pool of workers processes (one per CPU by
+        default), at most max_queue boards waiting and at most
+        max_inflight unanswered requests per connection.  Latency
+        percentiles cover the last history answered requests.
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        self._workers = workers
+        self._max_inflight = max_inflight
+        self._default_deadline_ms = default_deadline_ms
+        self._queue = asyncio.Queue(max_queue)
+        self._jobs = {}
+        self._pool = None
+        self._server = None
+        self._dispatchers = []
+        self._busy = 0
+        self._latencies = collections.deque(maxlen=history)
+        self.counts = dict((status, 0) for status in STATUSES)
+        self.coalesced = 0
+        self.expired = 0
+
+    async def start(self, host="127.0.0.1", port=0, path=None):
+        """
+        Start the worker pool and listen on a Unix socket at path, or on
+        host and port (0 picks a free port)
+        Returns the listening address
+        """
+        self._pool = concurrent.futures.ProcessPoolExecutor(self._workers)
+        self._dispatchers = [asyncio.ensure_future(self._dispatch())
+                             for _ in range(self._workers)]
+        if path is not None:
+            self._server = await asyncio.start_unix_server(
+                self._handle, path, limit=LINE_LIMIT)
+        else:
+            self._server = await asyncio.start_server(
+                self._handle, host, port, limit=LINE_LIMIT)
+        return self._server.sockets[0].getsockname()
+
+    async def serve_forever(self):
+        """
+        Serve until cancelled
+        """
+        await self._server.serve_forever()
+
+    async def close(self):
+        """
+        Stop listening, stop the dispatchers and shut the pool down
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def metrics(self):
+        """
+        Queue depth, work in progress, request counts by status and
+        latency percentiles in milliseconds
+        Returns a dict
+        """
+        latencies = sorted(self._latencies)
+        percentiles = {}
+        for name, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+            if latencies:
+                index = min(len(latencies) - 1,
+                            int(fraction * len(latencies)))
+                percentiles[name] = round(latencies[index] * 1000, 3)
+            else:
+                percentiles[name] = None
+        return {"queue_depth": self._queue.qsize(), "busy": self._busy,
+                "boards": len(self._jobs), "counts": dict(self.counts),
+                "coalesced": self.coalesced, "expired": self.expired,
+                "latency_ms": percentiles}
+
+    #########################################################
+    # Solving
+
+    async def _dispatch(self):
+        """
+        Hand queued boards to the pool one at a time; there is one
+        dispatcher per worker, so a board is only sent once a worker is
+        free and can still be dropped if it is too late
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._queue.get()
+            remaining = job.deadline - loop.time()
+            if job.waiters == 0 or remaining <= 0:
+                self.expired += 1
+                del self._jobs[job.key]
+                job.future.set_result((None, "deadline passed"))
+                continue
+            options = job.options
+            if job.method in ("optimal", "hybrid"):
+                options = dict(options, timeout=remaining)
+            self._busy += 1
+            try:
+                result = await loop.run_in_executor(
+                    self._pool, _solve_record, job.data, job.height,
+                    job.width, job.method, options)
+            except Exception as exc:
+                result = None, "%s: %s" % (type(exc).__name__, exc)
+            finally:
+                self._busy -= 1
+                del self._jobs[job.key]
+            job.future.set_result(result)
+
+    async def _solve(self, message, loop):
+        """
+        Answer one solve request
+        Returns a reply dict without its id
+        """
+        grid = message.get("grid")
+        method = message.get("method", "greedy")
+        options = message.get("options", {})
+        error = _grid_error(grid)
+        if error is not None:
+            return {"status": "error", "error": error}
+        if method not in fifteen_batch.METHODS or \
+                not isinstance(options, dict):
+            return {"status": "error", "error": "bad method or options"}
+        height, width = len(grid), len(grid[0])
+        data = fifteen_batch.encode(grid, height, width)
+        deadline = loop.time() + message.get(
+            "deadline_ms", self._default_deadline_ms) / 1000.0
+        key = (method, json.dumps(options, sort_keys=True), height, width,
+               data)
+
+        job = self._jobs.get(key)
+        if job is not None:
+            self.coalesced += 1
+            job.waiters += 1
+            job.deadline = max(job.deadline, deadline)
+        elif self._queue.full():
+            return {"status": "overloaded"}
+        else:
+            job = _Job(key, data, height, width, method, options, deadline,
+                       loop.create_future())
+            self._jobs[key] = job
+            self._queue.put_nowait(job)
+        try:
+            moves, error = await asyncio.wait_for(
+                asyncio.shield(job.future), deadline - loop.time())
+        except asyncio.TimeoutError:
+            return {"status": "deadline"}
+        finally:
+            job.waiters -= 1
+        if error is not None:
+            if error == "deadline passed":
+                return {"status": "deadline"}
+            return {"status": "error", "error": error}
+        return {"status": "ok", "moves": moves}
+
+    #########################################################
+    # Connections
+
+    async def _answer(self, line, send, slots):
+        """
+        Parse one request line, answer it and release its slot
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        request_id = None
+        try:
+            message = json.loads(line)
+            request_id = message.get("id")
+            if message.get("op") == "metrics":
+                reply = {"status": "ok", "metrics": self.metrics()}
+            else:
+                reply = await self._solve(message, loop)
+                self.counts[reply["status"]] += 1
+                if reply["status"] == "ok":
+                    self._latencies.append(loop.time() - start)
+        except Exception as exc:
+            self.counts["error"] += 1
+            reply = {"status": "error",
+                     "error": "%s: %s" % (type(exc).__name__, exc)}
+        finally:
+            slots.release()
+        reply["id"] = request_id
+        await send(reply)
+
+    async def _handle(self, reader, writer):
+        """
+        Serve one connection until the client closes it
+        """
+        slots = asyncio.Semaphore(self._max_inflight)
+        lock = asyncio.Lock()
+        pending = set()
+
+        async def send(reply):
+            async with lock:
+                writer.write(json.dumps(reply).encode("ascii") + b"\n")
+                await writer.drain()
+
+        try:
+            while True:
+                #Stop reading while the connection has too much in flight
+                await slots.acquire()
+                line = await reader.readline()
+                if not line:
+                    slots.release()
+                    break
+                task = asyncio.ensure_future(self._answer(line, send, slots))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        except (ConnectionError, ValueError, asyncio.CancelledError):
+            #Dropped connection, a line over LINE_LIMIT or server shutdown;
+            #the handler is a top-level task, so it just ends
+            for task in pending:
+                task.cancel()
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+#########################################################
+# Local client
+
+async def request(messages, host="127.0.0.1", port=None, path=None):
+    """
+    Send request dicts over one connection and wait for every reply
+    Returns the reply dicts in the order they arrived
+    """
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(
+            path, limit=LINE_LIMIT)
+    else:
+        reader, writer = await asyncio.open_connection(host, port,
+                                                       limit=LINE_LIMIT)
+    try:
+        for message in messages:
+            writer.write(json.dumps(message).encode("ascii") + b"\n")
+        await writer.drain()
+        replies = []
+        for _ in messages:
+            line = await reader.readline()
+            if not line:
+                break
+            replies.append(json.loads(line))
+        return replies
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+def main(argv=None):
+    """
+    Run the server until interrupted
+    """
+    import argparse
+    parser = argparse.ArgumentParser(description="Fifteen puzzle server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="listen on a Unix socket instead")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-queue", type=int, default=256)
+    parser.add_argument("--max-inflight", type=int, default=32)
+    args = parser.parse_args(argv)
+
+    async def run():
+        server = SolveServer(args.workers, args.max_queue, args.max_inflight)
+        address = await server.start(args.host, args.port, args.unix)
+        sys.stderr.write("listening on %s\n" % (address,))
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
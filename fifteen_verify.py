@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Batch verification of Fifteen puzzle solutions with NumPy
+N boards of the same shape are held as an (N, height * width) array and
+their move strings are turned into per-step codes.  Each step is then
+applied to every board at once: a move slides the tile at blank + delta
+into the blank, with the same off-grid rules as Puzzle.update_puzzle.
+
+Run as a script to check the batch verifier against update_puzzle on the
+benchmark corpus.
+"""
+
+import collections
+import time
+
+import numpy as np
+
+from fifteen_puzzle_final import Puzzle
+
+#Step codes; PAD fills the steps after the end of a shorter move string
+LEFT, RIGHT, UP, DOWN, PAD, INVALID = range(6)
+
+_CODES = np.full(256, INVALID, dtype=np.int8)
+for _code, _char in ((LEFT, "l"), (RIGHT, "r"), (UP, "u"), (DOWN, "d")):
+    _CODES[ord(_char)] = _code
+
+#legal: no move left the grid and every character was a direction;
+#solved: legal and the board ended solved; first_illegal: index of the
+#offending move or -1; boards: the final boards
+VerifyResult = collections.namedtuple(
+    "VerifyResult", "legal solved first_illegal boards")
+
+
+def encode_moves(move_strings):
+    """
+    Turn move strings into a padded (N, longest) array of step codes
+    Returns a numpy array
+    """
+    longest = max([len(moves) for moves in move_strings] or [0])
+    codes = np.full((len(move_strings), longest), PAD, dtype=np.int8)
+    for row, moves in enumerate(move_strings):
+        raw = np.frombuffer(moves.encode("ascii", "replace"), dtype=np.uint8)
+        codes[row, :len(raw)] = _CODES[raw]
+    return codes
+
+
+def verify_batch(boards, move_strings, height, width):
+    """
+    Replay move_strings[i] on boards[i] for every i at once.  boards is
+    anything numpy can turn into an (N, height * width) integer array; it
+    is not modified.
+    Returns a VerifyResult of length-N arrays
+    """
+    size = height * width
+    boards = np.array(boards, dtype=np.int32).reshape(-1, size)
+    count = boards.shape[0]
+    assert len(move_strings) == count, "need one move string per board"
+    codes = encode_moves(move_strings)
+    deltas = np.array([-1, 1, -width, width, 0, 0], dtype=np.int64)
+    #allowed[code, blank] says whether that move stays on the grid
+    cells = np.arange(size)
+    allowed_table = np.zeros((6, size), dtype=bool)
+    allowed_table[LEFT] = cells % width > 0
+    allowed_table[RIGHT] = cells % width < width - 1
+    allowed_table[UP] = cells >= width
+    allowed_table[DOWN] = cells < size - width
+
+    rows = np.arange(count)
+    blank = np.argmax(boards == 0, axis=1)
+    legal = np.ones(count, dtype=bool)
+    first_illegal = np.full(count, -1, dtype=np.int64)
+
+    for step in range(codes.shape[1]):
+        code = codes[:, step]
+        live = legal & (code != PAD)
+        if not live.any():
+            break
+        allowed = allowed_table[code, blank]
+        bad = live & ~allowed
+        if bad.any():
+            legal &= ~bad
+            first_illegal[bad] = step
+        move = live & allowed
+        if not move.any():
+            continue
+        which = rows[move]
+        zero = blank[move]
+        tile = zero + deltas[code[move]]
+        boards[which, zero] = boards[which, tile]
+        boards[which, tile] = 0
+        blank[move] = tile
+
+    solved = legal & (boards == cells).all(axis=1)
+    return VerifyResult(legal, solved, first_illegal, boards)
+
+
+def verify_reference(boards, move_strings, height, width):
+    """
+    The same check done one board at a time with Puzzle.update_puzzle
+    Returns a list of (legal, solved) pairs
+    """
+    results = []
+    for cells, moves in zip(boards, move_strings):
+        cells = list(cells)
+        puzzle = Puzzle(height, width,
+                        [cells[row * width:(row + 1) * width]
+                         for row in range(height)])
+        try:
+            puzzle.update_puzzle(moves)
+        except AssertionError:
+            results.append((False, False))
+            continue
+        results.append((True, puzzle.lower_row_invariant(0, 0)))
+    return results
+
+
+def main():
+    """
+    Compare verify_batch with verify_reference on the benchmark corpus,
+    using the greedy solutions plus corrupted and truncated copies
+    """
+    import random
+    import fifteen_bench
+
+    rng = random.Random(0)
+    corpus = fifteen_bench.make_corpus(
+        [(3, 3), (3, 5), (5, 3), (4, 4), (5, 5)], per_shape=5000)
+    shapes = collections.OrderedDict()
+    for instance in corpus:
+        shape = (instance["height"], instance["width"])
+        cells = [tile for row in instance["grid"] for tile in row]
+        moves = Puzzle(shape[0], shape[1], instance["grid"]).solve_puzzle()
+        variant = rng.randrange(4)
+        if variant == 1 and moves:
+            spot = rng.randrange(len(moves))
+            moves = moves[:spot] + rng.choice("lrudx") + moves[spot + 1:]
+        elif variant == 2:
+            moves = moves[:rng.randrange(len(moves) + 1)]
+        elif variant == 3:
+            moves = moves + rng.choice("lrud") * 4
+        boards, strings = shapes.setdefault(shape, ([], []))
+        boards.append(cells)
+        strings.append(moves)
+
+    for (height, width), (boards, strings) in shapes.items():
+        start = time.time()
+        batch = verify_batch(boards, strings, height, width)
+        batch_time = time.time() - start
+        start = time.time()
+        reference = verify_reference(boards, strings, height, width)
+        reference_time = time.time() - start
+        same = [(bool(legal), bool(solved)) for legal, solved
+                in zip(batch.legal, batch.solved)] == reference
+        print("%dx%d: %d boards, %d solved, agree=%s, batch %.3f s, "
+              "update_puzzle %.3f s" % (height, width, len(boards),
+                                        batch.solved.sum(), same, batch_time,
+                                        reference_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the solution cache: LRU eviction by entries and by stored
+characters, the SQLite layer across cache objects, and answers replayed
+for transposed boards.
+
+Run with python -m pytest or python -m unittest.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+import fifteen_cache
+import fifteen_generate
+from fifteen_puzzle_final import Puzzle
+
+
+def grids(count, height, width, seed):
+    """
+    Random solvable boards as lists of rows
+    Returns a list of grids
+    """
+    boards = fifteen_generate.random_boards(count, height, width,
+                                            np.random.default_rng(seed))
+    return [board.reshape(height, width).tolist() for board in boards]
+
+
+def solved(puzzle):
+    """
+    Whether a puzzle is in its solved state
+    Returns a boolean
+    """
+    return puzzle.cells() == list(range(puzzle.get_height() *
+                                        puzzle.get_width()))
+
+
+class SolutionCacheTest(unittest.TestCase):
+    """
+    fifteen_cache.SolutionCache
+    """
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def solve(self, cache, grid):
+        """
+        Solve a fresh puzzle through the cache and check the answer
+        Returns the move string
+        """
+        puzzle = Puzzle(len(grid), len(grid[0]), grid)
+        mov_string = cache.solve(puzzle)
+        self.assertTrue(solved(puzzle))
+        return mov_string
+
+    def test_evict_by_entries(self):
+        first, second, third = grids(3, 4, 4, 0)
+        cache = fifteen_cache.SolutionCache(max_entries=2)
+        self.solve(cache, first)
+        self.solve(cache, second)
+        #Using the first board again makes the second the oldest
+        self.solve(cache, first)
+        self.solve(cache, third)
+        info = cache.info()
+        self.assertEqual((info.hits, info.misses, info.evictions,
+                          info.entries), (1, 3, 1, 2))
+        self.solve(cache, first)
+        self.assertEqual(cache.info().hits, 2)
+        self.solve(cache, second)
+        self.assertEqual(cache.info().misses, 4)
+
+    def test_evict_by_chars(self):
+        boards = grids(6, 5, 5, 1)
+        lengths = [len(Puzzle(5, 5, grid).solve_puzzle()) for grid in boards]
+        limit = lengths[-1] + lengths[-2]
+        cache = fifteen_cache.SolutionCache(max_chars=limit)
+        for grid in boards:
+            self.solve(cache, grid)
+            self.assertLessEqual(cache.info().chars,
+                                 max(limit, max(lengths)))
+        info = cache.info()
+        self.assertEqual(info.entries + info.evictions, len(boards))
+        self.assertEqual(info.chars, sum(lengths[-info.entries:]))
+        self.assertGreaterEqual(info.entries, 2)
+
+    def test_disk_layer(self):
+        path = os.path.join(self.folder, "cache.sqlite")
+        boards = grids(3, 3, 3, 2) + grids(3, 6, 6, 3)
+        with fifteen_cache.SolutionCache(path=path) as cache:
+            answers = [self.solve(cache, grid) for grid in boards]
+        with fifteen_cache.SolutionCache(path=path) as cache:
+            self.assertEqual([self.solve(cache, grid) for grid in boards],
+                             answers)
+            info = cache.info()
+            self.assertEqual((info.disk_hits, info.misses),
+                             (len(boards), 0))
+        #Optimized answers are kept apart from plain greedy ones
+        with fifteen_cache.SolutionCache(path=path, optimize=True) as cache:
+            self.solve(cache, boards[0])
+            self.assertEqual(cache.info().misses, 1)
+
+    def test_transposed_hit(self):
+        for size in (3, 4, 5):
+            for grid in grids(3, size, size, size):
+                cells = [tile for row in grid for tile in row]
+                mirrored = fifteen_cache.transpose_cells(cells, size)
+                if mirrored == cells:
+                    continue
+                cache = fifteen_cache.SolutionCache()
+                self.solve(cache, grid)
+                self.solve(cache, [mirrored[row * size:(row + 1) * size]
+                                   for row in range(size)])
+                self.assertEqual(cache.info().hits, 1)
+                self.assertEqual(cache.info().entries, 1)
+
+    def test_shapes_kept_apart(self):
+        #The same tiles on a 2x3 and a 3x2 board are different boards
+        cache = fifteen_cache.SolutionCache()
+        self.solve(cache, [[1, 0, 2], [3, 4, 5]])
+        self.solve(cache, [[1, 0], [2, 3], [4, 5]])
+        self.assertEqual(cache.info().misses, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
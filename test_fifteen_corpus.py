@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the packed corpus format: records round-trip under every
+packing, corpus files read back what was written, and solution files
+keep failed boards as FAILED records.
+
+Run with python -m pytest or python -m unittest.
+"""
+
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+import fifteen_corpus
+from fifteen_puzzle_final import Puzzle
+
+#Shapes covering every packing: nibbles with an even and an odd number of
+#cells, then one, two and four bytes per tile
+SHAPES = ((2, 2), (3, 3), (4, 4), (5, 5), (16, 16), (17, 17), (257, 256))
+
+
+def shuffled(height, width, rng):
+    """
+    Random arrangement of the tiles of a height x width board
+    Returns a flat list of tiles
+    """
+    cells = list(range(height * width))
+    rng.shuffle(cells)
+    return cells
+
+
+class CorpusTest(unittest.TestCase):
+    """
+    fifteen_corpus records, corpus files and solution files
+    """
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_packings(self):
+        rng = random.Random(20)
+        kinds = []
+        for height, width in SHAPES:
+            kind = fifteen_corpus.packing(height, width)
+            kinds.append(kind)
+            cells = shuffled(height, width, rng)
+            record = fifteen_corpus.pack(cells, height, width)
+            self.assertEqual(len(record),
+                             fifteen_corpus.record_size(height, width))
+            self.assertEqual(fifteen_corpus.unpack(record, height, width),
+                             cells)
+            self.assertEqual(fifteen_corpus.unpack(memoryview(record),
+                                                   height, width), cells)
+        self.assertEqual(kinds, [fifteen_corpus.NIBBLE] * 3 + [1, 1, 2, 4])
+
+    def test_corpus_file(self):
+        rng = random.Random(21)
+        for height, width in SHAPES[:-1]:
+            path = os.path.join(self.folder, "%dx%d.fcor" % (height, width))
+            boards = [shuffled(height, width, rng) for _ in range(7)]
+            with fifteen_corpus.CorpusWriter(path, height, width) as writer:
+                for cells in boards[:-1]:
+                    writer.write(cells)
+                #Boards may also be given as rows
+                writer.write([boards[-1][row * width:(row + 1) * width]
+                              for row in range(height)])
+            self.assertEqual(writer.count, len(boards))
+            reader = fifteen_corpus.CorpusReader(path)
+            try:
+                self.assertEqual((reader.height, reader.width),
+                                 (height, width))
+                self.assertEqual(len(reader), len(boards))
+                self.assertEqual(list(reader), boards)
+                self.assertEqual(reader.board(3), boards[3])
+            finally:
+                reader.close()
+
+    def test_solution_records(self):
+        path = os.path.join(self.folder, "answers.fsol")
+        answers = ["rdlu", None, "", "l" * 70000, None]
+        with open(path, "wb") as out:
+            for mov_string in answers:
+                fifteen_corpus.write_solution(out, mov_string)
+        self.assertEqual(list(fifteen_corpus.read_solutions(path)), answers)
+
+    def test_solve_corpus(self):
+        corpus = os.path.join(self.folder, "boards.fcor")
+        out = os.path.join(self.folder, "answers.fsol")
+        boards = [[1, 0, 2, 3, 4, 5, 6, 7, 8],
+                  #Two tiles swapped, which cannot be solved
+                  [0, 2, 1, 3, 4, 5, 6, 7, 8],
+                  [3, 1, 2, 0, 4, 5, 6, 7, 8]]
+        with fifteen_corpus.CorpusWriter(corpus, 3, 3) as writer:
+            for cells in boards:
+                writer.write(cells)
+        errors = []
+        solved, failed = fifteen_corpus.solve_corpus(
+            corpus, out, report=lambda index, error: errors.append(index))
+        self.assertEqual((solved, failed), (2, 1))
+        self.assertEqual(errors, [1])
+        answers = list(fifteen_corpus.read_solutions(out))
+        self.assertIsNone(answers[1])
+        for cells, mov_string in zip(boards, answers):
+            if mov_string is None:
+                continue
+            puzzle = Puzzle(3, 3, [cells[row * 3:(row + 1) * 3]
+                                   for row in range(3)])
+            puzzle.update_puzzle(mov_string)
+            self.assertEqual(puzzle.cells(), list(range(9)))
+
+
+if __name__ == "__main__":
+    unittest.main()
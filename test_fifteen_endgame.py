@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the endgame tables: every solvable arrangement of a corner is
+finished optimally, on a larger board as well, and every other
+arrangement is reported unsolvable.
+
+Run with python -m pytest or python -m unittest.
+"""
+
+import itertools
+import unittest
+
+import fifteen_endgame
+import fifteen_search
+from fifteen_puzzle_final import Puzzle
+
+#Board the corners are embedded in
+HEIGHT = 4
+WIDTH = 5
+
+
+def embed(key, rows, cols):
+    """
+    Board of HEIGHT x WIDTH, solved outside its upper left corner, whose
+    corner holds the arrangement key
+    Returns a flat list of tiles
+    """
+    cells = list(range(HEIGHT * WIDTH))
+    for cell, goal in enumerate(key):
+        row, col = divmod(cell, cols)
+        goal_row, goal_col = divmod(goal, cols)
+        cells[row * WIDTH + col] = goal_row * WIDTH + goal_col
+    return cells
+
+
+class LookupTest(unittest.TestCase):
+    """
+    fifteen_endgame.lookup
+    """
+
+    def test_every_arrangement(self):
+        for rows, cols in fifteen_endgame.SHAPES:
+            size = rows * cols
+            solvable = 0
+            for key in itertools.permutations(range(size)):
+                cells = embed(key, rows, cols)
+                mov_string = fifteen_endgame.lookup(cells, WIDTH, rows, cols)
+                corner = Puzzle(rows, cols,
+                                [key[row * cols:(row + 1) * cols]
+                                 for row in range(rows)])
+                if not corner.is_solvable():
+                    self.assertIsNone(mov_string)
+                    continue
+                solvable += 1
+                shortest = fifteen_search.IDAStar(list(key), rows,
+                                                  cols).solve()
+                self.assertEqual(len(mov_string), len(shortest))
+                puzzle = Puzzle(HEIGHT, WIDTH,
+                                [cells[row * WIDTH:(row + 1) * WIDTH]
+                                 for row in range(HEIGHT)])
+                puzzle.update_puzzle(mov_string)
+                self.assertEqual(puzzle.cells(),
+                                 list(range(HEIGHT * WIDTH)))
+            table = fifteen_endgame.TABLES[(rows, cols)]
+            self.assertEqual(solvable, len(table))
+            self.assertEqual(solvable, {4: 12, 6: 360}[size])
+
+    def test_tile_from_outside(self):
+        cells = list(range(HEIGHT * WIDTH))
+        cells[1], cells[WIDTH * 2] = cells[WIDTH * 2], cells[1]
+        for rows, cols in fifteen_endgame.SHAPES:
+            self.assertIsNone(fifteen_endgame.lookup(cells, WIDTH, rows,
+                                                     cols))
+
+
+if __name__ == "__main__":
+    unittest.main()
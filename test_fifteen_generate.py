@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the NumPy board generator: every board is a solvable arrangement
+by Puzzle.is_solvable, uniform boards cover the solvable boards evenly,
+and corpora read back through fifteen_corpus.
+
+Run with python -m pytest or python -m unittest.
+"""
+
+import collections
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+import fifteen_corpus
+import fifteen_generate
+from fifteen_puzzle_final import Puzzle
+
+#Odd and even widths, on both sides of SMALL_BOARD
+SHAPES = ((2, 2), (2, 3), (3, 2), (3, 3), (4, 4), (3, 5), (5, 4), (9, 9),
+          (8, 10), (12, 7))
+
+
+def is_solvable(cells, height, width):
+    """
+    Puzzle.is_solvable of a flat board
+    Returns a boolean
+    """
+    cells = [int(tile) for tile in cells]
+    return Puzzle(height, width, [cells[row * width:(row + 1) * width]
+                                  for row in range(height)]).is_solvable()
+
+
+class GenerateTest(unittest.TestCase):
+    """
+    fifteen_generate boards and corpora
+    """
+
+    def test_random_boards(self):
+        rng = np.random.default_rng(22)
+        for height, width in SHAPES:
+            boards = fifteen_generate.random_boards(100, height, width, rng)
+            self.assertEqual(boards.shape, (100, height * width))
+            for cells in boards:
+                self.assertEqual(sorted(cells.tolist()),
+                                 list(range(height * width)))
+                self.assertTrue(is_solvable(cells, height, width))
+
+    def test_solvable(self):
+        rng = np.random.default_rng(23)
+        for height, width in SHAPES:
+            boards = rng.permuted(np.tile(np.arange(height * width),
+                                          (100, 1)), axis=1)
+            expected = [is_solvable(cells, height, width) for cells in boards]
+            self.assertEqual(
+                fifteen_generate.solvable(boards, height, width).tolist(),
+                expected)
+
+    def test_uniform(self):
+        #Each of the 360 solvable 2x3 boards is drawn about 100 times
+        boards = fifteen_generate.random_boards(
+            36000, 2, 3, np.random.default_rng(24))
+        counts = collections.Counter(map(tuple, boards.tolist()))
+        self.assertEqual(len(counts), 360)
+        self.assertGreater(min(counts.values()), 50)
+        self.assertLess(max(counts.values()), 150)
+
+    def test_random_walks(self):
+        rng = np.random.default_rng(25)
+        for height, width in SHAPES:
+            boards = fifteen_generate.random_walk_boards(50, height, width,
+                                                         7, rng)
+            for cells in boards:
+                self.assertTrue(is_solvable(cells, height, width))
+                #Seven moves displace at most seven tiles
+                moved = sum(1 for idx, tile in enumerate(cells)
+                            if tile and tile != idx)
+                self.assertLessEqual(moved, 7)
+
+    def test_corpus(self):
+        folder = tempfile.mkdtemp()
+        try:
+            for height, width in ((3, 3), (4, 4), (9, 9)):
+                path = os.path.join(folder, "boards.fcor")
+                fifteen_generate.generate_corpus(path, height, width, 250,
+                                                 seed=26, batch=100)
+                reader = fifteen_corpus.CorpusReader(path)
+                try:
+                    self.assertEqual(len(reader), 250)
+                    for cells in reader:
+                        self.assertTrue(is_solvable(cells, height, width))
+                finally:
+                    reader.close()
+        finally:
+            shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the move string post-optimizer: a shortened string reaches the
+same board as the original and is never longer.
+
+Run with python -m pytest or python -m unittest.
+"""
+
+import random
+import unittest
+
+import fifteen_postopt
+from fifteen_puzzle_final import Puzzle
+
+
+def random_puzzle(height, width, rng, moves):
+    """
+    Puzzle reached by a random walk of the blank from the solved board
+    Returns a Puzzle object
+    """
+    puzzle = Puzzle(height, width)
+    for _ in range(moves):
+        zero_row, zero_col = puzzle.current_position(0, 0)
+        puzzle.update_puzzle(rng.choice(
+            [direction for direction, legal in
+             (("l", zero_col > 0), ("r", zero_col < width - 1),
+              ("u", zero_row > 0), ("d", zero_row < height - 1))
+             if legal]))
+    return puzzle
+
+
+def replay(puzzle, mov_string):
+    """
+    Board reached by playing mov_string on a copy of puzzle
+    Returns a flat list of tiles
+    """
+    board = puzzle.clone()
+    board.update_puzzle(mov_string)
+    return board.cells()
+
+
+class ShortenTest(unittest.TestCase):
+    """
+    fifteen_postopt.shorten
+    """
+
+    def test_loops_cut(self):
+        puzzle = Puzzle(2, 2)
+        #Twelve moves around a 2x2 board bring every tile back
+        self.assertEqual(fifteen_postopt.shorten(puzzle, "rdlu" * 3), "")
+        self.assertEqual(fifteen_postopt.shorten(puzzle, "rlrldu"), "")
+        self.assertEqual(fifteen_postopt.shorten(puzzle, "rlrdud"), "rd")
+        self.assertEqual(puzzle.cells(), [0, 1, 2, 3])
+
+    def test_random_walks(self):
+        rng = random.Random(13)
+        for height, width in ((2, 2), (3, 3), (4, 4), (3, 5), (6, 6)):
+            for _ in range(20):
+                puzzle = random_puzzle(height, width, rng, 30)
+                start = puzzle.cells()
+                walk = puzzle.clone()
+                mov_string = "".join(
+                    rng.choice("lrud") for _ in range(200))
+                #Keep only the moves that stay on the board
+                played = []
+                for direction in mov_string:
+                    try:
+                        walk.update_puzzle(direction)
+                    except AssertionError:
+                        continue
+                    played.append(direction)
+                mov_string = "".join(played)
+                shorter = fifteen_postopt.shorten(puzzle, mov_string)
+                self.assertLessEqual(len(shorter), len(mov_string))
+                self.assertEqual(replay(puzzle, shorter),
+                                 replay(puzzle, mov_string))
+                self.assertEqual(puzzle.cells(), start)
+
+    def test_greedy_answers(self):
+        rng = random.Random(17)
+        for height, width in ((3, 3), (4, 4), (5, 3), (8, 8)):
+            for _ in range(10):
+                puzzle = random_puzzle(height, width, rng, 2000)
+                mov_string = puzzle.clone().solve_puzzle()
+                shorter = fifteen_postopt.shorten(puzzle, mov_string)
+                self.assertLessEqual(len(shorter), len(mov_string))
+                self.assertEqual(replay(puzzle, shorter),
+                                 list(range(height * width)))
+
+
+if __name__ == "__main__":
+    unittest.main()
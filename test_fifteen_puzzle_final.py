@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+Differential tests of Puzzle against the original list-of-lists
+implementation.  Random walks are played on both boards side by side and
+every invariant check, current_position and get_number must agree at
+every step; solve_puzzle answers must solve the reference board.  The
+other solve methods are checked on the reference board the same way.
+
+Run with python -m pytest or python -m unittest.
+"""
+
+import random
+import time
+import unittest
+
+from fifteen_puzzle_final import Puzzle
+
+#Shapes the walks and solves run on
+SHAPES = ((2, 2), (2, 3), (3, 2), (3, 3), (4, 4), (3, 5), (5, 3), (6, 4))
+
+
+class ReferencePuzzle(object):
+    """
+    The board methods of the original implementation, a list of rows
+    compared against a solved copy, kept as the reference for Puzzle
+    """
+
+    def __init__(self, puzzle_height, puzzle_width, initial_grid=None):
+        """
+        Initialize puzzle with default height and width
+        """
+        self._height = puzzle_height
+        self._width = puzzle_width
+        self._grid = [[col + puzzle_width * row
+                       for col in range(self._width)]
+                      for row in range(self._height)]
+        self._ref_solution = [[col + puzzle_width * row
+                               for col in range(self._width)]
+                              for row in range(self._height)]
+        if initial_grid != None:
+            for row in range(puzzle_height):
+                for col in range(puzzle_width):
+                    self._grid[row][col] = initial_grid[row][col]
+
+    def get_number(self, row, col):
+        """
+        Getter for the number at tile position pos
+        Returns an integer
+        """
+        return self._grid[row][col]
+
+    def current_position(self, solved_row, solved_col):
+        """
+        Locate the current position of the tile that will be at
+        position (solved_row, solved_col) when the puzzle is solved
+        Returns a tuple of two integers
+        """
+        solved_value = (solved_col + self._width * solved_row)
+        for row in range(self._height):
+            for col in range(self._width):
+                if self._grid[row][col] == solved_value:
+                    return (row, col)
+        assert False, "Value " + str(solved_value) + " not found"
+
+    def update_puzzle(self, move_string):
+        """
+        Updates the puzzle state based on the provided move string
+        """
+        zero_row, zero_col = self.current_position(0, 0)
+        for direction in move_string:
+            if direction == "l":
+                assert zero_col > 0, "move off grid: " + direction
+                self._grid[zero_row][zero_col] = self._grid[zero_row][zero_col - 1]
+                self._grid[zero_row][zero_col - 1] = 0
+                zero_col -= 1
+            elif direction == "r":
+                assert zero_col < self._width - 1, "move off grid: " + direction
+                self._grid[zero_row][zero_col] = self._grid[zero_row][zero_col + 1]
+                self._grid[zero_row][zero_col + 1] = 0
+                zero_col += 1
+            elif direction == "u":
+                assert zero_row > 0, "move off grid: " + direction
+                self._grid[zero_row][zero_col] = self._grid[zero_row - 1][zero_col]
+                self._grid[zero_row - 1][zero_col] = 0
+                zero_row -= 1
+            elif direction == "d":
+                assert zero_row < self._height - 1, "move off grid: " + direction
+                self._grid[zero_row][zero_col] = self._grid[zero_row + 1][zero_col]
+                self._grid[zero_row + 1][zero_col] = 0
+                zero_row += 1
+            else:
+                assert False, "invalid direction: " + direction
+
+    def lower_row_invariant(self, target_row, target_col):
+        """
+        Check whether the puzzle satisfies the specified invariant
+        at the given position in the bottom rows of the puzzle
+        Returns a boolean
+        """
+        if self._grid[target_row][target_col] != 0:
+            return False
+        elif self._grid[target_row + 1:] != self._ref_solution[target_row + 1:]:
+            return False
+        elif self._grid[target_row][target_col + 1:] != \
+                self._ref_solution[target_row][target_col + 1:]:
+            return False
+        else:
+            return True
+
+    def row0_invariant(self, target_col):
+        """
+        Check whether the puzzle satisfies the row zero invariant
+        at the given column
+        Returns a boolean
+        """
+        if self._grid[0][target_col] != 0:
+            return False
+        #The original slices a one-row list here, so this always holds
+        elif self._grid[0:1][target_col + 1:] != \
+                self._ref_solution[0:1][target_col + 1:]:
+            return False
+        elif self._grid[2:] != self._ref_solution[2:]:
+            return False
+        elif self._grid[1][target_col] != self._ref_solution[1][target_col]:
+            return False
+        else:
+            return True
+
+    def row1_invariant(self, target_col):
+        """
+        Check whether the puzzle satisfies the row one invariant
+        at the given column
+        Returns a boolean
+        """
+        if self.lower_row_invariant(1, target_col) == False:
+            return False
+        elif self._grid[0:1][target_col + 1:] != \
+                self._ref_solution[0:1][target_col + 1:]:
+            return False
+        else:
+            return True
+
+
+def random_grid(height, width, rng, moves):
+    """
+    Board reached by a random walk of the blank from the solved board;
+    short walks keep the solved tail long, so the invariants are often
+    true
+    Returns a list of rows
+    """
+    puzzle = ReferencePuzzle(height, width)
+    for _ in range(moves):
+        puzzle.update_puzzle(rng.choice(legal_moves(puzzle, height, width)))
+    return [row[:] for row in puzzle._grid]
+
+
+def legal_moves(puzzle, height, width):
+    """
+    Directions the blank of puzzle can move in
+    Returns a list of move characters
+    """
+    zero_row, zero_col = puzzle.current_position(0, 0)
+    return [direction for direction, legal in
+            (("l", zero_col > 0), ("r", zero_col < width - 1),
+             ("u", zero_row > 0), ("d", zero_row < height - 1))
+            if legal]
+
+
+class DifferentialTest(unittest.TestCase):
+    """
+    Puzzle against ReferencePuzzle
+    """
+
+    def assert_same(self, puzzle, reference, height, width):
+        """
+        Every board query gives the same answer on both puzzles
+        """
+        for row in range(height):
+            for col in range(width):
+                self.assertEqual(puzzle.get_number(row, col),
+                                 reference.get_number(row, col))
+                self.assertEqual(puzzle.current_position(row, col),
+                                 reference.current_position(row, col))
+                self.assertEqual(puzzle.lower_row_invariant(row, col),
+                                 reference.lower_row_invariant(row, col))
+        for col in range(width):
+            self.assertEqual(puzzle.row0_invariant(col),
+                             reference.row0_invariant(col))
+            self.assertEqual(puzzle.row1_invariant(col),
+                             reference.row1_invariant(col))
+
+    def test_random_walks(self):
+        rng = random.Random(5)
+        for height, width in SHAPES:
+            for _ in range(8):
+                grid = random_grid(height, width, rng,
+                                   rng.choice((0, 3, 10, 1000)))
+                puzzle = Puzzle(height, width, grid)
+                reference = ReferencePuzzle(height, width, grid)
+                for _ in range(60):
+                    self.assert_same(puzzle, reference, height, width)
+                    direction = rng.choice(legal_moves(reference, height,
+                                                       width))
+                    puzzle.update_puzzle(direction)
+                    reference.update_puzzle(direction)
+                self.assert_same(puzzle.clone(), reference, height, width)
+
+    def test_solve_puzzle(self):
+        rng = random.Random(11)
+        for height, width in SHAPES + ((7, 2), (2, 7), (8, 8)):
+            for _ in range(10):
+                grid = random_grid(height, width, rng, 2000)
+                for optimize in (False, True):
+                    puzzle = Puzzle(height, width, grid)
+                    reference = ReferencePuzzle(height, width, grid)
+                    reference.update_puzzle(puzzle.solve_puzzle(optimize))
+                    self.assertTrue(reference.lower_row_invariant(0, 0))
+                    self.assertTrue(puzzle.lower_row_invariant(0, 0))
+
+
+class SolveHybridTest(unittest.TestCase):
+    """
+    Puzzle.solve_hybrid against the post-optimized greedy answer
+    """
+
+    def test_never_longer(self):
+        rng = random.Random(7)
+        for height, width in SHAPES + ((5, 5), (8, 8), (10, 10)):
+            for _ in range(5):
+                grid = random_grid(height, width, rng, 2000)
+                greedy = Puzzle(height, width, grid).solve_puzzle(True)
+                puzzle = Puzzle(height, width, grid)
+                mov_string = puzzle.solve_hybrid()
+                self.assertLessEqual(len(mov_string), len(greedy))
+                self.assertTrue(puzzle.lower_row_invariant(0, 0))
+                reference = ReferencePuzzle(height, width, grid)
+                reference.update_puzzle(mov_string)
+                self.assertTrue(reference.lower_row_invariant(0, 0))
+
+
+class SolveWithinTest(unittest.TestCase):
+    """
+    Puzzle.solve_within against its wall-clock budget
+    """
+
+    def test_budget(self):
+        rng = random.Random(3)
+        for size, budget_ms in ((40, 50), (30, 400), (8, 100)):
+            grid = random_grid(size, size, rng, 20000)
+            start = time.time()
+            Puzzle(size, size, grid).solve_puzzle(optimize=True)
+            greedy = time.time() - start
+
+            puzzle = Puzzle(size, size, grid)
+            start = time.time()
+            result = puzzle.solve_within(budget_ms)
+            elapsed = time.time() - start
+            #The greedy answer is finished even when it takes longer
+            self.assertLess(elapsed,
+                            max(budget_ms / 1000.0, greedy) * 1.25 + 0.1)
+            self.assertLessEqual(result.lower_bound, len(result.moves))
+            reference = ReferencePuzzle(size, size, grid)
+            reference.update_puzzle(result.moves)
+            self.assertTrue(reference.lower_row_invariant(0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
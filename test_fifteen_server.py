@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the solving server, run on a free localhost port and driven
+through the local client.
+
+Run with python -m pytest or python -m unittest.
+"""
+
+import asyncio
+import unittest
+
+import numpy as np
+
+import fifteen_generate
+import fifteen_server
+from fifteen_puzzle_final import Puzzle
+
+
+def grids(count, height, width, seed):
+    """
+    Random solvable boards as lists of rows
+    Returns a list of grids
+    """
+    boards = fifteen_generate.random_boards(count, height, width,
+                                            np.random.default_rng(seed))
+    return [board.reshape(height, width).tolist() for board in boards]
+
+
+def solves(grid, mov_string):
+    """
+    Whether mov_string solves grid
+    Returns a boolean
+    """
+    puzzle = Puzzle(len(grid), len(grid[0]), grid)
+    puzzle.update_puzzle(mov_string)
+    return puzzle.lower_row_invariant(0, 0)
+
+
+class ServerTest(unittest.TestCase):
+    """
+    SolveServer through fifteen_server.request
+    """
+
+    def serve(self, messages, **options):
+        """
+        Start a one-worker server, send messages over one connection and
+        ask for the metrics over another once every reply is in
+        Returns the replies by id and the metrics
+        """
+        async def run():
+            server = fifteen_server.SolveServer(workers=1, **options)
+            host, port = (await server.start())[:2]
+            try:
+                replies = await fifteen_server.request(messages, host, port)
+                metrics = await fifteen_server.request(
+                    [{"id": "metrics", "op": "metrics"}], host, port)
+            finally:
+                await server.close()
+            return (dict((reply["id"], reply) for reply in replies),
+                    metrics[0]["metrics"])
+        return asyncio.run(run())
+
+    def test_statuses(self):
+        grid = grids(1, 3, 3, 0)[0]
+        messages = [
+            {"id": 1, "grid": grid},
+            {"id": 2, "grid": grid, "method": "optimal"},
+            {"id": 3, "grid": [[0, 1], [3, 2]]},
+            {"id": 4, "grid": [[1, 2], [3, 4]]},
+            {"id": 5, "grid": [[0, 1], [2]]},
+            {"id": 6, "grid": [[0, 1], [1, 2]]},
+            {"id": 7, "grid": [[0, 1, 2]]},
+            {"id": 8, "grid": grid, "method": "fastest"},
+            {"id": 9, "grid": [[0, 1], [2, 3]], "deadline_ms": 0},
+        ]
+        replies, metrics = self.serve(messages)
+        self.assertEqual(replies[1]["status"], "ok")
+        self.assertTrue(solves(grid, replies[1]["moves"]))
+        self.assertEqual(replies[2]["status"], "ok")
+        self.assertTrue(solves(grid, replies[2]["moves"]))
+        self.assertLessEqual(len(replies[2]["moves"]),
+                             len(replies[1]["moves"]))
+        self.assertEqual(replies[3]["status"], "error")
+        self.assertIn("UnsolvableError", replies[3]["error"])
+        #Bad grids are turned away before they reach a worker
+        for request_id, error in ((4, "grid must hold"), (5, "rows must"),
+                                  (6, "grid must hold"),
+                                  (7, "grid must be at least"),
+                                  (8, "bad method")):
+            self.assertEqual(replies[request_id]["status"], "error")
+            self.assertTrue(replies[request_id]["error"].startswith(error))
+        self.assertEqual(replies[9]["status"], "deadline")
+        self.assertEqual(metrics["counts"],
+                         {"ok": 2, "error": 6, "deadline": 1,
+                          "overloaded": 0})
+        self.assertEqual(metrics["queue_depth"], 0)
+        self.assertEqual(metrics["boards"], 0)
+        self.assertIsNotNone(metrics["latency_ms"]["p50"])
+
+    def test_overloaded(self):
+        #The worker is held by the first board and the queue takes one
+        messages = [{"id": number, "grid": grid}
+                    for number, grid in enumerate(grids(4, 30, 30, 1))]
+        replies, metrics = self.serve(messages, max_queue=1)
+        statuses = [replies[number]["status"] for number in range(4)]
+        self.assertIn("overloaded", statuses)
+        for number, grid in enumerate(messages):
+            if statuses[number] == "ok":
+                self.assertTrue(solves(grid["grid"],
+                                       replies[number]["moves"]))
+        self.assertEqual(metrics["counts"]["overloaded"],
+                         statuses.count("overloaded"))
+
+    def test_coalescing(self):
+        #The second and third requests wait behind the first and share
+        #one solve
+        slow, grid = grids(1, 30, 30, 2)[0], grids(1, 5, 5, 3)[0]
+        messages = [{"id": 0, "grid": slow}, {"id": 1, "grid": grid},
+                    {"id": 2, "grid": grid}]
+        replies, metrics = self.serve(messages)
+        self.assertEqual(metrics["coalesced"], 1)
+        self.assertEqual(replies[1]["status"], "ok")
+        self.assertEqual(replies[1]["moves"], replies[2]["moves"])
+        self.assertTrue(solves(grid, replies[1]["moves"]))
+        self.assertTrue(solves(slow, replies[0]["moves"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the NumPy batch verifier against Puzzle.update_puzzle on greedy
+answers and on corrupted, truncated and extended copies of them.
+
+Run with python -m pytest or python -m unittest.
+"""
+
+import random
+import unittest
+
+import numpy as np
+
+import fifteen_generate
+import fifteen_verify
+from fifteen_puzzle_final import Puzzle
+
+
+def corrupt(moves, rng):
+    """
+    A greedy answer left alone or spoiled in one of several ways
+    Returns a move string
+    """
+    variant = rng.randrange(6)
+    if variant == 1 and moves:
+        spot = rng.randrange(len(moves))
+        return moves[:spot] + rng.choice("lrudx") + moves[spot + 1:]
+    elif variant == 2:
+        return moves[:rng.randrange(len(moves) + 1)]
+    elif variant == 3:
+        return moves + rng.choice("lrud") * 4
+    elif variant == 4:
+        return ""
+    elif variant == 5:
+        return "lu" + moves
+    return moves
+
+
+def first_illegal(cells, moves, height, width):
+    """
+    Index of the first move update_puzzle rejects, and the board reached
+    Returns an (index or -1, flat list of tiles) pair
+    """
+    puzzle = Puzzle(height, width, [cells[row * width:(row + 1) * width]
+                                    for row in range(height)])
+    for index, direction in enumerate(moves):
+        try:
+            puzzle.update_puzzle(direction)
+        except AssertionError:
+            return index, puzzle.cells()
+    return -1, puzzle.cells()
+
+
+class VerifyBatchTest(unittest.TestCase):
+    """
+    fifteen_verify.verify_batch against verify_reference
+    """
+
+    def test_corrupted(self):
+        rng = random.Random(12)
+        for height, width in ((2, 2), (3, 3), (3, 5), (5, 3), (4, 4),
+                              (6, 6)):
+            boards = fifteen_generate.random_boards(
+                200, height, width, np.random.default_rng(height * width))
+            boards = boards.tolist()
+            strings = []
+            for cells in boards:
+                puzzle = Puzzle(height, width,
+                                [cells[row * width:(row + 1) * width]
+                                 for row in range(height)])
+                strings.append(corrupt(puzzle.solve_puzzle(), rng))
+            given = np.array(boards)
+            batch = fifteen_verify.verify_batch(given, strings, height,
+                                                width)
+            self.assertTrue((given == np.array(boards)).all())
+            reference = fifteen_verify.verify_reference(boards, strings,
+                                                        height, width)
+            self.assertEqual([(bool(legal), bool(solved)) for legal, solved
+                              in zip(batch.legal, batch.solved)],
+                             reference)
+            for number, (cells, moves) in enumerate(zip(boards, strings)):
+                index, final = first_illegal(cells, moves, height, width)
+                self.assertEqual(batch.first_illegal[number], index)
+                if index < 0:
+                    self.assertEqual(batch.boards[number].tolist(), final)
+            self.assertTrue(batch.solved.any())
+            self.assertFalse(batch.legal.all())
+
+
+if __name__ == "__main__":
+    unittest.main()